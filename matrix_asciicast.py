@@ -0,0 +1,162 @@
+"""
+Export the rain as an `asciicast v2 <https://docs.asciinema.org/manual/asciicast/v2/>`_ file without a terminal.
+
+The frames are encoded with the ``AnsiWindow`` of the ``ansi`` backend and written as output events
+with synthetic timestamps: frame `n` is stamped at `n` times the frame period, so the cast plays back
+at the speed of the rain however fast it was produced.
+Each frame is encoded once and streamed to the file through a large write buffer;
+nothing is kept between frames, so memory use does not grow with the length of the cast.
+
+.. code:: bash
+
+  python3 matrix_rain.py --asciicast rain.cast --headless 300x100 --frames 6000
+"""
+
+import json
+import time
+from collections.abc import Callable
+from typing import Optional, Self, TextIO
+
+from matrix_screen_ansi import (
+    DISABLE_AUTOWRAP,
+    HIDE_CURSOR,
+    RESTORE_TERMINAL,
+    AnsiScreen,
+    AnsiWindow,
+)
+from matrix_screen_headless import KEY_QUIT
+
+ASCIICAST_VERSION: int = 2
+TERM: str = "xterm-256color"
+WRITE_BUFFER_SIZE: int = 1 << 20
+"""Bytes buffered before the cast is written to disk."""
+
+
+class AsciicastWriter:
+    """
+    Writes the header and one output event per frame of an asciicast v2 file to `f`.
+
+    Frames without output are not written but still take their frame period.
+    ``close`` ends the cast with an event restoring the terminal, like ``ansi_terminal`` does on exit.
+
+    >>> import io
+    >>> f = io.StringIO()
+    >>> cast = AsciicastWriter(f, 80, 24, 0.1, timestamp=0)
+    >>> cast.write_frame(b"\\x1b[1;1Hx")
+    >>> cast.write_frame(b"")
+    >>> cast.write_frame(b"y")
+    >>> cast.close()
+    >>> print(f.getvalue().rstrip())
+    {"version": 2, "width": 80, "height": 24, "timestamp": 0, "env": {"TERM": "xterm-256color"}}
+    [0.000000, "o", "\\u001b[1;1Hx"]
+    [0.200000, "o", "y"]
+    [0.300000, "o", "\\u001b[0m\\u001b[?7h\\u001b[?25h"]
+    """
+
+    def __init__(
+        self: Self,
+        f: TextIO,
+        width: int,
+        height: int,
+        frame_time: float,
+        timestamp: Optional[int] = None,
+    ) -> None:
+        if frame_time <= 0:
+            raise ValueError(f"argument frame_time is {frame_time}; expected > 0")
+        self._f = f
+        self.frame_time = frame_time
+        self.frames: int = 0
+        self.events: int = 0
+        header: dict = {
+            "version": ASCIICAST_VERSION,
+            "width": width,
+            "height": height,
+            "timestamp": int(time.time()) if timestamp is None else timestamp,
+            "env": {"TERM": TERM},
+        }
+        f.write(json.dumps(header) + "\n")
+
+    @property
+    def duration(self: Self) -> float:
+        """Seconds of playback written so far."""
+        return self.frames * self.frame_time
+
+    def write_frame(self: Self, data: bytes) -> None:
+        """Write the output of the next frame; frame `n` is stamped at ``n * frame_time`` so rounding does not add up."""
+        if data:
+            self._write_event(data)
+        self.frames += 1
+
+    def close(self: Self) -> None:
+        """Write the closing event resetting the attributes, enabling autowrap and showing the cursor after the last frame."""
+        self._write_event(RESTORE_TERMINAL)
+
+    def _write_event(self: Self, data: bytes) -> None:
+        # Frames consist of whole glyphs, so the UTF-8 always decodes
+        text: str = json.dumps(data.decode("utf-8"), ensure_ascii=False)
+        self._f.write(f'[{self.duration:.6f}, "o", {text}]\n')
+        self.events += 1
+
+
+class AsciicastWindow(AnsiWindow):
+    """
+    An ``AnsiWindow`` of a fixed size handing each frame to an ``AsciicastWriter`` instead of a terminal.
+
+    There is no input: ``getch`` returns ``-1`` for `frames` frames and then ``q``, like an exhausted ``HeadlessWindow`` script.
+    ``on_refresh`` is called with the window after each frame is written, e.g. to report progress.
+    """
+
+    def __init__(
+        self: Self,
+        writer: AsciicastWriter,
+        height: int,
+        width: int,
+        frames: int,
+        on_refresh: Optional[Callable[["AsciicastWindow"], None]] = None,
+    ) -> None:
+        super().__init__(-1, -1, (height, width))
+        self._writer = writer
+        self._on_refresh = on_refresh
+        self._keys_left: int = frames - 1
+        # Set up the terminal like `ansi_terminal` as part of the first frame
+        self._frame += HIDE_CURSOR + DISABLE_AUTOWRAP
+
+    def wait_for_input(self: Self, timeout: float) -> bool:
+        return False
+
+    def getch(self: Self) -> int:
+        if self._keys_left > 0:
+            self._keys_left -= 1
+            return -1
+        return KEY_QUIT
+
+    def refresh(self: Self) -> None:
+        self._writer.write_frame(bytes(self._frame))
+        self._frame.clear()
+        if self._on_refresh is not None:
+            self._on_refresh(self)
+
+
+class AsciicastScreen(AnsiScreen):
+    """An ``AnsiScreen`` writing `frames` frames to an asciicast file instead of a terminal."""
+
+    window: AsciicastWindow
+
+    def __init__(
+        self: Self,
+        writer: AsciicastWriter,
+        height: int,
+        width: int,
+        frames: int,
+        on_refresh: Optional[Callable[[AsciicastWindow], None]] = None,
+        buffered: bool = False,
+    ):
+        super().__init__(
+            buffered=buffered,
+            window=AsciicastWindow(writer, height, width, frames, on_refresh),
+        )
+
+
+def open_asciicast(path: str) -> TextIO:
+    """Open `path` for writing a cast with a write buffer of ``WRITE_BUFFER_SIZE`` bytes."""
+    return open(path, "w", encoding="utf-8", newline="\n", buffering=WRITE_BUFFER_SIZE)
@@ -0,0 +1,70 @@
+import time
+from collections.abc import Callable
+from typing import Self
+
+
+class MatrixBandwidthBudget:
+    """
+    A token bucket limiting the bytes sent to the terminal to `max_bytes_per_sec`.
+
+    Each frame's bytes are taken from the bucket, which refills at `max_bytes_per_sec`
+    and holds at most `burst_sec` seconds of bytes. A frame taking more than is left puts the bucket in debt;
+    ``delay`` is the time until the debt is paid off, which the loop waits before the next frame
+    so the terminal (or the pty buffer of an SSH session) is not flooded.
+
+    >>> clock = iter([0.0, 0.0, 1.0]).__next__
+    >>> budget = MatrixBandwidthBudget(1000, clock=clock)
+    >>> budget.record(1250)
+    >>> budget.over_budget, budget.delay()
+    (True, 1.0)
+    >>> budget.record(0)
+    >>> budget.over_budget
+    False
+    """
+
+    DEFAULT_BURST_SEC: float = 0.25
+
+    def __init__(
+        self: Self,
+        max_bytes_per_sec: int,
+        burst_sec: float = DEFAULT_BURST_SEC,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        if max_bytes_per_sec < 1:
+            raise ValueError(
+                f"argument max_bytes_per_sec is {max_bytes_per_sec}; expected >= 1"
+            )
+        if burst_sec <= 0:
+            raise ValueError(f"argument burst_sec is {burst_sec}; expected > 0")
+        self.max_bytes_per_sec = max_bytes_per_sec
+        self._capacity: float = max_bytes_per_sec * burst_sec
+        self._clock = clock
+        self._start: float = clock()
+        self._last: float = self._start
+        self._tokens: float = self._capacity
+        self.total_bytes: int = 0
+
+    def record(self: Self, frame_bytes: int) -> None:
+        """Take the bytes of a frame from the bucket."""
+        now: float = self._clock()
+        self._tokens = min(
+            self._capacity, self._tokens + (now - self._last) * self.max_bytes_per_sec
+        )
+        self._last = now
+        self._tokens -= frame_bytes
+        self.total_bytes += frame_bytes
+
+    @property
+    def over_budget(self: Self) -> bool:
+        """`True` if more bytes have been sent than the budget allows."""
+        return self._tokens < 0
+
+    def delay(self: Self) -> float:
+        """Seconds until the bytes sent are within budget again."""
+        return max(0.0, -self._tokens / self.max_bytes_per_sec)
+
+    @property
+    def throughput(self: Self) -> float:
+        """Bytes per second sent since the budget was created."""
+        elapsed: float = self._last - self._start
+        return self.total_bytes / elapsed if elapsed > 0 else 0.0
@@ -0,0 +1,476 @@
+"""
+Render many variants of the rain in parallel processes from a job manifest.
+
+The manifest is JSON: a list of jobs, each an object with a ``name`` and optionally
+``kind``, ``frames``, ``seed``, ``size``, ``color``, ``head_color``, ``background``, ``density`` and ``font``.
+``seed``, ``size`` and ``color`` may also be lists, which expand to one job per combination.
+
+.. code:: json
+
+  [
+    {"name": "tall", "kind": "record", "size": "80x60", "seed": [1, 2, 3]},
+    {"name": "hd", "kind": "raw", "size": "1920x1080", "frames": 600, "color": ["green", "cyan"]}
+  ]
+
+``record`` writes a recording for ``--replay`` and ``asciicast`` an asciicast file, both with ``size`` in cells;
+``raw`` writes RGB24 video frames and ``png`` a directory of PNG files, both with ``size`` in pixels.
+Jobs are seeded from the manifest, never from the worker, so a job gives the same output on any worker.
+
+Workers report their progress every ``PROGRESS_FRAMES`` frames.
+Outputs are written under a temporary name and renamed when complete;
+jobs whose output exists are skipped, so an interrupted batch resumes with the jobs it had not finished.
+Resuming is per job only: a job that was interrupted is run again from its first frame
+and its partial output is discarded, as frames are not written in chunks a job could continue from.
+
+.. code:: bash
+
+  python3 -m matrix_batch manifest.json -o library/ --jobs 8
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import random
+import shutil
+import sys
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, NamedTuple, Optional
+
+from matrix_rain import (
+    argument_parsing as rain_argument_parsing,
+    configure_screen,
+    rain_loop,
+    validate_positive,
+    validate_size,
+)
+from matrix_screen import VALID_COLORS
+
+KIND_RECORD: str = "record"
+KIND_ASCIICAST: str = "asciicast"
+KIND_RAW: str = "raw"
+KIND_PNG: str = "png"
+EXTENSIONS: dict[str, str] = {
+    KIND_RECORD: ".mdr",
+    KIND_ASCIICAST: ".cast",
+    KIND_RAW: ".rgb",
+    KIND_PNG: "",
+}
+"""Output file extension by job kind; ``png`` jobs write a directory."""
+
+PARTIAL_SUFFIX: str = ".part"
+"""Suffix of the output of a job while it is written; removed by the next run of the job."""
+PROGRESS_FRAMES: int = 500
+"""Frames between progress reports of a job."""
+PROGRESS_INTERVAL: float = 0.5
+"""Seconds between checks for progress reports and completed jobs."""
+DEFAULT_FRAMES: int = 1000
+NAME_SEPARATORS: frozenset[str] = frozenset(("/", "\\", os.sep, os.altsep or os.sep))
+"""Characters not allowed in job names, which are used as file names."""
+JOB_FIELDS: frozenset[str] = frozenset(
+    (
+        "name",
+        "kind",
+        "frames",
+        "seed",
+        "size",
+        "color",
+        "head_color",
+        "background",
+        "density",
+        "font",
+    )
+)
+
+
+class BatchJob(NamedTuple):
+    name: str
+    kind: str = KIND_RECORD
+    frames: int = DEFAULT_FRAMES
+    seed: int = 1
+    size: tuple[int, int] = (80, 24)
+    color: str = "green"
+    head_color: str = "white"
+    background: str = "black"
+    density: Optional[float] = None
+    font: Optional[str] = None
+
+    @property
+    def output(self) -> str:
+        return self.name + EXTENSIONS[self.kind]
+
+
+class JobResult(NamedTuple):
+    name: str
+    frames: int
+    bytes_written: int
+    seconds: float
+
+
+def _as_list(value) -> list:
+    return value if isinstance(value, list) else [value]
+
+
+def _parse_size(value) -> tuple[int, int]:
+    try:
+        return validate_size(str(value))
+    except argparse.ArgumentTypeError as e:
+        raise ValueError(str(e))
+
+
+def _validate_name(name: str) -> None:
+    # The name becomes a file name in the output directory; it must not lead out of it
+    if (
+        name in ("", ".")
+        or ".." in name
+        or any(separator in name for separator in NAME_SEPARATORS)
+    ):
+        raise ValueError(f"job name '{name}' is not a plain file name")
+
+
+def _validate_variants(entry: dict) -> None:
+    """Check the seeds and colors, which may be lists."""
+    for seed in _as_list(entry.get("seed", [])):
+        # A seed of 1.5 or true would be truncated to the seed of another job
+        if type(seed) is not int:
+            raise ValueError(
+                f"job '{entry['name']}' has seed {seed!r}; expected an integer"
+            )
+    for field in ("color", "head_color", "background"):
+        for color in _as_list(entry.get(field, [])):
+            if color not in VALID_COLORS:
+                raise ValueError(
+                    f"job '{entry['name']}' has {field} '{color}'; expected one of {sorted(VALID_COLORS)}"
+                )
+
+
+def _validate_entry(entry: dict) -> None:
+    if not isinstance(entry, dict) or not isinstance(entry.get("name"), str):
+        raise ValueError(f"job {entry!r} is not an object with a name")
+    _validate_name(entry["name"])
+    unknown: set[str] = set(entry) - JOB_FIELDS
+    if unknown:
+        raise ValueError(f"job '{entry['name']}' has unknown fields {sorted(unknown)}")
+    kind: str = entry.get("kind", KIND_RECORD)
+    if kind not in EXTENSIONS:
+        raise ValueError(
+            f"job '{entry['name']}' has kind '{kind}'; expected one of {sorted(EXTENSIONS)}"
+        )
+    frames = entry.get("frames", DEFAULT_FRAMES)
+    if type(frames) is not int or frames < 1:
+        raise ValueError(
+            f"job '{entry['name']}' has frames {frames!r}; expected a positive integer"
+        )
+    _validate_variants(entry)
+    density = entry.get("density")
+    if density is not None and not (
+        isinstance(density, (int, float)) and 0 < density <= 1
+    ):
+        raise ValueError(
+            f"job '{entry['name']}' has density {density!r}; expected above 0 and at most 1"
+        )
+
+
+def expand_job(entry: dict) -> list[BatchJob]:
+    """
+    The jobs of a manifest entry; lists of seeds, sizes and colors expand to one job each, named after what varies.
+
+    Raises `ValueError` for unknown fields or invalid values.
+
+    >>> [job.name for job in expand_job({"name": "rain", "seed": [1, 2], "size": "80x24"})]
+    ['rain-s1', 'rain-s2']
+    """
+    _validate_entry(entry)
+    seeds: list = _as_list(entry.get("seed", 1))
+    sizes: list = [_parse_size(size) for size in _as_list(entry.get("size", "80x24"))]
+    colors: list = _as_list(entry.get("color", "green"))
+    jobs: list[BatchJob] = []
+    for seed, size, color in itertools.product(seeds, sizes, colors):
+        name: str = entry["name"]
+        if len(sizes) > 1:
+            name += f"-{size[0]}x{size[1]}"
+        if len(colors) > 1:
+            name += f"-{color}"
+        if len(seeds) > 1:
+            name += f"-s{seed}"
+        jobs.append(
+            BatchJob(
+                name,
+                entry.get("kind", KIND_RECORD),
+                entry.get("frames", DEFAULT_FRAMES),
+                seed,
+                size,
+                color,
+                entry.get("head_color", "white"),
+                entry.get("background", "black"),
+                entry.get("density"),
+                entry.get("font"),
+            )
+        )
+    return jobs
+
+
+def load_manifest(path: str) -> list[BatchJob]:
+    """The jobs of a manifest file; raises `ValueError` if it is invalid or names a job twice."""
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+    if not isinstance(entries, list):
+        raise ValueError(f"manifest '{path}' is not a list of jobs")
+    jobs: list[BatchJob] = [job for entry in entries for job in expand_job(entry)]
+    names: set[str] = set()
+    for job in jobs:
+        if job.name in names:
+            raise ValueError(
+                f"manifest '{path}' has more than one job named '{job.name}'"
+            )
+        names.add(job.name)
+    return jobs
+
+
+def _output_size(path: str) -> int:
+    if os.path.isdir(path):
+        return sum(entry.stat().st_size for entry in os.scandir(path))
+    return os.path.getsize(path)
+
+
+def _remove_output(path: str) -> None:
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def _rain_arguments(job: BatchJob) -> argparse.Namespace:
+    argv: list[str] = [
+        "--seed",
+        str(job.seed),
+        "-c",
+        job.color,
+        "-H",
+        job.head_color,
+        "-b",
+        job.background,
+    ]
+    if job.density is not None:
+        argv += ["--density", str(job.density)]
+    return rain_argument_parsing(argv)
+
+
+def _frame_counter(job: BatchJob, progress: Optional[Any]) -> Callable[..., None]:
+    """A callback for every frame of `job` putting ``(name, frames)`` on the `progress` queue every ``PROGRESS_FRAMES`` frames."""
+    frames: list[int] = [0]
+
+    def count(*_) -> None:
+        frames[0] += 1
+        if progress is not None and frames[0] % PROGRESS_FRAMES == 0:
+            progress.put((job.name, frames[0]))
+
+    return count
+
+
+def _render_job(job: BatchJob, path: str, on_frame: Callable[..., None]) -> None:
+    # Imported here as NumPy is only needed by frame exports
+    from matrix_rain_characters import MatrixRainCharacters
+    from matrix_render import (
+        GlyphAtlas,
+        MatrixRenderer,
+        load_psf,
+        png_sink,
+        raw_sink,
+        render,
+    )
+
+    font = load_psf(job.font) if job.font else None
+    atlas = GlyphAtlas(
+        font,
+        MatrixRainCharacters.characters(),
+        job.head_color,
+        job.color,
+        job.background,
+    )
+    renderer = MatrixRenderer(atlas, *job.size)
+    with contextlib.ExitStack() as stack:
+        if job.kind == KIND_PNG:
+            sink = png_sink(path)
+        else:
+            sink = raw_sink(stack.enter_context(open(path, "wb")))
+
+        def write(frame) -> None:
+            sink(frame)
+            on_frame()
+
+        render(renderer, job.frames, write, random.Random(job.seed), job.density)
+
+
+def _write_job(job: BatchJob, path: str, on_frame: Callable[..., None]) -> None:
+    width, height = job.size
+    if job.kind == KIND_RECORD:
+        # Imported here as it is only needed by these jobs
+        from matrix_screen_headless import HeadlessScreen
+
+        args = _rain_arguments(job)
+        args.record = path
+        rain_loop(
+            configure_screen(
+                HeadlessScreen(height, width, [-1] * (job.frames - 1), on_frame), args
+            ),
+            args,
+            pace=False,
+        )
+    elif job.kind == KIND_ASCIICAST:
+        from matrix_asciicast import AsciicastScreen, AsciicastWriter, open_asciicast
+        from matrix_rain import sleep_timer
+
+        args = _rain_arguments(job)
+        with open_asciicast(path) as f:
+            writer = AsciicastWriter(f, width, height, sleep_timer.sleep_sec)
+            rain_loop(
+                configure_screen(
+                    AsciicastScreen(writer, height, width, job.frames, on_frame), args
+                ),
+                args,
+                pace=False,
+            )
+            writer.close()
+    else:
+        _render_job(job, path, on_frame)
+
+
+def run_job(job: BatchJob, directory: str, progress: Optional[Any] = None) -> JobResult:
+    """
+    Run `job` writing its output to `directory`; the output only appears under its final name when complete.
+
+    Progress is put on the `progress` queue, if any, as ``(name, frames)``.
+    A job that fails leaves no partial output behind.
+    """
+    final: str = os.path.join(directory, job.output)
+    path: str = final + PARTIAL_SUFFIX
+    _remove_output(path)
+    start: float = time.perf_counter()
+    try:
+        _write_job(job, path, _frame_counter(job, progress))
+    except BaseException:
+        _remove_output(path)
+        raise
+    os.replace(path, final)
+    return JobResult(
+        job.name, job.frames, _output_size(final), time.perf_counter() - start
+    )
+
+
+def run_batch(
+    jobs: Sequence[BatchJob],
+    directory: str,
+    workers: Optional[int] = None,
+    progress=sys.stderr,
+) -> tuple[list[JobResult], list[str]]:
+    """
+    Run the `jobs` whose output is missing in a pool of `workers` processes (default all cores).
+
+    Progress is written to `progress` every ``PROGRESS_FRAMES`` frames of a job and as jobs complete.
+    Returns the results of the jobs run and the names of the jobs that failed.
+    """
+    os.makedirs(directory, exist_ok=True)
+    pending: list[BatchJob] = [
+        job for job in jobs if not os.path.exists(os.path.join(directory, job.output))
+    ]
+    skipped: int = len(jobs) - len(pending)
+    if skipped:
+        print(
+            f"skipping {skipped} of {len(jobs)} jobs with complete output",
+            file=progress,
+        )
+
+    results: list[JobResult] = []
+    failed: list[str] = []
+    with multiprocessing.Manager() as manager, ProcessPoolExecutor(workers) as executor:
+        reports = manager.Queue()
+        futures: dict[Future, BatchJob] = {
+            executor.submit(run_job, job, directory, reports): job for job in pending
+        }
+        frames: dict[str, int] = {job.name: job.frames for job in pending}
+        not_done = set(futures)
+        while not_done:
+            done, not_done = wait(not_done, PROGRESS_INTERVAL, FIRST_COMPLETED)
+            try:
+                while True:
+                    name, count = reports.get_nowait()
+                    print(f"{name}: {count}/{frames[name]} frames", file=progress)
+            except queue.Empty:
+                pass
+            for future in done:
+                job: BatchJob = futures[future]
+                try:
+                    result: JobResult = future.result()
+                except Exception as e:
+                    failed.append(job.name)
+                    print(
+                        f"[{len(results) + len(failed)}/{len(pending)}] {job.name} failed: {e}",
+                        file=progress,
+                    )
+                    continue
+                results.append(result)
+                print(
+                    f"[{len(results) + len(failed)}/{len(pending)}] {result.name}: "
+                    f"{result.frames} frames in {result.seconds:.2f} s ({result.frames / result.seconds:.1f} fps)",
+                    file=progress,
+                )
+    return results, failed
+
+
+def summary(results: Sequence[JobResult], elapsed: float) -> str:
+    """Throughput of a batch; the speedup is the work done by the workers over the wall clock time."""
+    if not results:
+        return "no jobs run"
+    frames: int = sum(result.frames for result in results)
+    work: float = sum(result.seconds for result in results)
+    output: int = sum(result.bytes_written for result in results)
+    return (
+        f"{len(results)} jobs, {frames} frames in {elapsed:.2f} s: {frames / elapsed:.1f} fps, "
+        f"{output / elapsed / 1e6:.1f} MB/s, speedup {work / elapsed:.1f}x"
+    )
+
+
+def argument_parsing(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Render matrix rain variants in parallel."
+    )
+    parser.add_argument("manifest", help="JSON job manifest")
+    parser.add_argument(
+        "-o",
+        "--output",
+        dest="output",
+        default=".",
+        help="Directory for the outputs.  Default is the current directory",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        dest="workers",
+        type=validate_positive,
+        default=None,
+        help="Number of worker processes.  Default is the number of cores",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args: argparse.Namespace = argument_parsing(argv)
+    try:
+        jobs: list[BatchJob] = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        sys.exit(str(e))
+    start: float = time.perf_counter()
+    results, failed = run_batch(jobs, args.output, args.workers)
+    print(summary(results, time.perf_counter() - start))
+    if failed:
+        sys.exit(f"{len(failed)} jobs failed: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Benchmarks for the rain simulation and render pipeline.
+
+Runs on the headless screen across a grid of screen sizes and activation rates with fixed seeds
+and writes the results as JSON, so runs from different commits can be compared.
+
+.. code:: bash
+
+  python3 -m matrix_benchmark --output bench.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from collections.abc import Sequence
+from typing import NamedTuple, Optional
+
+from matrix_rain import (
+    ENGINE_OBJECTS,
+    VALID_ENGINES,
+    create_trails,
+    process_engine_trails,
+    validate_positive,
+    validate_size,
+)
+from matrix_rain_characters import MatrixRainCharacters
+from matrix_rain_trails import MatrixRainTrails
+from matrix_screen_headless import HeadlessScreen
+from random_list import RandomList
+
+SCREEN_SIZES: tuple[tuple[int, int], ...] = (
+    (80, 24),
+    (200, 60),
+    (400, 100),
+    (1000, 300),
+)
+"""Screen sizes as ``(width, height)``."""
+
+ACTIVATION_RATES: tuple[int, ...] = (1, 2, 8)
+"""Trails activated per frame."""
+
+SEED: int = 1
+MIN_AVAILABLE_COLUMNS: int = 1
+
+
+class BenchmarkResult(NamedTuple):
+    name: str
+    width: int
+    height: int
+    rate: int
+    operations: int
+    seconds: float
+
+    def as_dict(self) -> dict:
+        result = self._asdict()
+        result["ns_per_operation"] = (
+            self.seconds * 1e9 / self.operations if self.operations else 0.0
+        )
+        return result
+
+
+def bench_frames(
+    width: int,
+    height: int,
+    rate: int,
+    frames: int,
+    engine: str = ENGINE_OBJECTS,
+) -> list[BenchmarkResult]:
+    """Times `activate_if_available`, `process_trails` and full frames (including `refresh`)."""
+    rng = random.Random(SEED)
+    mscreen = HeadlessScreen(height, width)
+    matrix_rain_trails = create_trails(engine, width, height, rng)
+    char_itr = MatrixRainCharacters(rng=rng)
+
+    activate_ns: int = 0
+    process_ns: int = 0
+    frame_ns: int = 0
+    for _ in range(frames):
+        start: int = time.perf_counter_ns()
+        matrix_rain_trails.activate_if_available(rate, MIN_AVAILABLE_COLUMNS)
+        activated: int = time.perf_counter_ns()
+        process_engine_trails(mscreen, matrix_rain_trails, char_itr)
+        processed: int = time.perf_counter_ns()
+        mscreen.refresh()
+        refreshed: int = time.perf_counter_ns()
+
+        activate_ns += activated - start
+        process_ns += processed - activated
+        frame_ns += refreshed - start
+
+    return [
+        BenchmarkResult(
+            "activate_if_available", width, height, rate, frames, activate_ns / 1e9
+        ),
+        BenchmarkResult(
+            "process_trails", width, height, rate, frames, process_ns / 1e9
+        ),
+        BenchmarkResult("frame", width, height, rate, frames, frame_ns / 1e9),
+    ]
+
+
+def bench_step(width: int, height: int, rate: int, ticks: int) -> BenchmarkResult:
+    """Times the render-free `MatrixRainTrails.step` from an already filled screen."""
+    matrix_rain_trails = MatrixRainTrails(width, height, random.Random(SEED))
+    matrix_rain_trails.step(height, rate, MIN_AVAILABLE_COLUMNS)
+    start: int = time.perf_counter_ns()
+    matrix_rain_trails.step(ticks, rate, MIN_AVAILABLE_COLUMNS)
+    elapsed: int = time.perf_counter_ns() - start
+    return BenchmarkResult("step", width, height, rate, ticks, elapsed / 1e9)
+
+
+def bench_random_list(width: int, operations: int) -> BenchmarkResult:
+    """Times pairs of `pop_random` and `append` on a half full list."""
+    random_list = RandomList(width, random.Random(SEED))
+    popped: list[int] = [random_list.pop_random() for _ in range(width // 2)]
+    start: int = time.perf_counter_ns()
+    for i in range(operations):
+        random_list.append(popped[i % len(popped)])
+        popped[i % len(popped)] = random_list.pop_random()
+    elapsed: int = time.perf_counter_ns() - start
+    return BenchmarkResult(
+        "random_list_pop_append", width, 0, 0, operations, elapsed / 1e9
+    )
+
+
+def bench_retirement(width: int, height: int, cycles: int) -> BenchmarkResult:
+    """Times `replenish_exhausted` when every column's trail is retired in the same frame."""
+    matrix_rain_trails = MatrixRainTrails(width, height, random.Random(SEED))
+    elapsed: int = 0
+    for _ in range(cycles):
+        matrix_rain_trails.activate_if_available(width, MIN_AVAILABLE_COLUMNS)
+        for trail in matrix_rain_trails.active_trails:
+            matrix_rain_trails.exhaust(trail)
+        start: int = time.perf_counter_ns()
+        matrix_rain_trails.replenish_exhausted()
+        elapsed += time.perf_counter_ns() - start
+    return BenchmarkResult(
+        "retire_trail", width, height, 0, cycles * width, elapsed / 1e9
+    )
+
+
+def bench_characters(operations: int) -> BenchmarkResult:
+    """Times `next()` on `MatrixRainCharacters`."""
+    char_itr = MatrixRainCharacters(rng=random.Random(SEED))
+    start: int = time.perf_counter_ns()
+    for _ in range(operations):
+        next(char_itr)
+    elapsed: int = time.perf_counter_ns() - start
+    return BenchmarkResult("characters_next", 0, 0, 0, operations, elapsed / 1e9)
+
+
+def run(
+    sizes: Sequence[tuple[int, int]] = SCREEN_SIZES,
+    rates: Sequence[int] = ACTIVATION_RATES,
+    frames: int = 200,
+    operations: int = 100_000,
+    engine: str = ENGINE_OBJECTS,
+) -> dict:
+    """Runs all benchmarks and returns the results in a JSON serializable form."""
+    results: list[BenchmarkResult] = []
+    for width, height in sizes:
+        for rate in rates:
+            results.extend(bench_frames(width, height, rate, frames, engine))
+            results.append(bench_step(width, height, rate, frames))
+        results.append(bench_random_list(width, operations))
+        results.append(bench_retirement(width, height, max(1, frames // 10)))
+    results.append(bench_characters(operations))
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "engine": engine,
+        "seed": SEED,
+        "frames": frames,
+        "results": [result.as_dict() for result in results],
+    }
+
+
+def argument_parsing(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Benchmark the matrix rain."
+    )
+    parser.add_argument(
+        "--size",
+        dest="sizes",
+        type=validate_size,
+        action="append",
+        metavar="WIDTHxHEIGHT",
+        help="Screen size to run; can be repeated.  Default is 80x24 up to 1000x300",
+    )
+    parser.add_argument(
+        "--rate",
+        dest="rates",
+        type=validate_positive,
+        action="append",
+        help="Trails activated per frame; can be repeated.  Default is 1, 2, and 8",
+    )
+    parser.add_argument(
+        "--frames",
+        dest="frames",
+        type=validate_positive,
+        default=200,
+        help="Frames per size and rate.  Default is 200",
+    )
+    parser.add_argument(
+        "--operations",
+        dest="operations",
+        type=validate_positive,
+        default=100_000,
+        help="Operations for the micro benchmarks.  Default is 100000",
+    )
+    parser.add_argument(
+        "--engine",
+        dest="engine",
+        choices=VALID_ENGINES,
+        default=ENGINE_OBJECTS,
+        help="Trail engine to benchmark.  Default is objects",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        dest="output",
+        default=None,
+        help="Write JSON results to file.  Default is standard output",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args: argparse.Namespace = argument_parsing(argv)
+    results: dict = run(
+        args.sizes or SCREEN_SIZES,
+        args.rates or ACTIVATION_RATES,
+        args.frames,
+        args.operations,
+        args.engine,
+    )
+    if args.output is None:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
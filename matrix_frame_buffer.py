@@ -0,0 +1,77 @@
+from collections.abc import Callable
+from typing import NamedTuple, Self
+
+
+class FrameStats(NamedTuple):
+    """Counts for one or more flushed frames."""
+
+    writes: int
+    """``addstr`` requests recorded."""
+    cells: int
+    """Distinct cells written to the screen."""
+    calls: int
+    """``addstr`` calls made on the screen."""
+
+
+class MatrixFrameBuffer:
+    """
+    Collects the cells changed during a frame and writes them in as few calls as possible.
+
+    A cell written more than once in a frame is only written with its last value,
+    e.g. a blank that lands where a new head is drawn.
+    Runs of adjacent cells on a line with the same attribute are written with one call.
+
+    >>> fb = MatrixFrameBuffer()
+    >>> fb.addstr(0, 1, "b", 9)
+    >>> fb.addstr(0, 0, "a", 9)
+    >>> fb.addstr(0, 1, "c", 9)
+    >>> fb.flush(lambda y, x, s, attr: print(y, x, s, attr))
+    0 0 ac 9
+    FrameStats(writes=3, cells=2, calls=1)
+    """
+
+    def __init__(self: Self) -> None:
+        self._cells: dict[tuple[int, int], tuple[str, int]] = {}
+        self._writes: int = 0
+        self.last_frame: FrameStats = FrameStats(0, 0, 0)
+        self.totals: FrameStats = FrameStats(0, 0, 0)
+        self.frames: int = 0
+
+    def __len__(self: Self) -> int:
+        """Return the number of cells pending for the frame."""
+        return len(self._cells)
+
+    def addstr(self: Self, y_coord: int, x_coord: int, s: str, attr: int) -> None:
+        self._writes += 1
+        for offset, char in enumerate(s):
+            self._cells[(y_coord, x_coord + offset)] = (char, attr)
+
+    def discard(self: Self) -> None:
+        """Forget pending cells, e.g. when the screen is erased."""
+        self._cells.clear()
+        self._writes = 0
+
+    def flush(self: Self, write: Callable[[int, int, str, int], None]) -> FrameStats:
+        """Write pending cells as runs using `write(y, x, s, attr)` and return the counts for the frame."""
+        calls: int = 0
+        run_y: int = -1
+        run_x: int = -1
+        run_attr: int = 0
+        run_chars: list[str] = []
+        for (y, x), (char, attr) in sorted(self._cells.items()):
+            if y == run_y and x == run_x + len(run_chars) and attr == run_attr:
+                run_chars.append(char)
+                continue
+            if run_chars:
+                write(run_y, run_x, "".join(run_chars), run_attr)
+                calls += 1
+            run_y, run_x, run_attr, run_chars = y, x, attr, [char]
+        if run_chars:
+            write(run_y, run_x, "".join(run_chars), run_attr)
+            calls += 1
+
+        self.last_frame = FrameStats(self._writes, len(self._cells), calls)
+        self.totals = FrameStats(*(a + b for a, b in zip(self.totals, self.last_frame)))
+        self.frames += 1
+        self.discard()
+        return self.last_frame
@@ -0,0 +1,191 @@
+from array import array
+from typing import Optional, Self
+
+from matrix_bandwidth import MatrixBandwidthBudget
+from matrix_screen import BLANK, COLOR_PAIR_HEAD, MatrixScreen
+
+
+class FrameTimeHistogram:
+    """
+    Rolling histogram of the last `window` frame times.
+
+    Frame times are counted in `bins` bins of `bin_width` seconds; longer frames go in the last bin.
+    The bin of each recorded frame is kept in a ring, so the oldest frame is uncounted
+    when the window is full. All storage is allocated up front; ``record`` does not allocate.
+
+    >>> histogram = FrameTimeHistogram(window=4)
+    >>> for frame_time in (0.010, 0.010, 0.020, 0.100):
+    ...     histogram.record(frame_time)
+    >>> print(f"{histogram.percentile(50) * 1000:.2f} {histogram.percentile(99) * 1000:.2f}")
+    10.25 100.25
+    """
+
+    DEFAULT_BIN_WIDTH: float = 0.00025
+    DEFAULT_BINS: int = 1024
+    DEFAULT_WINDOW: int = 256
+
+    def __init__(
+        self: Self,
+        bin_width: float = DEFAULT_BIN_WIDTH,
+        bins: int = DEFAULT_BINS,
+        window: int = DEFAULT_WINDOW,
+    ) -> None:
+        if bin_width <= 0:
+            raise ValueError(f"argument bin_width is {bin_width}; expected > 0")
+        if bins < 1:
+            raise ValueError(f"argument bins is {bins}; expected >= 1")
+        if window < 1:
+            raise ValueError(f"argument window is {window}; expected >= 1")
+        self._bin_width = bin_width
+        self._counts = array("I", [0]) * bins
+        self._ring_bins = array("I", [0]) * window
+        self._ring_times = array("d", [0.0]) * window
+        self._recorded: int = 0
+        self._total_time: float = 0.0
+
+    def __len__(self: Self) -> int:
+        """Return the number of frame times in the window."""
+        return min(self._recorded, len(self._ring_bins))
+
+    def record(self: Self, frame_time: float) -> None:
+        """Count a frame that took `frame_time` seconds."""
+        bin_index: int = min(int(frame_time / self._bin_width), len(self._counts) - 1)
+        slot: int = self._recorded % len(self._ring_bins)
+        if self._recorded >= len(self._ring_bins):
+            self._counts[self._ring_bins[slot]] -= 1
+            self._total_time -= self._ring_times[slot]
+        self._counts[bin_index] += 1
+        self._ring_bins[slot] = bin_index
+        self._ring_times[slot] = frame_time
+        self._total_time += frame_time
+        self._recorded += 1
+
+    def percentile(self: Self, percent: float) -> float:
+        """The upper bound in seconds of the bin holding the `percent` percentile; 0 if nothing is recorded."""
+        count: int = len(self)
+        if count == 0:
+            return 0.0
+        rank: float = count * percent / 100
+        seen: int = 0
+        for bin_index, bin_count in enumerate(self._counts):
+            seen += bin_count
+            if seen >= rank and seen > 0:
+                return (bin_index + 1) * self._bin_width
+        return len(self._counts) * self._bin_width
+
+    @property
+    def fps(self: Self) -> float:
+        """Frames per second over the window."""
+        if self._total_time <= 0:
+            return 0.0
+        return len(self) / self._total_time
+
+
+class MatrixHud:
+    """
+    A heads-up display of performance numbers drawn in the upper right corner of the screen.
+
+    While visible the corner is reserved on the screen, so trails are not drawn over it.
+    With a `bandwidth` budget the kB/s shown is the throughput it measured, i.e. the bytes actually sent;
+    otherwise it is estimated from the bytes of the last frame and the frame rate.
+    """
+
+    LABEL_WIDTH: int = 7
+    VALUE_WIDTH: int = 9
+    WIDTH: int = LABEL_WIDTH + VALUE_WIDTH
+    LABELS: tuple[str, ...] = (
+        "fps",
+        "p50 ms",
+        "p99 ms",
+        "trails",
+        "avail",
+        "cells",
+        "kB/s",
+    )
+
+    def __init__(
+        self: Self,
+        histogram: Optional[FrameTimeHistogram] = None,
+        bandwidth: Optional[MatrixBandwidthBudget] = None,
+    ) -> None:
+        self.histogram: FrameTimeHistogram = (
+            histogram if histogram is not None else FrameTimeHistogram()
+        )
+        self.bandwidth = bandwidth
+        self.visible: bool = False
+        self._cells_written: int = 0
+        self._cells_seen: int = 0
+        self._frame_bytes: int = 0
+        # Lines, column and width of the region drawn last; blanked when hidden or moved by a resize
+        self._drawn: Optional[tuple[int, int, int]] = None
+
+    def record_frame(self: Self, frame_time: float, mscreen: MatrixScreen) -> None:
+        """Count a frame that took `frame_time` seconds; call once per frame."""
+        self.histogram.record(frame_time)
+        self._cells_written = mscreen.cells_written - self._cells_seen
+        self._cells_seen = mscreen.cells_written
+        self._frame_bytes = mscreen.last_frame_bytes
+
+    def toggle(self: Self, mscreen: MatrixScreen) -> None:
+        """Show or hide the HUD."""
+        self.visible = not self.visible
+        if not self.visible:
+            self.hide(mscreen)
+
+    def hide(self: Self, mscreen: MatrixScreen) -> None:
+        """Blank the drawn region and release the corner."""
+        self._blank(mscreen)
+        mscreen.reserve(0, 0)
+
+    def _blank(self: Self, mscreen: MatrixScreen) -> None:
+        if self._drawn is None:
+            return
+        lines, x_coord, width = self._drawn
+        self._drawn = None
+        attr: int = mscreen.color_pair(COLOR_PAIR_HEAD)
+        # The screen may have shrunk since; blank what is left of the region
+        for y_coord in range(min(lines, mscreen.height)):
+            blank_width: int = min(width, mscreen.width - x_coord)
+            if blank_width > 0:
+                mscreen.addstr_reserved(y_coord, x_coord, BLANK * blank_width, attr)
+
+    def lines(self: Self, active_trails: int, available_columns: int) -> list[str]:
+        """The lines of the HUD for the current numbers."""
+        histogram: FrameTimeHistogram = self.histogram
+        bytes_per_sec: float = (
+            self._frame_bytes * histogram.fps
+            if self.bandwidth is None
+            else self.bandwidth.throughput
+        )
+        values: tuple[str, ...] = (
+            f"{histogram.fps:.1f}",
+            f"{histogram.percentile(50) * 1000:.2f}",
+            f"{histogram.percentile(99) * 1000:.2f}",
+            str(active_trails),
+            str(available_columns),
+            str(self._cells_written),
+            f"{bytes_per_sec / 1000:.1f}",
+        )
+        return [
+            f"{label:<{MatrixHud.LABEL_WIDTH}}{value:>{MatrixHud.VALUE_WIDTH}}"
+            for label, value in zip(MatrixHud.LABELS, values)
+        ]
+
+    def draw(
+        self: Self, mscreen: MatrixScreen, active_trails: int, available_columns: int
+    ) -> None:
+        """Reserve the corner and draw the HUD if visible."""
+        if not self.visible:
+            return
+        width: int = min(MatrixHud.WIDTH, mscreen.width - 1)
+        x_coord: int = mscreen.width - width
+        lines: int = min(len(MatrixHud.LABELS), mscreen.height - 1)
+        if self._drawn != (lines, x_coord, width):
+            self._blank(mscreen)
+            mscreen.reserve(lines, width)
+            self._drawn = (lines, x_coord, width)
+        attr: int = mscreen.color_pair(COLOR_PAIR_HEAD)
+        for y_coord, line in enumerate(
+            self.lines(active_trails, available_columns)[:lines]
+        ):
+            mscreen.addstr_reserved(y_coord, x_coord, line[-width:], attr)
@@ -0,0 +1,88 @@
+import math
+from typing import Optional, Self
+
+
+class MatrixLoadController:
+    """
+    Decides how many trails to activate each frame.
+
+    Without a `density` a fixed ``DEFAULT_TO_ACTIVATE`` trails are activated per frame.
+    With a `density` (fraction of columns with an active trail) trails are activated until
+    that fraction of the screen width is active; the activations are spread over the frames
+    it takes a trail to fall down the screen, so the trails do not start as one wave.
+
+    With a `budget` (seconds of work per frame, not counting the sleep) the measured frame cost
+    is smoothed and compared with the budget. With a `max_churn` (fraction of the screen cells
+    changed per frame) the glyph churn is smoothed and compared with it, so a slow terminal is
+    relieved before the frames it cannot keep up with show in the frame cost.
+    While over either budget (or over the output bandwidth budget) the activations are scaled down
+    by ``BACKOFF``, which lowers the density and with it the number of cells changed per frame;
+    while within budget the scale recovers by ``RECOVERY`` per frame.
+
+    >>> controller = MatrixLoadController(density=0.5)
+    >>> controller.to_activate(active=0, width=100, height=50)
+    2
+    >>> controller.to_activate(active=49, width=100, height=50)
+    1
+    >>> controller.to_activate(active=50, width=100, height=50)
+    0
+    """
+
+    DEFAULT_TO_ACTIVATE: int = 2
+    MIN_SCALE: float = 0.05
+    BACKOFF: float = 0.8
+    RECOVERY: float = 0.02
+    SMOOTHING: float = 0.25
+    """Weight of the latest frame in the smoothed frame cost and churn."""
+
+    def __init__(
+        self: Self,
+        density: Optional[float] = None,
+        budget: Optional[float] = None,
+        max_churn: Optional[float] = None,
+    ) -> None:
+        if density is not None and not 0 < density <= 1:
+            raise ValueError(f"argument density is {density}; expected > 0 and <= 1")
+        if budget is not None and budget <= 0:
+            raise ValueError(f"argument budget is {budget}; expected > 0")
+        if max_churn is not None and not 0 < max_churn <= 1:
+            raise ValueError(
+                f"argument max_churn is {max_churn}; expected > 0 and <= 1"
+            )
+        self.density = density
+        self.budget = budget
+        self.max_churn = max_churn
+        self.scale: float = 1.0
+        self.frame_cost: float = 0.0
+        self.churn: float = 0.0
+
+    def to_activate(self: Self, active: int, width: int, height: int) -> int:
+        """The number of trails to activate this frame with `active` trails on a `width` x `height` screen."""
+        if self.density is None:
+            return round(MatrixLoadController.DEFAULT_TO_ACTIVATE * self.scale)
+        target: float = self.density * self.scale * width
+        deficit: int = math.ceil(target) - active
+        if deficit <= 0:
+            return 0
+        # A trail lives about `height` frames; activate twice the steady rate to fill the screen
+        per_frame: int = max(1, math.ceil(2 * target / height))
+        return min(deficit, per_frame)
+
+    def record_frame_cost(
+        self: Self, cost: float, over_bandwidth: bool = False, churn: float = 0.0
+    ) -> None:
+        """Adjust the scale of activations after a frame whose work took `cost` seconds and changed `churn` of the cells."""
+        over_budget: bool = over_bandwidth
+        if self.budget is not None:
+            self.frame_cost += MatrixLoadController.SMOOTHING * (cost - self.frame_cost)
+            over_budget = over_budget or self.frame_cost > self.budget
+        if self.max_churn is not None:
+            self.churn += MatrixLoadController.SMOOTHING * (churn - self.churn)
+            over_budget = over_budget or self.churn > self.max_churn
+        if over_budget:
+            self.scale = max(
+                MatrixLoadController.MIN_SCALE,
+                self.scale * MatrixLoadController.BACKOFF,
+            )
+        else:
+            self.scale = min(1.0, self.scale + MatrixLoadController.RECOVERY)
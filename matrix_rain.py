@@ -1,10 +1,15 @@
 import argparse
 import curses
-from collections.abc import Sequence
-from typing import Optional
+import random
+import time
+from collections.abc import Callable, Sequence
+from typing import TYPE_CHECKING, BinaryIO, Optional, TypeVar, Union
 
 import _curses  # to be able to catch the proper exception
 
+from matrix_bandwidth import MatrixBandwidthBudget
+from matrix_hud import MatrixHud
+from matrix_load_controller import MatrixLoadController
 from matrix_rain_characters import MatrixRainCharacters
 from matrix_rain_trail import MatrixRainTrail
 from matrix_rain_trails import MatrixRainTrails
@@ -17,38 +22,44 @@ from matrix_screen import (
     MatrixScreen,
 )
 from matrix_sleep_timer import MatrixSleepTimer
+from matrix_trace import MatrixTracer, NullTracer, Phase
+
+if TYPE_CHECKING:
+    from matrix_rain_trail_arrays import MatrixRainTrailArrays
 
 sleep_timer: MatrixSleepTimer = MatrixSleepTimer(0.1, 1.6)
 """Determines sleep interval to regulate rain trail descent on screen."""
 
 
-class MatrixRainException(Exception):
-    pass
-
-
-def head_at_lower_right_corner(scr: MatrixScreen, trail: MatrixRainTrail) -> bool:
-    """
-    `True` if position is at the bottom right corner of screen; otherwise `False`.
+ENGINE_OBJECTS: str = "objects"
+ENGINE_ARRAYS: str = "arrays"
+VALID_ENGINES: tuple[str, ...] = (ENGINE_OBJECTS, ENGINE_ARRAYS)
+"""Trail engines selectable with ``--engine``; ``arrays`` requires NumPy."""
 
-    If `curses` add a char at bottom right corner the cursor will be moved outside the screen and raise an error.
-    """
-    return scr.at_lower_right_corner(trail.head_start(), trail.column_number)
+BACKEND_CURSES: str = "curses"
+BACKEND_ANSI: str = "ansi"
+VALID_BACKENDS: tuple[str, ...] = (BACKEND_CURSES, BACKEND_ANSI)
+"""Output backends selectable with ``--backend``; ``ansi`` writes escape sequences directly to the terminal."""
 
+DEFAULT_ASCIICAST_SIZE: tuple[int, int] = (80, 24)
+"""Size of ``--asciicast`` exports without ``--headless``, as ``(width, height)``."""
 
-def tail_at_lower_right_corner(scr: MatrixScreen, trail: MatrixRainTrail) -> bool:
-    """
-    `True` if position is at the bottom right corner of screen; otherwise `False`.
 
-    If `curses` add a char at bottom right corner the cursor will be moved outside the screen and raise an error.
-    """
-    return scr.at_lower_right_corner(trail.tail_start(), trail.column_number)
+class MatrixRainException(Exception):
+    pass
 
 
 def setup_screen(
     screen: curses.window,
     args: argparse.Namespace,
 ) -> MatrixScreen:
-    mscreen: MatrixScreen = MatrixScreen(screen)
+    return configure_screen(MatrixScreen(screen, args.buffered), args)
+
+
+def configure_screen(
+    mscreen: MatrixScreen,
+    args: argparse.Namespace,
+) -> MatrixScreen:
     # Read from parsed arguments
     args_color: str = str(args.color)  # tail color
     args_background: str = str(args.background)
@@ -61,35 +72,32 @@ def process_trail(
     mscreen: MatrixScreen,
     matrix_rain_trails: MatrixRainTrails,
     active_trail: MatrixRainTrail,
+    char_itr: MatrixRainCharacters,
 ) -> None:
 
-    char_itr: MatrixRainCharacters = MatrixRainCharacters()
-
     #
     # Head becomes tail ()
     #
 
-    if not head_at_lower_right_corner(mscreen, active_trail):
-        if active_trail.is_head_visible():
-            mscreen.addstr(
-                active_trail.head_start(),
-                active_trail.column_number,
-                next(char_itr),
-                curses.color_pair(COLOR_PAIR_TAIL),
-            )
+    if active_trail.is_head_visible():
+        mscreen.addstr(
+            active_trail.head_start(),
+            active_trail.column_number,
+            next(char_itr),
+            mscreen.color_pair(COLOR_PAIR_TAIL),
+        )
 
     #
     # Tail becomes 'blank'
     #
 
-    if not tail_at_lower_right_corner(mscreen, active_trail):
-        if active_trail.is_tail_visible():
-            mscreen.addstr(
-                active_trail.tail_start(),
-                active_trail.column_number,
-                BLANK,
-                curses.color_pair(COLOR_PAIR_TAIL),
-            )
+    if active_trail.is_tail_visible():
+        mscreen.addstr(
+            active_trail.tail_start(),
+            active_trail.column_number,
+            BLANK,
+            mscreen.color_pair(COLOR_PAIR_TAIL),
+        )
 
     #
     # move forward
@@ -106,23 +114,23 @@ def process_trail(
     # New head
     #
 
-    if not head_at_lower_right_corner(mscreen, active_trail):
-        if active_trail.is_head_visible():
-            mscreen.addstr(
-                active_trail.head_start(),
-                active_trail.column_number,
-                next(char_itr),
-                curses.color_pair(COLOR_PAIR_HEAD),
-            )
+    if active_trail.is_head_visible():
+        mscreen.addstr(
+            active_trail.head_start(),
+            active_trail.column_number,
+            next(char_itr),
+            mscreen.color_pair(COLOR_PAIR_HEAD),
+        )
 
 
 def process_trails(
     mscreen: MatrixScreen,
     matrix_rain_trails: MatrixRainTrails,
+    char_itr: MatrixRainCharacters,
 ) -> None:
     for active_trail in matrix_rain_trails.active_trails:
         try:
-            process_trail(mscreen, matrix_rain_trails, active_trail)
+            process_trail(mscreen, matrix_rain_trails, active_trail, char_itr)
             # Some trails can have been moved off screen and are marked as exhausted
         except _curses.error as e:
             msg: str = (
@@ -133,6 +141,61 @@ def process_trails(
     matrix_rain_trails.replenish_exhausted()
 
 
+def process_trail_arrays(
+    mscreen: MatrixScreen,
+    trail_arrays: "MatrixRainTrailArrays",
+    char_itr: MatrixRainCharacters,
+) -> None:
+    """Vectorized counterpart of `process_trails` for `MatrixRainTrailArrays`."""
+
+    step = trail_arrays.step()
+    glyphs: list[str] = char_itr.take(step.glyph_count)
+
+    tail_attr: int = mscreen.color_pair(COLOR_PAIR_TAIL)
+    head_attr: int = mscreen.color_pair(COLOR_PAIR_HEAD)
+
+    # Head becomes tail
+    for y, x, g in zip(
+        step.retire_y.tolist(), step.retire_x.tolist(), step.retire_glyph.tolist()
+    ):
+        mscreen.addstr(y, x, glyphs[g], tail_attr)
+    # Tail becomes 'blank'
+    for y, x in zip(step.blank_y.tolist(), step.blank_x.tolist()):
+        mscreen.addstr(y, x, BLANK, tail_attr)
+    # New head
+    for y, x, g in zip(
+        step.head_y.tolist(), step.head_x.tolist(), step.head_glyph.tolist()
+    ):
+        mscreen.addstr(y, x, glyphs[g], head_attr)
+
+
+def process_engine_trails(
+    mscreen: MatrixScreen,
+    matrix_rain_trails: Union[MatrixRainTrails, "MatrixRainTrailArrays"],
+    char_itr: MatrixRainCharacters,
+) -> None:
+    """Processes one frame of trails with the function matching the trail engine."""
+    if isinstance(matrix_rain_trails, MatrixRainTrails):
+        process_trails(mscreen, matrix_rain_trails, char_itr)
+    else:
+        process_trail_arrays(mscreen, matrix_rain_trails, char_itr)
+
+
+def create_trails(
+    engine: str,
+    width: int,
+    height: int,
+    rng: Optional[random.Random] = None,
+) -> Union[MatrixRainTrails, "MatrixRainTrailArrays"]:
+    """Creates the trail engine selected by name."""
+    if engine == ENGINE_ARRAYS:
+        # Imported here as NumPy is only needed by this engine
+        from matrix_rain_trail_arrays import MatrixRainTrailArrays
+
+        return MatrixRainTrailArrays(width, height, rng)
+    return MatrixRainTrails(width, height, rng)
+
+
 def main_loop(
     screen: curses.window,
     args: argparse.Namespace,
@@ -143,13 +206,126 @@ def main_loop(
     """
 
     mscreen: MatrixScreen = setup_screen(screen, args)
+    run_loop(mscreen, args)
 
-    # ---
 
-    matrix_rain_trails = MatrixRainTrails(mscreen.width, mscreen.height)
+def change_speed(mscreen: MatrixScreen, action: Action) -> None:
+    """Shortens the sleep between frames on `Action.KEY_UP` and lengthens it otherwise; a recording keeps the change."""
+    if action is Action.KEY_UP:
+        sleep_timer.decrement_sleep()
+    else:
+        # increase sleep delay
+        sleep_timer.increment_sleep()
+    if mscreen.recorder is not None:
+        mscreen.recorder.set_frame_time(sleep_timer.sleep_sec)
 
-    TO_ACTIVATE = 2
-    MIN_AVAILABLE_COLUMNS = 0  # Leave columns possibly without trails?
+
+def wait_for_next_frame(
+    mscreen: MatrixScreen,
+    pace: bool,
+    tracer: MatrixTracer = NullTracer(),
+    hud: Optional[MatrixHud] = None,
+) -> Action:
+    """Sleeps until the next frame while handling key presses as soon as they arrive.
+
+    Returns `Action.BREAK` if the loop must be terminated.
+    """
+    while True:
+        tracer.mark(Phase.SLEEP)
+        woken: bool = pace and sleep_timer.sleep(mscreen.wait_for_input)
+        tracer.mark(Phase.HANDLE_KEY_PRESSES)
+        action = mscreen.handle_key_presses()
+        if action in (Action.KEY_UP, Action.KEY_DOWN):
+            change_speed(mscreen, action)
+        elif action is Action.TOGGLE_HUD and hud is not None:
+            hud.toggle(mscreen)
+        elif action is Action.RESUME:
+            # Frames were not late while frozen; start a new schedule instead of catching up
+            sleep_timer.reset()
+        elif action is Action.BREAK:
+            return action
+        if not woken:
+            return action
+
+
+def rain_loop(
+    mscreen: MatrixScreen,
+    args: argparse.Namespace,
+    pace: bool = True,
+) -> int:
+    """Runs the rain on a set up screen until quit and returns the number of frames shown.
+
+    If `pace` is `False` the loop does not sleep between frames, e.g. when benchmarking.
+    With ``--trace FILE`` the phases of each frame are timed and written to FILE on exit.
+    With ``--record FILE`` the cells drawn in each frame are recorded to FILE.
+    """
+
+    frames: int = 0
+    # The null tracer records nothing, keeping the cost of disabled tracing to a no-op call per phase
+    tracer: MatrixTracer = MatrixTracer() if args.trace else NullTracer()
+    # One generator for all random choices; seeded runs are reproducible
+    rng: random.Random = random.Random(args.seed)
+    char_itr: MatrixRainCharacters = MatrixRainCharacters(rng=rng)
+    sleep_timer.catch_up = bool(args.catch_up)
+    engine: str = str(args.engine)
+    matrix_rain_trails = create_trails(engine, mscreen.width, mscreen.height, rng)
+    # Budget is given in milliseconds
+    budget: Optional[float] = (
+        None if args.frame_budget is None else args.frame_budget / 1000
+    )
+    controller = MatrixLoadController(args.density, budget, args.max_churn)
+    bandwidth: Optional[MatrixBandwidthBudget] = None
+    if args.max_bandwidth is not None:
+        bandwidth = MatrixBandwidthBudget(args.max_bandwidth)
+    recording: Optional[BinaryIO] = None
+    if args.record:
+        # Imported here as it is only needed when recording
+        from matrix_recording import MatrixRecorder
+
+        recording = open(args.record, "wb")
+        mscreen.recorder = MatrixRecorder(recording, mscreen, sleep_timer.sleep_sec)
+
+    try:
+        frames = rain_frames(
+            mscreen, pace, matrix_rain_trails, char_itr, tracer, controller, bandwidth
+        )
+    finally:
+        tracer.mark(Phase.EXIT)
+        if args.trace:
+            tracer.write(args.trace)
+        if recording is not None and mscreen.recorder is not None:
+            mscreen.recorder.close()
+            mscreen.recorder = None
+            recording.close()
+
+    #
+    # Exited loop -> clean up
+    #
+
+    mscreen.erase()
+    mscreen.refresh()
+    return frames
+
+
+def rain_frames(
+    mscreen: MatrixScreen,
+    pace: bool,
+    matrix_rain_trails: Union[MatrixRainTrails, "MatrixRainTrailArrays"],
+    char_itr: MatrixRainCharacters,
+    tracer: MatrixTracer,
+    controller: Optional[MatrixLoadController] = None,
+    bandwidth: Optional[MatrixBandwidthBudget] = None,
+) -> int:
+    """Runs frames until quit and returns the number of frames shown."""
+
+    frames: int = 0
+    hud: MatrixHud = MatrixHud(bandwidth=bandwidth)
+    last_refresh: float = time.perf_counter()
+
+    controller = controller if controller is not None else MatrixLoadController()
+    MIN_AVAILABLE_COLUMNS = (
+        1  # At least one column must be available to activate a trail
+    )
 
     while True:
 
@@ -157,10 +333,14 @@ def main_loop(
         # Handle screen resize
         #
 
+        tracer.mark(Phase.VALIDATE_SCREEN_SIZE)
         screen_is_resized: bool = mscreen.validate_screen_size()
         if screen_is_resized:
-            matrix_rain_trails = MatrixRainTrails(mscreen.width, mscreen.height)
-            mscreen.clear()
+            # Keep trails in flight; only blank what shortened trails left behind
+            for line, column in matrix_rain_trails.resize(
+                mscreen.width, mscreen.height
+            ):
+                mscreen.addstr(line, column, BLANK, mscreen.color_pair(COLOR_PAIR_TAIL))
             mscreen.refresh()
             # -> continue infinite loop from loop start
             continue
@@ -169,47 +349,192 @@ def main_loop(
         # Activate trails if any are available; bare the minimum
         #
 
-        matrix_rain_trails.activate_if_available(TO_ACTIVATE, MIN_AVAILABLE_COLUMNS)
+        tracer.mark(Phase.ACTIVATE_IF_AVAILABLE)
+        frame_start: float = time.perf_counter()
+        cells_before: int = mscreen.cells_written
+        to_activate: int = controller.to_activate(
+            len(matrix_rain_trails), mscreen.width, mscreen.height
+        )
+        matrix_rain_trails.activate_if_available(to_activate, MIN_AVAILABLE_COLUMNS)
 
         #
         # Process trails
         #
 
-        process_trails(mscreen, matrix_rain_trails)
+        tracer.mark(Phase.PROCESS_TRAILS)
+        process_engine_trails(mscreen, matrix_rain_trails, char_itr)
+        hud.draw(
+            mscreen,
+            len(matrix_rain_trails),
+            len(matrix_rain_trails.available_column_numbers),
+        )
 
         #
         # Refresh screen and sleep for some time to make it humanly possible to see the screen output
         #
 
+        tracer.mark(Phase.REFRESH)
         mscreen.refresh()
-        sleep_timer.sleep()
+        frames += 1
+        now: float = time.perf_counter()
+        over_bandwidth: bool = False
+        if bandwidth is not None:
+            bandwidth.record(mscreen.last_frame_bytes)
+            over_bandwidth = bandwidth.over_budget
+        churn: float = (mscreen.cells_written - cells_before) / max(
+            1, mscreen.width * mscreen.height
+        )
+        controller.record_frame_cost(now - frame_start, over_bandwidth, churn)
+        hud.record_frame(now - last_refresh, mscreen)
+        last_refresh = now
 
         #
         # Handle keypresses (if any) and terminates loop if needed.
         # This logic needs to be at end of loop as it intentionally can break out of loop
         #
 
-        action = mscreen.handle_key_presses()
-        if action is Action.KEY_UP:
-            sleep_timer.decrement_sleep()
-            continue
-        if action is Action.KEY_DOWN:
-            # increase sleep delay
-            sleep_timer.increment_sleep()
-            continue
+        if pace and bandwidth is not None and over_bandwidth:
+            # Hold the next frame back until the bytes sent are within budget; trails move as before, only later
+            mscreen.wait_for_input(bandwidth.delay())
+            # The held time is not a missed deadline; with `--catch-up` it would be made up in a burst
+            sleep_timer.reset()
+
+        action = wait_for_next_frame(mscreen, pace, tracer, hud)
         if action is Action.BREAK:
-            break
+            return frames
 
         #
         # END OF LOOP
         #
 
-    #
-    # Exited loop -> clean up
-    #
+
+def replay_loop(
+    mscreen: MatrixScreen,
+    args: argparse.Namespace,
+    pace: bool = True,
+) -> int:
+    """Replays the recording `args.replay` from frame `args.seek` until its end or quit and returns the number of frames shown.
+
+    Frames are paced at the recorded frame time divided by `args.replay_speed`; a speed of 0 replays as fast as possible.
+    """
+
+    # Imported here as it is only needed when replaying
+    from matrix_recording import (
+        RecordingError,
+        draw_frame,
+        draw_state,
+        frame_time,
+        open_replay,
+    )
+
+    try:
+        replay = open_replay(args.replay)
+    except (OSError, RecordingError) as e:
+        raise MatrixRainException(f"cannot replay '{args.replay}': {e}") from e
+
+    frames: int = 0
+    with replay:
+        if args.seek > replay.frame_count:
+            raise MatrixRainException(
+                f"cannot seek to frame {args.seek}; '{args.replay}' has {replay.frame_count} frames"
+            )
+        pace = pace and args.replay_speed > 0
+        if pace:
+            sleep_timer.sleep_sec = replay.frame_time_at(args.seek) / args.replay_speed
+        # The screen as it was before the first replayed frame
+        draw_state(mscreen, replay.seek(args.seek))
+        for operations in replay.frames(args.seek):
+            recorded_frame_time: Optional[float] = frame_time(operations)
+            if pace and recorded_frame_time is not None:
+                # The speed was changed while recording
+                sleep_timer.sleep_sec = recorded_frame_time / args.replay_speed
+            mscreen.validate_screen_size()
+            draw_frame(mscreen, operations)
+            mscreen.refresh()
+            frames += 1
+            if wait_for_next_frame(mscreen, pace) is Action.BREAK:
+                break
 
     mscreen.erase()
     mscreen.refresh()
+    return frames
+
+
+def run_loop(
+    mscreen: MatrixScreen,
+    args: argparse.Namespace,
+    pace: bool = True,
+) -> int:
+    """Runs the rain, or replays a recording with ``--replay``, and returns the number of frames shown."""
+    if args.replay:
+        return replay_loop(mscreen, args, pace)
+    return rain_loop(mscreen, args, pace)
+
+
+def ansi_loop(args: argparse.Namespace) -> None:
+    """Runs the rain writing ANSI escape sequences directly to the terminal instead of using curses."""
+
+    # Imported here as it is only needed for this backend
+    from matrix_screen_ansi import ansi_terminal
+
+    with ansi_terminal() as ascreen:
+        mscreen: MatrixScreen = configure_screen(ascreen, args)
+        run_loop(mscreen, args)
+
+
+def headless_loop(args: argparse.Namespace) -> None:
+    """Runs the rain without a terminal for `args.frames` frames and prints the frame rate."""
+
+    # Imported here as it is only needed without a terminal
+    from matrix_screen_headless import HeadlessScreen
+
+    width, height = args.headless
+    mscreen: MatrixScreen = configure_screen(
+        HeadlessScreen(height, width, [-1] * (args.frames - 1), buffered=args.buffered),
+        args,
+    )
+    start: float = time.perf_counter()
+    frames: int = run_loop(mscreen, args, pace=False)
+    elapsed: float = time.perf_counter() - start
+    if frames == 0:
+        print(f"0 frames at {width}x{height}")
+        return
+    print(
+        f"{frames} frames at {width}x{height} in {elapsed:.3f} s ({frames / elapsed:.1f} fps)"
+    )
+    print(
+        f"output: {mscreen.bytes_written / frames:.0f} bytes per frame ({mscreen.bytes_written / elapsed / 1000:.1f} kB/s)"
+    )
+    if mscreen.frame_buffer is not None:
+        totals = mscreen.frame_buffer.totals
+        print(
+            f"per frame: {totals.writes / frames:.1f} writes, {totals.cells / frames:.1f} cells, {totals.calls / frames:.1f} calls"
+        )
+
+
+def asciicast_loop(args: argparse.Namespace) -> None:
+    """Writes `args.frames` frames to an asciicast file without a terminal and prints what was written."""
+
+    # Imported here as it is only needed when exporting
+    from matrix_asciicast import AsciicastScreen, AsciicastWriter, open_asciicast
+
+    width, height = args.headless or DEFAULT_ASCIICAST_SIZE
+    start: float = time.perf_counter()
+    with open_asciicast(args.asciicast) as f:
+        writer = AsciicastWriter(f, width, height, sleep_timer.sleep_sec)
+        mscreen: MatrixScreen = configure_screen(
+            AsciicastScreen(writer, height, width, args.frames, buffered=args.buffered),
+            args,
+        )
+        frames: int = run_loop(mscreen, args, pace=False)
+        writer.close()
+    elapsed: float = time.perf_counter() - start
+    print(
+        f"{frames} frames at {width}x{height} ({writer.duration:.1f} s of rain) written in {elapsed:.3f} s"
+    )
+    print(
+        f"output: {mscreen.bytes_written / 1000:.1f} kB in {writer.events} events to {args.asciicast}"
+    )
 
 
 #
@@ -224,8 +549,8 @@ def validate_color(color: str) -> str:
     raise argparse.ArgumentTypeError(f"'{color}' is not a valid color name")
 
 
-def argument_parsing(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
-    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+def add_color_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the trail, head and background color options shared by the rain, render and server commands."""
     parser.add_argument(
         "-c",
         "-C",
@@ -250,7 +575,194 @@ def argument_parsing(argv: Optional[Sequence[str]] = None) -> argparse.Namespace
         default="black",
         help="set background color. Default is black.",
     )
-    return parser.parse_args(argv)
+
+
+def validate_size(size: str) -> tuple[int, int]:
+    """Parses ``WIDTHxHEIGHT`` (e.g. ``80x24``) into ``(width, height)``."""
+    try:
+        width, height = (int(value) for value in size.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"'{size}' is not a valid size; expected WIDTHxHEIGHT"
+        )
+    if width < MatrixScreen.MIN_SCREEN_WIDTH or height < MatrixScreen.MIN_SCREEN_HEIGHT:
+        raise argparse.ArgumentTypeError(
+            f"'{size}' is too small; expected at least {MatrixScreen.MIN_SCREEN_WIDTH}x{MatrixScreen.MIN_SCREEN_HEIGHT}"
+        )
+    return width, height
+
+
+Number = TypeVar("Number", int, float)
+
+
+def _validated(
+    type_: Callable[[str], Number],
+    predicate: Callable[[Number], bool],
+    message: str,
+) -> Callable[[str], Number]:
+    """An argparse `type` converting with `type_` and rejecting numbers failing `predicate` with `message`."""
+    kind: str = "an integer" if type_ is int else "a number"
+
+    def validate(value: str) -> Number:
+        try:
+            number: Number = type_(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"'{value}' is not {kind}")
+        if not predicate(number):
+            raise argparse.ArgumentTypeError(f"'{value}' {message}")
+        return number
+
+    return validate
+
+
+validate_positive: Callable[[str], int] = _validated(
+    int, lambda number: number >= 1, "is not positive"
+)
+validate_not_negative: Callable[[str], int] = _validated(
+    int, lambda number: number >= 0, "is negative"
+)
+validate_positive_float: Callable[[str], float] = _validated(
+    float, lambda number: number > 0, "is not positive"
+)
+validate_fraction: Callable[[str], float] = _validated(
+    float, lambda number: 0 < number <= 1, "is not above 0 and at most 1"
+)
+validate_speed: Callable[[str], float] = _validated(
+    float, lambda number: number >= 0, "is negative"
+)
+
+
+def argument_parsing(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    add_color_arguments(parser)
+    parser.add_argument(
+        "--engine",
+        dest="engine",
+        choices=VALID_ENGINES,
+        default=ENGINE_OBJECTS,
+        help="Set trail engine; 'arrays' is vectorized and needs NumPy.  Default is objects",
+    )
+    parser.add_argument(
+        "--backend",
+        dest="backend",
+        choices=VALID_BACKENDS,
+        default=BACKEND_CURSES,
+        help="Set output backend; 'ansi' bypasses curses for large terminals.  Default is curses",
+    )
+    parser.add_argument(
+        "--seed",
+        dest="seed",
+        type=int,
+        default=None,
+        help="Seed the random generator to make the rain reproducible",
+    )
+    parser.add_argument(
+        "--catch-up",
+        dest="catch_up",
+        action="store_true",
+        help="Run late frames without sleeping until back on schedule instead of skipping them",
+    )
+    parser.add_argument(
+        "--frame-buffer",
+        dest="buffered",
+        action="store_true",
+        help="Collect the cells changed in a frame and write adjacent cells with one call",
+    )
+    parser.add_argument(
+        "--density",
+        dest="density",
+        type=validate_fraction,
+        default=None,
+        metavar="FRACTION",
+        help="Activate trails until this fraction of the columns is active.  Default is 2 new trails per frame",
+    )
+    parser.add_argument(
+        "--frame-budget",
+        dest="frame_budget",
+        type=validate_positive_float,
+        default=None,
+        metavar="MS",
+        help="Milliseconds of work per frame; activate fewer trails while frames take longer",
+    )
+    parser.add_argument(
+        "--max-churn",
+        dest="max_churn",
+        type=validate_fraction,
+        default=None,
+        metavar="FRACTION",
+        help="Fraction of the screen cells changed per frame; activate fewer trails while more glyphs change",
+    )
+    parser.add_argument(
+        "--max-bandwidth",
+        dest="max_bandwidth",
+        type=validate_positive,
+        default=None,
+        metavar="BYTES",
+        help="Bytes per second sent to the terminal; frames are held back and fewer trails started above it",
+    )
+    parser.add_argument(
+        "--headless",
+        dest="headless",
+        type=validate_size,
+        default=None,
+        metavar="WIDTHxHEIGHT",
+        help="Run without a terminal on an in-memory screen and print the frame rate",
+    )
+    parser.add_argument(
+        "--frames",
+        dest="frames",
+        type=validate_positive,
+        default=1000,
+        help="Number of frames to run with --headless.  Default is 1000",
+    )
+    parser.add_argument(
+        "--asciicast",
+        dest="asciicast",
+        default=None,
+        metavar="FILE",
+        help="Write --frames frames as an asciicast v2 file without a terminal, at the --headless size or 80x24",
+    )
+    parser.add_argument(
+        "--record",
+        dest="record",
+        default=None,
+        metavar="FILE",
+        help="Record the cells drawn in each frame to FILE",
+    )
+    parser.add_argument(
+        "--replay",
+        dest="replay",
+        default=None,
+        metavar="FILE",
+        help="Replay a recording made with --record instead of running the rain",
+    )
+    parser.add_argument(
+        "--replay-speed",
+        dest="replay_speed",
+        type=validate_speed,
+        default=1.0,
+        metavar="FACTOR",
+        help="Speed of --replay relative to the recording; 0 is as fast as possible.  Default is 1",
+    )
+    parser.add_argument(
+        "--seek",
+        dest="seek",
+        type=validate_not_negative,
+        default=0,
+        metavar="FRAME",
+        help="Frame to start --replay from.  Default is 0",
+    )
+    parser.add_argument(
+        "--trace",
+        dest="trace",
+        default=None,
+        metavar="FILE",
+        help="Time the phases of each frame and write them as Chrome trace JSON to FILE on exit",
+    )
+    args: argparse.Namespace = parser.parse_args(argv)
+    if args.replay and args.record:
+        parser.error("argument --record: not allowed with argument --replay")
+    return args
 
 
 #
@@ -262,6 +774,15 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     args: argparse.Namespace = argument_parsing(argv)
 
     try:
+        if args.asciicast is not None:
+            asciicast_loop(args)
+            return
+        if args.headless is not None:
+            headless_loop(args)
+            return
+        if args.backend == BACKEND_ANSI:
+            ansi_loop(args)
+            return
         # Sets up curses including 8 default color pairs
         # then runs main loop with curses
         curses.wrapper(main_loop, args)
@@ -1,10 +1,15 @@
 import random
+from typing import Optional, Self
 
 
 class MatrixRainCharacters:
     """
     An iterator of characters chosen randomly from an internal list.
 
+    Characters are served from a block of `block_size` characters,
+    which is refilled in bulk with ``choices`` of `rng` when used up.
+    Create one iterator and reuse it for the whole run.
+
     >>> char_itr = MatrixRainCharacters()
     >>> print(next(char_itr))
     y
@@ -12,6 +17,8 @@ class MatrixRainCharacters:
     l
     """
 
+    DEFAULT_BLOCK_SIZE: int = 1024
+
     __CHARACTERS_AS_STR: str = (
         # Western
         "abcdefghijklmnopqrstuvwxyz"
@@ -28,6 +35,25 @@ class MatrixRainCharacters:
 
     __CHARACTERS_AS_LIST = list(__CHARACTERS_AS_STR)
 
+    def __init__(
+        self: Self,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        if type(block_size) is not int:
+            raise ValueError("argument block_size is not 'int'")
+        if block_size < 1:
+            raise ValueError(f"argument block_size is {block_size}; expected >= 1")
+        self._block_size = block_size
+        self._rng: random.Random = rng if rng is not None else random.Random()
+        self._block: list[str] = []
+        self._index: int = 0
+
+    @classmethod
+    def characters(cls) -> str:
+        """All characters that can be served."""
+        return cls.__CHARACTERS_AS_STR
+
     def __iter__(self):
         """Initializes and returns the iterator object itself."""
         return self
@@ -37,7 +63,33 @@ class MatrixRainCharacters:
         Retrieves the next available item,
         which is a random choice from the available characters.
         """
-        return random.choice(MatrixRainCharacters.__CHARACTERS_AS_LIST)
+        if self._index >= len(self._block):
+            self._refill()
+        char: str = self._block[self._index]
+        self._index += 1
+        return char
+
+    def _refill(self: Self) -> None:
+        self._block = self._rng.choices(
+            MatrixRainCharacters.__CHARACTERS_AS_LIST, k=self._block_size
+        )
+        self._index = 0
+
+    def take(self: Self, count: int) -> list[str]:
+        """Retrieves the next `count` items; the same items as `count` calls to ``next()``."""
+        chars: list[str] = self._block[self._index : self._index + count]
+        self._index += len(chars)
+        while len(chars) < count:
+            self._refill()
+            more: list[str] = self._block[: count - len(chars)]
+            self._index = len(more)
+            chars.extend(more)
+        return chars
+
+    def discard(self: Self) -> None:
+        """Drop the remaining characters of the block, e.g. after reseeding the random generator."""
+        self._block = []
+        self._index = 0
 
 
 #
@@ -1,5 +1,5 @@
 import random
-from typing import Self
+from typing import Optional, Self
 
 
 class IllegalArgumentError(ValueError):
@@ -15,63 +15,53 @@ class MatrixRainTrail:
     +---------- 6       HEAD :: HEAD
     """
 
+    __slots__ = (
+        "column_number",
+        "_screen_columns",
+        "_screen_lines",
+        "_max_length",
+        "_length",
+        "_head_position",
+        "_rng",
+    )
+
+    MIN_LENGTH: int = 3
+
     def __init__(
         self: Self,
         column_number: int,
         screen_columns: int,
         screen_lines: int,
+        rng: Optional[random.Random] = None,
     ):
-        #
-        # Argument validation and sanity checks
-        #
-
-        if column_number is None:
-            raise IllegalArgumentError("Column number is None")
-
-        if screen_columns is None:
-            raise IllegalArgumentError("Screen columns is None")
-
-        if screen_lines is None:
-            raise IllegalArgumentError("Screen lines is None")
-
-        if not isinstance(column_number, int):
-            raise IllegalArgumentError("Column number is not an integer")
-
-        if not isinstance(screen_columns, int):
-            raise IllegalArgumentError("Screen columns is not an integer")
-
-        if not isinstance(screen_lines, int):
-            raise IllegalArgumentError("Screen lines is not an integer")
-
-        if column_number < 0:
-            raise IllegalArgumentError(f"Column number '{column_number}' is negative")
-
-        if screen_columns < 0:
-            raise IllegalArgumentError(f"Screen columns '{screen_columns}' is negative")
-
-        if screen_lines < 0:
-            raise IllegalArgumentError(f"Screen lines '{screen_lines}' is negative")
-
-        if column_number > screen_columns:
-            raise IllegalArgumentError(
-                f"Column number '{column_number}' is greater than available screen columns '{screen_columns}'"
-            )
+        _check_integers(column_number, screen_columns, screen_lines)
+        _check_ranges(column_number, screen_columns, screen_lines)
 
         #
         #
         #
 
-        self.column_number: int = column_number
         self._screen_columns: int = screen_columns
         self._screen_lines: int = screen_lines
+        self._max_length: int = screen_lines - 3
+        # The length is chosen with `rng`; a new `random.Random` if `None`
+        self._rng: random.Random = rng if rng is not None else random.Random()
 
-        self.MIN_LENGTH = 3
-        self.MAX_LENGTH = screen_lines - 3
+        self.reset(column_number)
 
-        self._length: int = random.randint(self.MIN_LENGTH, self.MAX_LENGTH)
-        # `randint` includes endpoints
+    def reset(self: Self, column_number: int) -> None:
+        """
+        Restart the trail above the top of the screen in the column with a new random length.
 
-        self._head_position = -1
+        The column number is trusted and not validated; this is the fast path used by
+        ``MatrixRainTrails`` to reuse retired trails for the same screen.
+        """
+        self.column_number: int = column_number
+        self._length: int = self._rng.randint(
+            MatrixRainTrail.MIN_LENGTH, self._max_length
+        )
+        # `randint` includes endpoints
+        self._head_position: int = -1
 
     def __len__(self: Self) -> int:
         return self._length
@@ -89,6 +79,21 @@ class MatrixRainTrail:
     # ---
     #
 
+    def resize(self: Self, screen_columns: int, screen_lines: int) -> None:
+        """
+        Adapt the trail to new screen dimensions.
+
+        The trail keeps its column and head position; the length is shortened if above the new maximum.
+        """
+        self._screen_columns = screen_columns
+        self._screen_lines = screen_lines
+        self._max_length = screen_lines - 3
+        self._length = min(self._length, self._max_length)
+
+    @property
+    def MAX_LENGTH(self: Self) -> int:
+        return self._max_length
+
     def length(self) -> int:
         return self._length
 
@@ -159,6 +164,11 @@ class MatrixRainTrail:
             return True
         return False
 
+    def advance(self: Self) -> bool:
+        """Move forward one line and return `True` if the trail is exhausted; ``move_forward`` and ``is_exhausted`` in one call."""
+        self._head_position += 1
+        return self._head_position - (self._length - 1) >= self._screen_lines
+
     def head_start(self) -> int:
         """The head start is also the end of the head."""
         return self._head_position
@@ -172,3 +182,41 @@ class MatrixRainTrail:
     def tail_start(self) -> int:
         """The tail start is also the end of the tail."""
         return self.head_start() - (self._length - 1)
+
+
+def _check_integers(column_number: int, screen_columns: int, screen_lines: int) -> None:
+    """Argument validation of ``MatrixRainTrail``."""
+    if column_number is None:
+        raise IllegalArgumentError("Column number is None")
+
+    if screen_columns is None:
+        raise IllegalArgumentError("Screen columns is None")
+
+    if screen_lines is None:
+        raise IllegalArgumentError("Screen lines is None")
+
+    if not isinstance(column_number, int):
+        raise IllegalArgumentError("Column number is not an integer")
+
+    if not isinstance(screen_columns, int):
+        raise IllegalArgumentError("Screen columns is not an integer")
+
+    if not isinstance(screen_lines, int):
+        raise IllegalArgumentError("Screen lines is not an integer")
+
+
+def _check_ranges(column_number: int, screen_columns: int, screen_lines: int) -> None:
+    """Sanity checks of the ``MatrixRainTrail`` arguments."""
+    if column_number < 0:
+        raise IllegalArgumentError(f"Column number '{column_number}' is negative")
+
+    if screen_columns < 0:
+        raise IllegalArgumentError(f"Screen columns '{screen_columns}' is negative")
+
+    if screen_lines < 0:
+        raise IllegalArgumentError(f"Screen lines '{screen_lines}' is negative")
+
+    if column_number > screen_columns:
+        raise IllegalArgumentError(
+            f"Column number '{column_number}' is greater than available screen columns '{screen_columns}'"
+        )
@@ -0,0 +1,208 @@
+import random
+from typing import NamedTuple, Optional, Self
+
+import numpy as np
+
+from matrix_rain_trails import validate_dimensions
+from random_list import RandomList
+
+
+class TrailArraysStep(NamedTuple):
+    """
+    Cell coordinates produced by advancing all active trails one line.
+
+    ``retire`` cells are old heads that become tail colored,
+    ``blank`` cells are tail ends that are erased,
+    and ``head`` cells are the new heads.
+
+    Glyphs are consumed in the same order as ``process_trail`` does:
+    for each trail the retire glyph (if any) and then the head glyph (if any).
+    ``retire_glyph`` and ``head_glyph`` index into that sequence of ``glyph_count`` glyphs.
+    """
+
+    retire_y: np.ndarray
+    retire_x: np.ndarray
+    retire_glyph: np.ndarray
+    blank_y: np.ndarray
+    blank_x: np.ndarray
+    head_y: np.ndarray
+    head_x: np.ndarray
+    head_glyph: np.ndarray
+    glyph_count: int
+
+
+class MatrixRainTrailArrays:
+    """
+    Structure-of-arrays alternative to ``MatrixRainTrails``.
+
+    All active trails are stored as NumPy arrays (column, head position, length, active flag)
+    in activation order and are advanced in one vectorized step.
+
+    The random number consumption and ordering match ``MatrixRainTrails``/``MatrixRainTrail``,
+    so for a given seed the rendered output is the same.
+    """
+
+    MIN_LENGTH = 3
+
+    def __init__(
+        self: Self,
+        width: int,
+        height: int,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+
+        validate_dimensions(width, height)
+
+        self._rng: random.Random = rng if rng is not None else random.Random()
+        self._width = width
+        self._height = height
+        self._available = RandomList(width, self._rng)
+
+        # A column can only hold one trail, so `width` slots are enough
+        self._column = np.zeros(width, dtype=np.int64)
+        self._head = np.zeros(width, dtype=np.int64)
+        self._length = np.zeros(width, dtype=np.int64)
+        self._active = np.zeros(width, dtype=np.bool_)
+        self._count = 0
+
+    def __len__(self: Self) -> int:
+        """Return the number of active trails."""
+        return self._count
+
+    @property
+    def available_column_numbers(self: Self) -> RandomList:
+        return self._available
+
+    @property
+    def columns(self: Self) -> np.ndarray:
+        """Column numbers of the active trails in activation order."""
+        return self._column[: self._count]
+
+    @property
+    def heads(self: Self) -> np.ndarray:
+        """Head positions of the active trails in activation order."""
+        return self._head[: self._count]
+
+    @property
+    def lengths(self: Self) -> np.ndarray:
+        """Lengths of the active trails in activation order."""
+        return self._length[: self._count]
+
+    def activate_trail(self: Self) -> None:
+        """Activate a trail randomly chosen from available."""
+        chosen_column_number: int = self._available.pop_random()
+        slot: int = self._count
+        self._column[slot] = chosen_column_number
+        self._head[slot] = -1
+        # Same draw as `MatrixRainTrail` (`randint` includes endpoints)
+        self._length[slot] = self._rng.randint(self.MIN_LENGTH, self._height - 3)
+        self._active[slot] = True
+        self._count += 1
+
+    def has_available_trails(self: Self, requested_size: int) -> bool:
+        return len(self._available) >= requested_size
+
+    def activate_if_available(self: Self, to_activate: int, min_available):
+        for _ in range(to_activate):
+            if not self.has_available_trails(min_available):
+                break
+            self.activate_trail()
+
+    def _visible(self: Self, lines: np.ndarray) -> np.ndarray:
+        """`True` where the line is on screen."""
+        return (lines >= 0) & (lines < self._height)
+
+    def step(self: Self) -> TrailArraysStep:
+        """
+        Move every active trail one line forward and retire exhausted trails.
+
+        Exhausted trails are removed preserving the order of the remaining trails,
+        and their columns are made available in the same order as ``MatrixRainTrails.replenish_exhausted``.
+        """
+        n: int = self._count
+        column = self._column[:n]
+        head = self._head[:n]
+        length = self._length[:n]
+
+        retire = self._visible(head)
+        tail = head - (length - 1)
+        blank = self._visible(tail)
+
+        head += 1  # in place; moves every trail forward
+
+        self._active[:n] = (tail + 1) < self._height
+        new_head = self._active[:n] & self._visible(head)
+
+        # Glyph sequence: per trail the retire glyph first, then the head glyph
+        per_trail = retire.astype(np.int64) + new_head
+        offset = np.cumsum(per_trail) - per_trail
+
+        result = TrailArraysStep(
+            retire_y=head[retire] - 1,
+            retire_x=column[retire],
+            retire_glyph=offset[retire],
+            blank_y=tail[blank],
+            blank_x=column[blank],
+            head_y=head[new_head],
+            head_x=column[new_head],
+            head_glyph=(offset + retire)[new_head],
+            glyph_count=int(per_trail.sum()),
+        )
+
+        self._compact()
+        return result
+
+    def _compact(self: Self) -> None:
+        """Remove trails flagged as inactive and make their columns available."""
+        n: int = self._count
+        active = self._active[:n]
+        if active.all():
+            return
+        for column_number in self._column[:n][~active].tolist():
+            self._available.append(column_number)
+        keep = np.flatnonzero(active)
+        kept: int = len(keep)
+        self._column[:kept] = self._column[keep]
+        self._head[:kept] = self._head[keep]
+        self._length[:kept] = self._length[keep]
+        self._active[:kept] = True
+        self._active[kept:n] = False
+        self._count = kept
+
+    def resize(self: Self, width: int, height: int) -> list[tuple[int, int]]:
+        """
+        Adapt to new screen dimensions keeping the trails in flight.
+
+        Same behavior as ``MatrixRainTrails.resize``.
+        """
+        validate_dimensions(width, height)
+
+        n: int = self._count
+        self._active[:n] = self._column[:n] < width
+        old_tail = self._head[:n] - (self._length[:n] - 1)
+        np.minimum(self._length[:n], height - 3, out=self._length[:n])
+        new_tail = self._head[:n] - (self._length[:n] - 1)
+
+        blanks: list[tuple[int, int]] = []
+        for column, first, last in zip(
+            self._column[:n][self._active[:n]].tolist(),
+            np.maximum(old_tail, 0)[self._active[:n]].tolist(),
+            np.minimum(new_tail, height)[self._active[:n]].tolist(),
+        ):
+            blanks.extend((line, column) for line in range(first, last))
+
+        # Dropped trails' columns no longer exist, so they are not made available
+        keep = np.flatnonzero(self._active[:n])
+        kept: int = len(keep)
+        capacity: int = max(width, kept)
+        self._column = np.resize(self._column[keep], capacity)
+        self._head = np.resize(self._head[keep], capacity)
+        self._length = np.resize(self._length[keep], capacity)
+        self._active = np.zeros(capacity, dtype=np.bool_)
+        self._active[:kept] = True
+        self._count = kept
+
+        self._available.resize(width)
+        self._width = width
+        self._height = height
+        return blanks
@@ -1,51 +1,109 @@
-from typing import Self
+import random
+from collections.abc import Iterator
+from enum import Enum
+from typing import NamedTuple, Optional, Self
 
 from matrix_rain_trail import MatrixRainTrail
 from random_list import RandomList
 
 
+def validate_dimensions(width: int, height: int) -> None:
+    """Raises `ValueError` if width or height is not a positive integer."""
+    if type(width) is not int:
+        raise ValueError("argument width is not integer")
+    if width < 1:
+        raise ValueError(f"argument width is {width}; expected >= 1")
+    if type(height) is not int:
+        raise ValueError("argument height is not integer")
+    if height < 1:
+        raise ValueError(f"argument height is {height}; expected >= 1")
+
+
+class CellEvent(Enum):
+    HEAD = 0
+    """A new head is drawn."""
+    BODY = 1
+    """The previous head turns into body."""
+    BLANK = 2
+    """The tail is blanked."""
+
+
+class TrailEvent(NamedTuple):
+    """A change of a visible cell in a tick, in the order ``process_trail`` draws them."""
+
+    kind: CellEvent
+    line: int
+    column: int
+
+
 class MatrixRainTrails:
+    """
+    The active and available trails of a screen.
+
+    All random choices (columns and trail lengths) are made with `rng`, so a seeded generator gives a reproducible rain.
+    """
 
-    def __init__(self: Self, width: int, height: int) -> None:
+    def __init__(
+        self: Self,
+        width: int,
+        height: int,
+        rng: Optional[random.Random] = None,
+    ) -> None:
 
-        # argument validation
-        if type(width) is not int:
-            raise ValueError("argument width is not integer")
-        if width < 1:
-            raise ValueError(f"argument width is {width}; expected >= 1")
-        if type(height) is not int:
-            raise ValueError("argument height is not integer")
-        if height < 1:
-            raise ValueError(f"argument height is {height}; expected >= 1")
+        validate_dimensions(width, height)
+        self._rng: random.Random = rng if rng is not None else random.Random()
 
         self._active: list[MatrixRainTrail] = []
         self._exhausted: list[MatrixRainTrail] = []
-        self._available = RandomList(width)
+        # Retired trails kept for reuse by `activate_trail`
+        self._pool: list[MatrixRainTrail] = []
+        self._available = RandomList(width, self._rng)
         self._width = width
         self._height = height
 
+    def __len__(self: Self) -> int:
+        """Return the number of active trails."""
+        return len(self._active)
+
     @property
     def available_column_numbers(self: Self) -> RandomList:
         return self._available
 
     def replenish_exhausted(self: Self):
-        """Remove trails marked as exhausted from active trails and make trails available."""
+        """
+        Remove trails marked as exhausted from active trails and make trails available.
+
+        Active trails are compacted in one pass, which keeps their order
+        and costs the same no matter how many trails are exhausted.
+        The exhausted trails are pooled for reuse.
+        """
+        if not self._exhausted:
+            return
+        exhausted_ids: set[int] = set()
         for exhausted_trail in self._exhausted:
-            self._active.pop(self._active.index(exhausted_trail))
+            exhausted_ids.add(id(exhausted_trail))
             self._available.append(exhausted_trail.column_number)
+        self._active[:] = [
+            trail for trail in self._active if id(trail) not in exhausted_ids
+        ]
+        self._pool.extend(self._exhausted)
         self._exhausted.clear()
 
     def activate_trail(self: Self) -> None:
         """Activate a trail randomly chosen from available."""
         chosen_column_number: int = self._available.pop_random()
-        # activate trail by chosen number
-        self._active.append(
-            MatrixRainTrail(
+        # activate trail by chosen number; reuse a retired trail if any
+        if self._pool:
+            trail: MatrixRainTrail = self._pool.pop()
+            trail.reset(chosen_column_number)
+        else:
+            trail = MatrixRainTrail(
                 chosen_column_number,
                 self._width,
                 self._height,
+                self._rng,
             )
-        )
+        self._active.append(trail)
 
     @property
     def active_trails(self: Self) -> list[MatrixRainTrail]:
@@ -62,3 +120,85 @@ class MatrixRainTrails:
             if not self.has_available_trails(min_available):
                 break
             self.activate_trail()
+
+    def step(
+        self: Self, n: int = 1, to_activate: int = 2, min_available: int = 1
+    ) -> None:
+        """
+        Advance the simulation `n` ticks without drawing.
+
+        A tick is what a frame does to the trails: activate up to `to_activate` trails,
+        move every active trail one line forward and retire the exhausted trails.
+        """
+        active: list[MatrixRainTrail] = self._active
+        exhausted: list[MatrixRainTrail] = self._exhausted
+        for _ in range(n):
+            self.activate_if_available(to_activate, min_available)
+            for trail in active:
+                if trail.advance():
+                    exhausted.append(trail)
+            self.replenish_exhausted()
+
+    def step_events(
+        self: Self,
+        n: int = 1,
+        to_activate: int = 2,
+        min_available: int = 1,
+    ) -> Iterator[list[TrailEvent]]:
+        """
+        Advance the simulation `n` ticks like ``step`` and yield the visible cell changes of each tick.
+
+        The events are the cells ``process_trails`` draws for the same tick in the same order.
+        """
+        for _ in range(n):
+            self.activate_if_available(to_activate, min_available)
+            events: list[TrailEvent] = []
+            for trail in self._active:
+                column: int = trail.column_number
+                if trail.is_head_visible():
+                    events.append(
+                        TrailEvent(CellEvent.BODY, trail.head_start(), column)
+                    )
+                if trail.is_tail_visible():
+                    events.append(
+                        TrailEvent(CellEvent.BLANK, trail.tail_start(), column)
+                    )
+                trail.move_forward()
+                if trail.is_exhausted():
+                    self._exhausted.append(trail)
+                    continue
+                if trail.is_head_visible():
+                    events.append(
+                        TrailEvent(CellEvent.HEAD, trail.head_start(), column)
+                    )
+            self.replenish_exhausted()
+            yield events
+
+    def resize(self: Self, width: int, height: int) -> list[tuple[int, int]]:
+        """
+        Adapt to new screen dimensions keeping the trails in flight.
+
+        Trails in columns beyond the new width are dropped, and trails longer than the new height allows are shortened.
+        Returns the visible ``(line, column)`` cells left behind by shortened trails, which must be blanked.
+        """
+        validate_dimensions(width, height)
+
+        blanks: list[tuple[int, int]] = []
+        kept: list[MatrixRainTrail] = []
+        for trail in self._active:
+            if trail.column_number >= width:
+                self._pool.append(trail)
+                continue
+            old_tail: int = trail.tail_start()
+            trail.resize(width, height)
+            for line in range(max(old_tail, 0), min(trail.tail_start(), height)):
+                blanks.append((line, trail.column_number))
+            kept.append(trail)
+        self._active[:] = kept
+        for trail in self._pool:
+            trail.resize(width, height)
+
+        self._available.resize(width)
+        self._width = width
+        self._height = height
+        return blanks
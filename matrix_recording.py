@@ -0,0 +1,453 @@
+"""
+Records the cells drawn in each frame to a file and replays them.
+
+A recording is a header, zlib compressed chunks, an index of the chunk offsets and a trailer::
+
+    header   MAGIC, width, height, keyframe interval, frame time
+    chunk    keyframe (the screen before the chunk's first frame), then up to `interval` frames
+    ...
+    index    offset of each chunk and the end of the last chunk, unsigned 64 bit
+    trailer  offset of the index, number of chunks, number of frames, MAGIC
+
+Chunk ``k`` starts with frame ``k * interval``, so seeking to a frame decompresses a single chunk
+and applies at most `interval` frames, no matter how long the recording is.
+
+A frame is a length prefixed list of operations: erase, resize, cells, and frame time.
+Cells are written as the distance from the previous cell (zigzag varint),
+the glyph's code point (varint) and the color pair (byte).
+A frame time (double) is recorded when the speed changes, and again in the first frame of each chunk
+while it differs from the header, so the frame time at any frame is known from its chunk.
+"""
+
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Iterator
+from typing import BinaryIO, NamedTuple, Optional, Self, Union, cast
+
+from matrix_screen import BLANK, COLOR_PAIR_HEAD, COLOR_PAIR_TAIL, MatrixScreen
+from matrix_screen_headless import HeadlessWindow
+
+MAGIC: bytes = b"MDRAIN01"
+HEADER: struct.Struct = struct.Struct("<8sHHId")
+TRAILER: struct.Struct = struct.Struct("<QQQ8s")
+
+DEFAULT_KEYFRAME_INTERVAL: int = 120
+
+OP_ERASE: int = 0
+OP_RESIZE: int = 1
+OP_CELLS: int = 2
+OP_FRAME_TIME: int = 3
+
+FRAME_TIME: struct.Struct = struct.Struct("<d")
+
+PAIRS: tuple[int, ...] = (COLOR_PAIR_HEAD, COLOR_PAIR_TAIL)
+
+
+class Cell(NamedTuple):
+    line: int
+    column: int
+    glyph: int
+    """Code point of the character."""
+    pair: int
+    """Color pair number; 0 if not a known pair."""
+
+
+Operation = Union[
+    tuple[int], tuple[int, int, int], tuple[int, list[Cell]], tuple[int, float]
+]
+"""``(OP_ERASE,)``, ``(OP_RESIZE, height, width)``, ``(OP_CELLS, cells)`` or ``(OP_FRAME_TIME, seconds)``."""
+
+
+class RecordingError(ValueError):
+    pass
+
+
+#
+# Variable length integers
+#
+
+
+def write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data: Union[bytes, memoryview], pos: int) -> tuple[int, int]:
+    """The value at `pos` and the position after it."""
+    value: int = 0
+    shift: int = 0
+    while True:
+        byte: int = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def unzigzag(value: int) -> int:
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+
+def little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def from_little_endian(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+#
+# Encoding
+#
+
+
+def encode_keyframe(state: HeadlessWindow) -> bytes:
+    height, width = state.getmaxyx()
+    chars, attrs = state.buffers
+    out = bytearray()
+    write_varint(out, height)
+    write_varint(out, width)
+    out += little_endian(chars)
+    out += array("B", attrs).tobytes()
+    return bytes(out)
+
+
+def decode_keyframe(data: bytes, pos: int = 0) -> tuple[HeadlessWindow, int]:
+    """The screen of a keyframe at `pos` and the position after it."""
+    height, pos = read_varint(data, pos)
+    width, pos = read_varint(data, pos)
+    cells: int = height * width
+    state = HeadlessWindow(height, width)
+    chars, attrs = state.buffers
+    chars[:] = from_little_endian("I", data[pos : pos + 4 * cells])
+    pos += 4 * cells
+    attrs[:] = array("I", array("B", data[pos : pos + cells]))
+    return state, pos + cells
+
+
+def encode_cells(out: bytearray, cells: list[Cell], width: int) -> None:
+    out.append(OP_CELLS)
+    write_varint(out, len(cells))
+    previous: int = -1
+    for line, column, glyph, pair in cells:
+        index: int = line * width + column
+        write_varint(out, zigzag(index - previous))
+        write_varint(out, glyph)
+        out.append(pair)
+        previous = index
+
+
+def decode_frame(data: bytes, width: int) -> tuple[list[Operation], int]:
+    """The operations of a frame and the screen width after it."""
+    operations: list[Operation] = []
+    pos: int = 0
+    while pos < len(data):
+        op: int = data[pos]
+        pos += 1
+        if op == OP_ERASE:
+            operations.append((OP_ERASE,))
+        elif op == OP_RESIZE:
+            height, pos = read_varint(data, pos)
+            width, pos = read_varint(data, pos)
+            operations.append((OP_RESIZE, height, width))
+        elif op == OP_CELLS:
+            count, pos = read_varint(data, pos)
+            cells: list[Cell] = []
+            index: int = -1
+            for _ in range(count):
+                delta, pos = read_varint(data, pos)
+                index += unzigzag(delta)
+                glyph, pos = read_varint(data, pos)
+                cells.append(Cell(index // width, index % width, glyph, data[pos]))
+                pos += 1
+            operations.append((OP_CELLS, cells))
+        elif op == OP_FRAME_TIME:
+            (frame_time,) = FRAME_TIME.unpack_from(data, pos)
+            pos += FRAME_TIME.size
+            operations.append((OP_FRAME_TIME, frame_time))
+        else:
+            raise RecordingError(f"unknown operation {op} in frame")
+    return operations, width
+
+
+def apply(state: HeadlessWindow, operations: list[Operation]) -> None:
+    """Apply the operations of a frame to a screen state."""
+    for operation in operations:
+        if operation[0] == OP_ERASE:
+            state.erase()
+        elif operation[0] == OP_RESIZE:
+            _, height, width = cast(tuple[int, int, int], operation)
+            state.resize(height, width)
+        elif operation[0] == OP_CELLS:
+            _, cells = cast(tuple[int, list[Cell]], operation)
+            for line, column, glyph, pair in cells:
+                state.addstr(line, column, chr(glyph), pair)
+
+
+def frame_time(operations: list[Operation]) -> Optional[float]:
+    """The frame time recorded in a frame; `None` if it did not change."""
+    seconds: Optional[float] = None
+    for operation in operations:
+        if operation[0] == OP_FRAME_TIME:
+            _, seconds = cast(tuple[int, float], operation)
+    return seconds
+
+
+#
+# Recording
+#
+
+
+class MatrixRecorder:
+    """
+    Records the cells written to a ``MatrixScreen`` frame by frame.
+
+    Set as ``MatrixScreen.recorder``, which calls ``addstr``, ``erase``, ``resize`` and ``end_frame``;
+    call ``set_frame_time`` when the speed changes.
+    The screen as recorded so far is kept in a ``HeadlessWindow`` for the keyframes.
+    """
+
+    def __init__(
+        self: Self,
+        f: BinaryIO,
+        mscreen: MatrixScreen,
+        frame_time: float,
+        interval: int = DEFAULT_KEYFRAME_INTERVAL,
+    ) -> None:
+        if interval < 1:
+            raise ValueError(f"argument interval is {interval}; expected >= 1")
+        self._f = f
+        self._interval = interval
+        self._state = HeadlessWindow(mscreen.height, mscreen.width)
+        self._pairs: dict[int, int] = {mscreen.color_pair(pair): pair for pair in PAIRS}
+        self._offsets = array("Q")
+        self._chunk = bytearray()
+        self._frame = bytearray()
+        self._cells: list[Cell] = []
+        self.frames: int = 0
+        self._header_frame_time = frame_time
+        self._frame_time = frame_time
+        f.write(HEADER.pack(MAGIC, mscreen.width, mscreen.height, interval, frame_time))
+        self._chunk += encode_keyframe(self._state)
+
+    def addstr(self: Self, y_coord: int, x_coord: int, s: str, attr: int) -> None:
+        pair: int = self._pairs.get(attr, 0)
+        for offset, char in enumerate(s):
+            self._cells.append(Cell(y_coord, x_coord + offset, ord(char), pair))
+
+    def _flush_cells(self: Self) -> None:
+        if not self._cells:
+            return
+        encode_cells(self._frame, self._cells, self._state.getmaxyx()[1])
+        for line, column, glyph, pair in self._cells:
+            self._state.addstr(line, column, chr(glyph), pair)
+        self._cells.clear()
+
+    def erase(self: Self) -> None:
+        self._cells.clear()
+        self._frame.append(OP_ERASE)
+        self._state.erase()
+
+    def resize(self: Self, height: int, width: int) -> None:
+        self._flush_cells()
+        self._frame.append(OP_RESIZE)
+        write_varint(self._frame, height)
+        write_varint(self._frame, width)
+        self._state.resize(height, width)
+
+    def set_frame_time(self: Self, frame_time: float) -> None:
+        """Record that frames take `frame_time` seconds from the current frame on."""
+        self._flush_cells()
+        self._frame_time = frame_time
+        self._write_frame_time()
+
+    def _write_frame_time(self: Self) -> None:
+        self._frame.append(OP_FRAME_TIME)
+        self._frame += FRAME_TIME.pack(self._frame_time)
+
+    def end_frame(self: Self) -> None:
+        """Store the operations since the previous frame as a frame."""
+        self._flush_cells()
+        write_varint(self._chunk, len(self._frame))
+        self._chunk += self._frame
+        self._frame.clear()
+        self.frames += 1
+        if self.frames % self._interval == 0:
+            # The next chunk starts with the screen as it is before its first frame
+            self._write_chunk()
+            self._chunk += encode_keyframe(self._state)
+            if self._frame_time != self._header_frame_time:
+                self._write_frame_time()
+
+    def _write_chunk(self: Self) -> None:
+        self._offsets.append(self._f.tell())
+        self._f.write(zlib.compress(self._chunk))
+        self._chunk.clear()
+
+    def close(self: Self) -> None:
+        """Write the last chunk, the index, and the trailer."""
+        self._write_chunk()
+        index_offset: int = self._f.tell()
+        self._f.write(little_endian(self._offsets) + struct.pack("<Q", index_offset))
+        self._f.write(
+            TRAILER.pack(index_offset, len(self._offsets), self.frames, MAGIC)
+        )
+        self._f.flush()
+
+
+#
+# Replay
+#
+
+
+class MatrixReplay:
+    """
+    A recording memory-mapped for replay.
+
+    ``frames`` decodes the frames in order from any frame, which is found in constant time with the index.
+
+    >>> import io, tempfile
+    >>> from matrix_screen_headless import HeadlessScreen
+    >>> mscreen = HeadlessScreen(8, 10)
+    >>> with tempfile.TemporaryFile() as f:
+    ...     recorder = MatrixRecorder(f, mscreen, 0.1, interval=2)
+    ...     mscreen.recorder = recorder
+    ...     for x in range(5):
+    ...         mscreen.addstr(0, x, "abcde"[x], COLOR_PAIR_HEAD)
+    ...         mscreen.refresh()
+    ...     recorder.close()
+    ...     with MatrixReplay(f) as replay:
+    ...         print(replay.frame_count, replay.seek(3).snapshot()[0].rstrip())
+    5 abc
+    """
+
+    def __init__(self: Self, f: BinaryIO) -> None:
+        # An empty file cannot be mapped
+        if os.fstat(f.fileno()).st_size < HEADER.size + TRAILER.size:
+            raise RecordingError("file is too short to be a recording")
+        self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.width, self.height, self.interval, self.frame_time = (
+            HEADER.unpack_from(self._mm, 0)
+        )
+        index_offset, chunk_count, self.frame_count, end_magic = TRAILER.unpack_from(
+            self._mm, len(self._mm) - TRAILER.size
+        )
+        if magic != MAGIC or end_magic != MAGIC:
+            raise RecordingError("file is not a complete recording")
+        self._offsets: array = from_little_endian(
+            "Q", self._mm[index_offset : index_offset + 8 * (chunk_count + 1)]
+        )
+
+    def __enter__(self: Self) -> Self:
+        return self
+
+    def __exit__(self: Self, *exc_info) -> None:
+        self.close()
+
+    def close(self: Self) -> None:
+        self._mm.close()
+
+    def _chunk(self: Self, chunk_number: int) -> tuple[HeadlessWindow, bytes, int]:
+        """The keyframe of a chunk, the chunk's data, and the position of its first frame."""
+        start, end = self._offsets[chunk_number], self._offsets[chunk_number + 1]
+        data: bytes = zlib.decompress(self._mm[start:end])
+        state, pos = decode_keyframe(data)
+        return state, data, pos
+
+    def frames(self: Self, start: int = 0) -> Iterator[list[Operation]]:
+        """The operations of each frame from frame `start` to the end."""
+        if not 0 <= start <= self.frame_count:
+            raise IndexError(
+                f"frame {start} is outside the recording of {self.frame_count} frames"
+            )
+        frame_number: int = start - start % self.interval
+        for chunk_number in range(start // self.interval, len(self._offsets) - 1):
+            state, data, pos = self._chunk(chunk_number)
+            width: int = state.getmaxyx()[1]
+            while pos < len(data):
+                length, pos = read_varint(data, pos)
+                operations, width = decode_frame(data[pos : pos + length], width)
+                pos += length
+                if frame_number >= start:
+                    yield operations
+                frame_number += 1
+
+    def seek(self: Self, frame_number: int) -> HeadlessWindow:
+        """The screen before frame `frame_number` is drawn; from its chunk's keyframe and at most `interval` frames."""
+        if not 0 <= frame_number <= self.frame_count:
+            raise IndexError(
+                f"frame {frame_number} is outside the recording of {self.frame_count} frames"
+            )
+        chunk_number: int = frame_number // self.interval
+        state, data, pos = self._chunk(chunk_number)
+        width: int = state.getmaxyx()[1]
+        for _ in range(frame_number - chunk_number * self.interval):
+            length, pos = read_varint(data, pos)
+            operations, width = decode_frame(data[pos : pos + length], width)
+            pos += length
+            apply(state, operations)
+        return state
+
+    def frame_time_at(self: Self, frame_number: int) -> float:
+        """The frame time of frame `frame_number`; found in its chunk, which repeats it in its first frame."""
+        seconds: float = self.frame_time
+        first: int = frame_number - frame_number % self.interval
+        for number, operations in enumerate(self.frames(first), first):
+            seconds = frame_time(operations) or seconds
+            if number >= frame_number:
+                break
+        return seconds
+
+
+def draw_state(mscreen: MatrixScreen, state: HeadlessWindow) -> None:
+    """Draw the non-blank cells of a screen state, e.g. after seeking, clipped to the screen."""
+    mscreen.erase()
+    height, width = state.getmaxyx()
+    chars, attrs = state.buffers
+    blank: int = ord(BLANK)
+    for line in range(min(height, mscreen.height)):
+        for column in range(min(width, mscreen.width)):
+            index: int = line * width + column
+            if chars[index] != blank:
+                mscreen.addstr(
+                    line, column, chr(chars[index]), mscreen.color_pair(attrs[index])
+                )
+
+
+def draw_frame(mscreen: MatrixScreen, operations: list[Operation]) -> None:
+    """Draw the operations of a frame, clipped to the screen; resizes of the recording are ignored."""
+    attrs: dict[int, int] = {pair: mscreen.color_pair(pair) for pair in PAIRS}
+    height: int = mscreen.height
+    width: int = mscreen.width
+    for operation in operations:
+        if operation[0] == OP_ERASE:
+            mscreen.erase()
+        elif operation[0] == OP_CELLS:
+            _, cells = cast(tuple[int, list[Cell]], operation)
+            for line, column, glyph, pair in cells:
+                if line < height and column < width:
+                    mscreen.addstr(line, column, chr(glyph), attrs.get(pair, 0))
+
+
+def open_replay(path: str) -> MatrixReplay:
+    """Open a recording for replay; the file can be closed as the mapping keeps its own handle."""
+    with open(path, "rb") as f:
+        return MatrixReplay(f)
@@ -0,0 +1,501 @@
+"""
+Render the rain offline to video frames instead of a terminal.
+
+The trails are stepped with ``MatrixRainTrails.step_events`` and the cells drawn with glyphs of ``MatrixRainCharacters``,
+exactly as ``process_trail`` draws them on a terminal.
+Each glyph is pre-rendered once per color into a NumPy ``GlyphAtlas`` of RGB tiles,
+and a frame only re-blits the cells that changed, with one array assignment.
+
+Frames are streamed as raw RGB to a file or pipe, e.g. for ``ffmpeg``, or written as a sequence of PNG files
+
+.. code:: bash
+
+  python3 -m matrix_render --size 1920x1080 --fps 10 -o - | \\
+    ffmpeg -f rawvideo -pix_fmt rgb24 -s 1920x1080 -r 10 -i - rain.mp4
+  python3 -m matrix_render --size 640x360 --frames 100 --format png -o frames/
+
+Glyphs come from a PSF console font (``--font``, e.g. from ``/usr/share/consolefonts``);
+characters without a bitmap are drawn as block glyphs hashed from the character.
+"""
+
+import argparse
+import curses
+import gzip
+import os
+import random
+import struct
+import sys
+import time
+import zlib
+from collections.abc import Callable, Iterable, Sequence
+from typing import BinaryIO, NamedTuple, Optional, Self
+
+import numpy as np
+
+from matrix_load_controller import MatrixLoadController
+from matrix_rain import (
+    add_color_arguments,
+    validate_fraction,
+    validate_positive,
+    validate_size,
+)
+from matrix_rain_characters import MatrixRainCharacters
+from matrix_rain_trails import CellEvent, MatrixRainTrails, TrailEvent
+from matrix_screen import VALID_COLORS, MatrixScreen
+
+RGB_COLORS: dict[int, tuple[int, int, int]] = {
+    curses.COLOR_BLACK: (0, 0, 0),
+    curses.COLOR_RED: (205, 0, 0),
+    curses.COLOR_GREEN: (0, 205, 0),
+    curses.COLOR_YELLOW: (205, 205, 0),
+    curses.COLOR_BLUE: (0, 0, 238),
+    curses.COLOR_MAGENTA: (205, 0, 205),
+    curses.COLOR_CYAN: (0, 205, 205),
+    curses.COLOR_WHITE: (229, 229, 229),
+}
+"""The ``curses`` colors of ``VALID_COLORS`` as RGB; the default xterm palette."""
+
+FORMAT_RAW: str = "raw"
+FORMAT_PNG: str = "png"
+VALID_FORMATS: tuple[str, ...] = (FORMAT_RAW, FORMAT_PNG)
+
+DEFAULT_CELL_SIZE: tuple[int, int] = (12, 24)
+"""Cell size of the block glyphs as ``(width, height)`` in pixels."""
+
+PSF1_MAGIC: bytes = b"\x36\x04"
+PSF2_MAGIC: bytes = b"\x72\xb5\x4a\x86"
+PNG_SIGNATURE: bytes = b"\x89PNG\r\n\x1a\n"
+
+SEED: int = 1
+MIN_AVAILABLE_COLUMNS: int = 1
+
+
+class BitmapFont(NamedTuple):
+    """Glyph bitmaps of `height` x `width` booleans by character."""
+
+    width: int
+    height: int
+    glyphs: dict[str, np.ndarray]
+
+
+def _psf_glyphs(
+    data: bytes,
+    offset: int,
+    count: int,
+    width: int,
+    height: int,
+    bytes_per_glyph: int,
+) -> np.ndarray:
+    """Unpack `count` glyphs of rows padded to whole bytes into booleans."""
+    row_bytes: int = bytes_per_glyph // height
+    packed = np.frombuffer(data, np.uint8, count * bytes_per_glyph, offset).reshape(
+        count, height, row_bytes
+    )
+    return np.unpackbits(packed, axis=2)[:, :, :width].astype(bool)
+
+
+class _PsfHeader(NamedTuple):
+    version: int
+    glyph_count: int
+    width: int
+    height: int
+    header_size: int
+    bytes_per_glyph: int
+    has_table: bool
+
+
+def _psf_header(data: bytes, path: str) -> _PsfHeader:
+    """Raises `ValueError` if `data` is not a PSF font."""
+    if data[:2] == PSF1_MAGIC:
+        mode, height = data[2], data[3]
+        return _PsfHeader(
+            1, 512 if mode & 0x01 else 256, 8, height, 4, height, bool(mode & 0x06)
+        )
+    if data[:4] == PSF2_MAGIC:
+        _, header_size, flags, count, bytes_per_glyph, height, width = (
+            struct.unpack_from("<7I", data, 4)
+        )
+        return _PsfHeader(
+            2, count, width, height, header_size, bytes_per_glyph, bool(flags & 0x01)
+        )
+    raise ValueError(f"'{path}' is not a PSF font")
+
+
+def _psf1_table(table: bytes, bitmaps: np.ndarray) -> dict[str, np.ndarray]:
+    """Entries are little endian UCS-2; 0xFFFE starts sequences, which are skipped, and 0xFFFF ends a glyph."""
+    glyphs: dict[str, np.ndarray] = {}
+    codes = struct.unpack(f"<{len(table) // 2}H", table[: len(table) // 2 * 2])
+    glyph, in_sequence = 0, False
+    for code in codes:
+        if code == 0xFFFF:
+            glyph, in_sequence = glyph + 1, False
+        elif code == 0xFFFE:
+            in_sequence = True
+        elif not in_sequence and glyph < len(bitmaps):
+            glyphs.setdefault(chr(code), bitmaps[glyph])
+    return glyphs
+
+
+def _psf2_table(table: bytes, bitmaps: np.ndarray) -> dict[str, np.ndarray]:
+    """Entries are UTF-8; 0xFE starts sequences, which are skipped, and 0xFF ends a glyph."""
+    glyphs: dict[str, np.ndarray] = {}
+    for glyph, entry in enumerate(table.split(b"\xff")[: len(bitmaps)]):
+        for char in entry.split(b"\xfe")[0].decode("utf-8", "replace"):
+            glyphs.setdefault(char, bitmaps[glyph])
+    return glyphs
+
+
+def load_psf(path: str) -> BitmapFont:
+    """
+    Load a PSF version 1 or 2 console font, plain or gzipped.
+
+    Characters are mapped with the font's Unicode table; without one glyph `i` is ``chr(i)``.
+    Raises `ValueError` if the file is not a PSF font.
+    """
+    with open(path, "rb") as f:
+        data: bytes = f.read()
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+
+    header: _PsfHeader = _psf_header(data, path)
+    bitmaps = _psf_glyphs(
+        data,
+        header.header_size,
+        header.glyph_count,
+        header.width,
+        header.height,
+        header.bytes_per_glyph,
+    )
+    table: bytes = data[
+        header.header_size + header.glyph_count * header.bytes_per_glyph :
+    ]
+    if not header.has_table:
+        glyphs: dict[str, np.ndarray] = {
+            chr(i): bitmaps[i] for i in range(header.glyph_count)
+        }
+    elif header.version == 1:
+        glyphs = _psf1_table(table, bitmaps)
+    else:
+        glyphs = _psf2_table(table, bitmaps)
+    return BitmapFont(header.width, header.height, glyphs)
+
+
+def validate_font(path: str) -> BitmapFont:
+    """Loads a PSF font for ``--font``."""
+    try:
+        return load_psf(path)
+    except (OSError, ValueError) as e:
+        raise argparse.ArgumentTypeError(f"cannot load font: {e}")
+
+
+def block_glyph(char: str, width: int, height: int) -> np.ndarray:
+    """A symmetric 5x7 block pattern chosen by the code point of `char`, scaled to fit the cell with a margin."""
+    rng = random.Random(ord(char))
+    half = np.array([[rng.random() < 0.5 for _ in range(3)] for _ in range(7)])
+    pattern = np.concatenate([half, half[:, 1::-1]], axis=1)
+    scale_x: int = max(1, (width - 2) // 5)
+    scale_y: int = max(1, (height - 2) // 7)
+    scaled = np.kron(pattern, np.ones((scale_y, scale_x), bool))[:height, :width]
+    glyph = np.zeros((height, width), bool)
+    top: int = (height - scaled.shape[0]) // 2
+    left: int = (width - scaled.shape[1]) // 2
+    glyph[top : top + scaled.shape[0], left : left + scaled.shape[1]] = scaled
+    return glyph
+
+
+class GlyphAtlas:
+    """
+    RGB tiles of every character in the head and the tail color.
+
+    Tile 0 is a blank cell in the background color;
+    the head and tail tiles of a character are found with ``head`` and ``tail``.
+    """
+
+    def __init__(
+        self: Self,
+        font: Optional[BitmapFont],
+        chars: Iterable[str],
+        head_color: str = "white",
+        tail_color: str = "green",
+        back_color: str = "black",
+    ) -> None:
+        self.width, self.height = (
+            (font.width, font.height) if font is not None else DEFAULT_CELL_SIZE
+        )
+        self._index: dict[str, int] = {}
+        bitmaps: list[np.ndarray] = []
+        for char in chars:
+            if char in self._index:
+                continue
+            bitmap: Optional[np.ndarray] = (
+                font.glyphs.get(char) if font is not None else None
+            )
+            self._index[char] = len(bitmaps)
+            bitmaps.append(
+                bitmap
+                if bitmap is not None
+                else block_glyph(char, self.width, self.height)
+            )
+
+        back = np.array(RGB_COLORS[VALID_COLORS[back_color]], np.uint8)
+        self.tiles = np.empty(
+            (1 + 2 * len(bitmaps), self.height, self.width, 3), np.uint8
+        )
+        self.tiles[:] = back
+        for i, bitmap in enumerate(bitmaps):
+            self.tiles[1 + 2 * i][bitmap] = RGB_COLORS[VALID_COLORS[head_color]]
+            self.tiles[2 + 2 * i][bitmap] = RGB_COLORS[VALID_COLORS[tail_color]]
+
+    def head(self: Self, char: str) -> int:
+        return 1 + 2 * self._index[char]
+
+    def tail(self: Self, char: str) -> int:
+        return 2 + 2 * self._index[char]
+
+
+class MatrixRenderer:
+    """
+    An RGB frame of `width` x `height` pixels holding as many cells of the atlas as fit.
+
+    ``apply`` blits the tiles of the cells changed by a tick; everything else is kept from the previous frame.
+    """
+
+    def __init__(self: Self, atlas: GlyphAtlas, width: int, height: int) -> None:
+        self.atlas = atlas
+        self.columns: int = width // atlas.width
+        self.lines: int = height // atlas.height
+        if (
+            self.columns < MatrixScreen.MIN_SCREEN_WIDTH
+            or self.lines < MatrixScreen.MIN_SCREEN_HEIGHT
+        ):
+            raise ValueError(
+                f"frame of {width}x{height} has {self.columns}x{self.lines} cells of {atlas.width}x{atlas.height}; "
+                f"expected at least {MatrixScreen.MIN_SCREEN_WIDTH}x{MatrixScreen.MIN_SCREEN_HEIGHT}"
+            )
+        self.frame = np.empty((height, width, 3), np.uint8)
+        self.frame[:] = atlas.tiles[0, 0, 0]
+        # The cells as a (lines, cell height, columns, cell width, rgb) view of the frame, so tiles can be assigned by cell
+        grid = self.frame[: self.lines * atlas.height, : self.columns * atlas.width]
+        row, pixel, channel = grid.strides
+        self._cells = np.lib.stride_tricks.as_strided(
+            grid,
+            (self.lines, atlas.height, self.columns, atlas.width, 3),
+            (row * atlas.height, row, pixel * atlas.width, pixel, channel),
+        )
+        self.cells_blitted: int = 0
+
+    def apply(
+        self: Self, events: Sequence[TrailEvent], char_itr: MatrixRainCharacters
+    ) -> int:
+        """Draw the cell changes of a tick and return the number of cells blitted."""
+        atlas: GlyphAtlas = self.atlas
+        # The last change of a cell wins, like drawing them in order on a terminal
+        tiles: dict[tuple[int, int], int] = {}
+        for kind, line, column in events:
+            if kind is CellEvent.HEAD:
+                tiles[line, column] = atlas.head(next(char_itr))
+            elif kind is CellEvent.BODY:
+                tiles[line, column] = atlas.tail(next(char_itr))
+            else:
+                tiles[line, column] = 0
+        if not tiles:
+            return 0
+        cells = np.array(list(tiles.keys()), np.intp)
+        self._cells[cells[:, 0], :, cells[:, 1]] = atlas.tiles[
+            np.fromiter(tiles.values(), np.intp, len(tiles))
+        ]
+        self.cells_blitted += len(tiles)
+        return len(tiles)
+
+
+def png_bytes(frame: np.ndarray, level: int = 1) -> bytes:
+    """Encode an RGB frame as an 8 bit truecolor PNG without filtering."""
+    height, width, _ = frame.shape
+    scanlines = np.zeros((height, 1 + 3 * width), np.uint8)
+    scanlines[:, 1:] = frame.reshape(height, 3 * width)
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data))
+            + kind
+            + data
+            + struct.pack(">I", zlib.crc32(kind + data))
+        )
+
+    header: bytes = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        PNG_SIGNATURE
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(scanlines.tobytes(), level))
+        + chunk(b"IEND", b"")
+    )
+
+
+def raw_sink(f: BinaryIO) -> Callable[[np.ndarray], None]:
+    """Write frames as raw RGB24 to `f`."""
+
+    def write(frame: np.ndarray) -> None:
+        f.write(frame.data)
+
+    return write
+
+
+def png_sink(directory: str) -> Callable[[np.ndarray], None]:
+    """Write frames as ``frame_000000.png``, ``frame_000001.png`` and so on to `directory`."""
+    os.makedirs(directory, exist_ok=True)
+    frame_number: list[int] = [0]
+
+    def write(frame: np.ndarray) -> None:
+        with open(
+            os.path.join(directory, f"frame_{frame_number[0]:06d}.png"), "wb"
+        ) as f:
+            f.write(png_bytes(frame))
+        frame_number[0] += 1
+
+    return write
+
+
+def render(
+    renderer: MatrixRenderer,
+    frames: int,
+    sink: Callable[[np.ndarray], None],
+    rng: random.Random,
+    density: Optional[float] = None,
+) -> None:
+    """Step the rain `frames` ticks and hand each rendered frame to `sink`."""
+    matrix_rain_trails = MatrixRainTrails(renderer.columns, renderer.lines, rng)
+    char_itr = MatrixRainCharacters(rng=rng)
+    controller = MatrixLoadController(density)
+    for _ in range(frames):
+        to_activate: int = controller.to_activate(
+            len(matrix_rain_trails), renderer.columns, renderer.lines
+        )
+        for events in matrix_rain_trails.step_events(
+            1, to_activate, MIN_AVAILABLE_COLUMNS
+        ):
+            renderer.apply(events, char_itr)
+        sink(renderer.frame)
+
+
+def argument_parsing(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Render the matrix rain to video frames."
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        dest="output",
+        required=True,
+        help="File to write raw RGB24 frames to ('-' is standard output), or directory for PNG files",
+    )
+    parser.add_argument(
+        "--format",
+        dest="format",
+        choices=VALID_FORMATS,
+        default=FORMAT_RAW,
+        help="Output format.  Default is raw",
+    )
+    parser.add_argument(
+        "--size",
+        dest="size",
+        type=validate_size,
+        default=(1920, 1080),
+        metavar="WIDTHxHEIGHT",
+        help="Frame size in pixels.  Default is 1920x1080",
+    )
+    parser.add_argument(
+        "--frames",
+        dest="frames",
+        type=validate_positive,
+        default=600,
+        help="Number of frames to render.  Default is 600",
+    )
+    parser.add_argument(
+        "--fps",
+        dest="fps",
+        type=validate_positive,
+        default=10,
+        help="Frames per second of the video, used for the speed in the summary.  Default is 10 like the terminal",
+    )
+    parser.add_argument(
+        "--font",
+        dest="font",
+        type=validate_font,
+        default=None,
+        metavar="PSF",
+        help="PSF console font for the glyphs.  Default is block glyphs",
+    )
+    add_color_arguments(parser)
+    parser.add_argument(
+        "--density",
+        dest="density",
+        type=validate_fraction,
+        default=None,
+        metavar="FRACTION",
+        help="Activate trails until this fraction of the columns is active.  Default is 2 new trails per frame",
+    )
+    parser.add_argument(
+        "--seed",
+        dest="seed",
+        type=int,
+        default=SEED,
+        help=f"Seed of the rain.  Default is {SEED}",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args: argparse.Namespace = argument_parsing(argv)
+    atlas = GlyphAtlas(
+        args.font,
+        MatrixRainCharacters.characters(),
+        args.head_color,
+        args.color,
+        args.background,
+    )
+    width, height = args.size
+    try:
+        renderer = MatrixRenderer(atlas, width, height)
+    except ValueError as e:
+        sys.exit(str(e))
+
+    start: float = time.perf_counter()
+    if args.format == FORMAT_PNG:
+        render(
+            renderer,
+            args.frames,
+            png_sink(args.output),
+            random.Random(args.seed),
+            args.density,
+        )
+    elif args.output == "-":
+        render(
+            renderer,
+            args.frames,
+            raw_sink(sys.stdout.buffer),
+            random.Random(args.seed),
+            args.density,
+        )
+        sys.stdout.flush()
+    else:
+        with open(args.output, "wb") as f:
+            render(
+                renderer,
+                args.frames,
+                raw_sink(f),
+                random.Random(args.seed),
+                args.density,
+            )
+    elapsed: float = time.perf_counter() - start
+
+    # Standard output may be the video
+    print(
+        f"{args.frames} frames of {width}x{height} ({renderer.columns}x{renderer.lines} cells) in {elapsed:.3f} s "
+        f"({args.frames / elapsed:.1f} fps, {args.frames / args.fps / elapsed:.1f}x real time), "
+        f"{renderer.cells_blitted / args.frames:.1f} cells blitted per frame",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
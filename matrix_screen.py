@@ -1,11 +1,19 @@
 import curses
+import select
+import sys
 from enum import Enum
-from typing import Self
+from typing import TYPE_CHECKING, Optional, Self
+
+from matrix_frame_buffer import MatrixFrameBuffer
+
+if TYPE_CHECKING:
+    from matrix_recording import MatrixRecorder
 
 # Colors are numbered, and start_color() initializes 8 basic colors when it activates color mode.
 # Color pair 0 is hard-wired to white on black, and cannot be changed.
 # Coordinates are always passed in the order y,x, and the top-left corner of a window is coordinate (0,0)
-# Writing lower right corner...
+# Writing lower right corner of a window moves the cursor off the window and raises an error;
+# frames are drawn in a pad with an extra line, so the whole screen can be written.
 # https://docs.python.org/3/howto/curses.html
 
 
@@ -15,6 +23,8 @@ class Action(Enum):
     BREAK = 2
     KEY_UP = 3
     KEY_DOWN = 4
+    TOGGLE_HUD = 5
+    RESUME = 6
 
 
 VALID_COLORS = {
@@ -36,12 +46,34 @@ The colors are the default initial ``curses`` colors.
 COLOR_PAIR_HEAD: int = 10
 COLOR_PAIR_TAIL: int = 9
 
+QUIT_KEYS: frozenset[int] = frozenset((ord("q"), ord("Q")))
+FREEZE_KEYS: frozenset[int] = frozenset((ord("f"), ord("F")))
+
+KEY_ACTIONS: dict[int, Action] = {
+    curses.KEY_UP: Action.KEY_UP,
+    curses.KEY_DOWN: Action.KEY_DOWN,
+    **{key: Action.BREAK for key in QUIT_KEYS},
+    # Show or hide the HUD
+    ord("h"): Action.TOGGLE_HUD,
+    ord("H"): Action.TOGGLE_HUD,
+}
+"""Keys answered with a single `Action`; freezing and resizing are handled by `MatrixScreen.handle_key_presses`."""
+
 BLANK: str = " "
 
+CELL_OVERHEAD_BYTES: int = 8
+"""Estimated bytes a terminal is sent per write besides the characters, i.e. a cursor move and a color change."""
+
 
 class MatrixScreen:
     """
     Wraps a ``curses`` window object and exposes convenience mtthods.
+
+    Frames are drawn off-screen in a pad and published on ``refresh`` with ``noutrefresh`` and ``doupdate``,
+    so the terminal is only updated once per frame.
+    The `screen` window is used for input and its size.
+
+    If `buffered` then writes are collected in a ``MatrixFrameBuffer`` and coalesced on ``refresh``.
     """
 
     MIN_SCREEN_HEIGHT = 8
@@ -50,9 +82,28 @@ class MatrixScreen:
     def __init__(
         self: Self,
         screen: curses.window,
+        buffered: bool = False,
     ):
         self._screen = screen
+        self._frame_buffer: Optional[MatrixFrameBuffer] = (
+            MatrixFrameBuffer() if buffered else None
+        )
+        # Set by `notify_resize`; checked by `validate_screen_size`
+        self._resize_pending: bool = False
+        # Lines and columns of the upper right corner reserved by `reserve`
+        self._reserved_lines: int = 0
+        self._reserved_columns: int = 0
+        self._cells_written: int = 0
+        # Estimated bytes of the pending frame; see `pending_bytes`
+        self._frame_bytes: int = 0
+        # UTF-8 length of each glyph counted by `_encoded_length`
+        self._glyph_bytes: dict[str, int] = {}
+        self.last_frame_bytes: int = 0
+        self.bytes_written: int = 0
+        # Set to a `MatrixRecorder` to record the frames; see `matrix_recording`
+        self.recorder: Optional["MatrixRecorder"] = None
         self._set_screen_size()
+        self._canvas = self._create_canvas()
 
     def __str__(self: Self) -> str:
         """
@@ -70,6 +121,25 @@ class MatrixScreen:
         """The x-dimension of screen."""
         return self._width
 
+    @property
+    def frame_buffer(self: Self) -> Optional[MatrixFrameBuffer]:
+        """The frame buffer if writes are buffered; otherwise `None`."""
+        return self._frame_buffer
+
+    @property
+    def cells_written(self: Self) -> int:
+        """Number of ``addstr`` calls that were drawn, i.e. not in the reserved corner."""
+        return self._cells_written
+
+    def reserve(self: Self, lines: int, columns: int) -> None:
+        """
+        Reserves `lines` by `columns` cells in the upper right corner; ``addstr`` skips cells in it.
+
+        Use ``addstr_reserved`` to draw in the corner, e.g. a HUD. ``reserve(0, 0)`` releases it.
+        """
+        self._reserved_lines = lines
+        self._reserved_columns = columns
+
     def _set_screen_size(self: Self) -> None:
         """
         Sets screen height (y) and width (x).
@@ -82,57 +152,88 @@ class MatrixScreen:
         if self._width < MatrixScreen.MIN_SCREEN_WIDTH:
             raise ValueError("screen width is too narrow.")
 
+    def notify_resize(self: Self) -> None:
+        """Flags that the terminal has been resized, e.g. on ``KEY_RESIZE`` or ``SIGWINCH``."""
+        self._resize_pending = True
+
     def validate_screen_size(self: Self) -> bool:
         """Checks if screen is resized.
 
+        Only when a resize has been notified the dimensions are read.
         If screen is resized then update internal representation of dimensions and returns `True`;
         otherwise returns `False`.
 
         Raises `ValueErrror` if sizes are below contraints.
         """
-        if not curses.is_term_resized(self._height, self._width):
+        if not self._resize_pending:
             return False
+        self._resize_pending = False
+        old_size: tuple[int, int] = (self._height, self._width)
         self._set_screen_size()
+        if (self._height, self._width) == old_size:
+            return False
+        self._resize_canvas()
+        if self.recorder is not None:
+            self.recorder.resize(self._height, self._width)
         return True
 
-    def handle_key_presses(self: Self) -> Action:
+    def _create_canvas(self: Self) -> curses.window:
+        """
+        Creates the off-screen pad frames are drawn in.
 
-        Q_CHAR_SET: set[int] = {ord("q"), ord("Q")}
-        F_CHAR_SET: set[int] = {ord("f"), ord("F")}
+        The pad has one line more than the screen, so writing the lower right corner of the screen
+        moves the cursor to a line that exists instead of raising an error.
+        """
+        return curses.newpad(self._height + 1, self._width)
+
+    def _resize_canvas(self: Self) -> None:
+        """Resizes the pad to the screen keeping its content."""
+        self._canvas.resize(self._height + 1, self._width)
+        # The terminal may have been blanked by the resize; publish the whole pad on the next refresh
+        self._canvas.touchwin()
 
+    def _publish(self: Self) -> None:
+        """Copies the visible part of the pad to the terminal in one update."""
+        # Keeps `getch` from repainting the blank `screen` window over the pad
+        self._screen.noutrefresh()
+        self._canvas.noutrefresh(0, 0, 0, 0, self._height - 1, self._width - 1)
+        curses.doupdate()
+
+    def handle_key_presses(self: Self) -> Action:
         ch: int = self._screen.getch()
         if ch == -1:
             # no input
             return Action.CONTINUE
 
-        if ch == curses.KEY_UP:
-            # Quit
-            return Action.KEY_UP
+        if ch == curses.KEY_RESIZE:
+            self.notify_resize()
+            return Action.CONTINUE
 
-        if ch == curses.KEY_DOWN:
-            # Quit
-            return Action.KEY_DOWN
+        if ch in FREEZE_KEYS:
+            return self._freeze()
 
-        if ch in Q_CHAR_SET:
-            # Quit
-            return Action.BREAK
+        return KEY_ACTIONS.get(ch, Action.NONE)
 
-        if ch in F_CHAR_SET:
-            # Freeze
-            quit_loop = False
+    def _freeze(self: Self) -> Action:
+        """Blocks in `getch` until the rain is unfrozen or quit, so no CPU is used while waiting."""
+        self._screen.timeout(-1)
+        try:
             while True:
-                ch = self._screen.getch()
-                if ch in F_CHAR_SET:
+                ch: int = self._screen.getch()
+                if ch == curses.KEY_RESIZE:
+                    self.notify_resize()
+                elif ch in FREEZE_KEYS:
                     # Unfreeze
-                    break
-                elif ch in Q_CHAR_SET:
-                    # Quit
-                    quit_loop = True
-                    break
-            if quit_loop:
-                return Action.BREAK
+                    return Action.RESUME
+                elif ch in QUIT_KEYS:
+                    return Action.BREAK
+        finally:
+            self._screen.timeout(0)
 
-        return Action.NONE
+    def wait_for_input(self: Self, timeout: float) -> bool:
+        """Waits at most `timeout` seconds for a key press; `True` if one is available."""
+        readable, _, _ = select.select([sys.stdin], [], [], timeout)
+        return bool(readable)
 
     def setup_screen(
         self: Self,
@@ -162,19 +263,71 @@ class MatrixScreen:
         )
 
     def refresh(self: Self) -> None:
-        self._screen.refresh()
+        if self._frame_buffer is not None:
+            stats = self._frame_buffer.flush(self._write_run)
+            self._frame_bytes += stats.calls * CELL_OVERHEAD_BYTES
+        self.last_frame_bytes = self.pending_bytes()
+        self.bytes_written += self.last_frame_bytes
+        self._frame_bytes = 0
+        self._publish()
+        if self.recorder is not None:
+            self.recorder.end_frame()
+
+    def pending_bytes(self: Self) -> int:
+        """
+        Bytes of the pending frame, i.e. written to the terminal by ``refresh``.
+
+        ``curses`` does not tell, so it is estimated from the UTF-8 bytes written plus ``CELL_OVERHEAD_BYTES`` per write.
+        """
+        return self._frame_bytes
+
+    def _encoded_length(self: Self, s: str) -> int:
+        """Bytes of `s` in UTF-8; the length of single glyphs is cached."""
+        length: Optional[int] = self._glyph_bytes.get(s)
+        if length is None:
+            length = len(s.encode("utf-8"))
+            if len(s) == 1:
+                self._glyph_bytes[s] = length
+        return length
+
+    def _write_run(self: Self, y_coord: int, x_coord: int, s: str, attr: int) -> None:
+        """Write a run of cells flushed by the frame buffer."""
+        self._frame_bytes += self._encoded_length(s)
+        self._canvas.addstr(y_coord, x_coord, s, attr)
 
     def clear(self: Self) -> None:
-        self._screen.clear()
+        if self._frame_buffer is not None:
+            self._frame_buffer.discard()
+        self._canvas.clear()
 
     def erase(self: Self) -> None:
-        self._screen.erase()
+        if self.recorder is not None:
+            self.recorder.erase()
+        if self._frame_buffer is not None:
+            self._frame_buffer.discard()
+        self._canvas.erase()
 
     def addstr(self: Self, y_coord: int, x_coord: int, s: str, attr: int) -> None:
-        self._screen.addstr(y_coord, x_coord, s, attr)
-
-    def at_lower_right_corner(self: Self, line: int, col: int) -> bool:
-        """
-        `True` if position is at the bottom right corner of screen; otherwise `False`.
-        """
-        return (line, col) == (self._height - 1, self._width - 1)
+        if self.recorder is not None:
+            self.recorder.addstr(y_coord, x_coord, s, attr)
+        if (
+            y_coord < self._reserved_lines
+            and x_coord >= self._width - self._reserved_columns
+        ):
+            return
+        self._cells_written += 1
+        self.addstr_reserved(y_coord, x_coord, s, attr)
+
+    def addstr_reserved(
+        self: Self, y_coord: int, x_coord: int, s: str, attr: int
+    ) -> None:
+        """Like ``addstr`` but also draws in the reserved corner."""
+        if self._frame_buffer is not None:
+            self._frame_buffer.addstr(y_coord, x_coord, s, attr)
+            return
+        self._frame_bytes += self._encoded_length(s) + CELL_OVERHEAD_BYTES
+        self._canvas.addstr(y_coord, x_coord, s, attr)
+
+    def color_pair(self: Self, pair_number: int) -> int:
+        """The attribute value used to display text with the color pair."""
+        return curses.color_pair(pair_number)
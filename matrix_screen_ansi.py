@@ -0,0 +1,230 @@
+import curses
+import os
+import select
+import signal
+import sys
+import termios
+import tty
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Optional, Self
+
+from matrix_screen import COLOR_PAIR_HEAD, COLOR_PAIR_TAIL, VALID_COLORS, MatrixScreen
+
+# The default `curses` color numbers are the ANSI color numbers
+CSI: bytes = b"\x1b["
+SGR_FOREGROUND: int = 30
+SGR_BACKGROUND: int = 40
+
+ENTER_ALTERNATE_SCREEN: bytes = CSI + b"?1049h"
+LEAVE_ALTERNATE_SCREEN: bytes = CSI + b"?1049l"
+HIDE_CURSOR: bytes = CSI + b"?25l"
+SHOW_CURSOR: bytes = CSI + b"?25h"
+# Without autowrap writing the lower right corner does not scroll the terminal
+DISABLE_AUTOWRAP: bytes = CSI + b"?7l"
+ENABLE_AUTOWRAP: bytes = CSI + b"?7h"
+RESET_ATTRIBUTES: bytes = CSI + b"0m"
+ERASE_SCREEN: bytes = CSI + b"2J"
+RESTORE_TERMINAL: bytes = RESET_ATTRIBUTES + ENABLE_AUTOWRAP + SHOW_CURSOR
+"""Undoes the attributes, autowrap and cursor changes of a frame and of ``ansi_terminal``."""
+
+ARROW_KEYS: dict[bytes, int] = {
+    CSI + b"A": curses.KEY_UP,
+    CSI + b"B": curses.KEY_DOWN,
+    CSI + b"C": curses.KEY_RIGHT,
+    CSI + b"D": curses.KEY_LEFT,
+}
+
+
+class AnsiWindow:
+    """
+    Writes raw ANSI/VT100 escape sequences instead of going through ``curses``.
+
+    Implements the parts of ``curses.window`` used by ``MatrixScreen``.
+    A frame is built in one ``bytearray`` and written with a single ``os.write`` on ``refresh``.
+    The UTF-8 encoding of glyphs and the color escape of each color pair are cached,
+    and cursor moves and color changes are only emitted when needed.
+    """
+
+    def __init__(
+        self: Self,
+        fd_out: int,
+        fd_in: int,
+        size: Optional[tuple[int, int]] = None,
+    ) -> None:
+        self._fd_out = fd_out
+        self._fd_in = fd_in
+        self._size = size
+        self._timeout: Optional[float] = None
+        self._pending: bytes = b""
+
+        self._frame = bytearray()
+        self._glyphs: dict[str, bytes] = {}
+        self._colors: dict[int, bytes] = {}
+        self._background: bytes = RESET_ATTRIBUTES
+        # Cursor and color of the terminal after the previous write; `None` if unknown
+        self._cursor: Optional[tuple[int, int]] = None
+        self._attr: Optional[int] = None
+
+    def init_pair(
+        self: Self, pair_number: int, foreground: int, background: int
+    ) -> None:
+        self._colors[pair_number] = (
+            CSI
+            + f"{SGR_FOREGROUND + foreground};{SGR_BACKGROUND + background}m".encode()
+        )
+        self._background = CSI + f"0;{SGR_BACKGROUND + background}m".encode()
+        self._attr = None
+
+    def getmaxyx(self: Self) -> tuple[int, int]:
+        if self._size is not None:
+            return self._size
+        columns, lines = os.get_terminal_size(self._fd_out)
+        return lines, columns
+
+    def timeout(self: Self, delay: int) -> None:
+        """Delay in milliseconds for ``getch``; negative blocks like ``curses``."""
+        self._timeout = None if delay < 0 else delay / 1000
+
+    def _read(self: Self, timeout: Optional[float]) -> bytes:
+        readable, _, _ = select.select([self._fd_in], [], [], timeout)
+        if not readable:
+            return b""
+        return os.read(self._fd_in, 64)
+
+    def wait_for_input(self: Self, timeout: float) -> bool:
+        if not self._pending:
+            self._pending = self._read(timeout)
+        return bool(self._pending)
+
+    def getch(self: Self) -> int:
+        if not self._pending:
+            self._pending = self._read(self._timeout)
+            if not self._pending:
+                return -1
+        for sequence, key in ARROW_KEYS.items():
+            if self._pending.startswith(sequence):
+                self._pending = self._pending[len(sequence) :]
+                return key
+        key = self._pending[0]
+        self._pending = self._pending[1:]
+        return key
+
+    def addstr(self: Self, y: int, x: int, s: str, attr: int = 0) -> None:
+        frame: bytearray = self._frame
+        if self._cursor != (y, x):
+            frame += CSI + b"%d;%dH" % (y + 1, x + 1)
+        if self._attr != attr:
+            frame += self._colors.get(attr, RESET_ATTRIBUTES)
+            self._attr = attr
+        glyph: Optional[bytes] = self._glyphs.get(s)
+        if glyph is None:
+            glyph = self._glyphs[s] = s.encode("utf-8")
+        frame += glyph
+        self._cursor = (y, x + len(s))
+
+    def refresh(self: Self) -> None:
+        view = memoryview(self._frame)
+        while view:
+            written: int = os.write(self._fd_out, view)
+            view = view[written:]
+        view.release()
+        self._frame.clear()
+
+    def erase(self: Self) -> None:
+        self._frame += self._background + ERASE_SCREEN
+        self._cursor = None
+        self._attr = None
+
+    def clear(self: Self) -> None:
+        self.erase()
+
+    @property
+    def bytes_pending(self: Self) -> int:
+        """Number of bytes written by the next ``refresh``."""
+        return len(self._frame)
+
+
+class AnsiScreen(MatrixScreen):
+    """
+    A ``MatrixScreen`` writing ANSI escape sequences directly to the terminal.
+
+    Use ``ansi_terminal`` to put the terminal in the needed mode and restore it afterwards.
+    Frames are built off-screen in the ``AnsiWindow`` and written in one go on ``refresh``.
+    A `window` replaces the one writing to `fd_out`, e.g. to send the frames somewhere else than a terminal.
+    """
+
+    def __init__(
+        self: Self,
+        fd_out: int = -1,
+        fd_in: int = -1,
+        size: Optional[tuple[int, int]] = None,
+        buffered: bool = False,
+        window: Optional[AnsiWindow] = None,
+    ):
+        self.window: AnsiWindow = (
+            window if window is not None else AnsiWindow(fd_out, fd_in, size)
+        )
+        super().__init__(self.window, buffered)  # type: ignore[arg-type]
+
+    def setup_screen(
+        self: Self,
+        head_color: str,
+        tail_color: str,
+        back_color: str,
+    ) -> None:
+        self.window.timeout(0)
+        self.window.init_pair(
+            COLOR_PAIR_HEAD, VALID_COLORS[head_color], VALID_COLORS[back_color]
+        )
+        self.window.init_pair(
+            COLOR_PAIR_TAIL, VALID_COLORS[tail_color], VALID_COLORS[back_color]
+        )
+        self.window.erase()
+
+    def color_pair(self: Self, pair_number: int) -> int:
+        return pair_number
+
+    def wait_for_input(self: Self, timeout: float) -> bool:
+        return self.window.wait_for_input(timeout)
+
+    def pending_bytes(self: Self) -> int:
+        """The exact number of bytes written by the next ``refresh``."""
+        return self.window.bytes_pending
+
+    def _create_canvas(self: Self) -> AnsiWindow:  # type: ignore[override]
+        """The window is drawn in directly; it already buffers the frame."""
+        return self.window
+
+    def _resize_canvas(self: Self) -> None:
+        """The window reads the terminal size itself."""
+
+    def _publish(self: Self) -> None:
+        self.window.refresh()
+
+
+@contextmanager
+def ansi_terminal(
+    fd_out: Optional[int] = None,
+    fd_in: Optional[int] = None,
+) -> Iterator[AnsiScreen]:
+    """
+    Switches the terminal to the alternate screen with a hidden cursor, no autowrap and unbuffered input,
+    yields an ``AnsiScreen`` and restores the terminal on exit.
+
+    Resizes are notified to the screen by ``SIGWINCH``.
+    """
+    fd_out = sys.stdout.fileno() if fd_out is None else fd_out
+    fd_in = sys.stdin.fileno() if fd_in is None else fd_in
+    saved = termios.tcgetattr(fd_in)
+    saved_handler = signal.getsignal(signal.SIGWINCH)
+    os.write(fd_out, ENTER_ALTERNATE_SCREEN + HIDE_CURSOR + DISABLE_AUTOWRAP)
+    try:
+        tty.setcbreak(fd_in)
+        mscreen = AnsiScreen(fd_out, fd_in)
+        signal.signal(signal.SIGWINCH, lambda signum, frame: mscreen.notify_resize())
+        yield mscreen
+    finally:
+        signal.signal(signal.SIGWINCH, saved_handler)
+        termios.tcsetattr(fd_in, termios.TCSADRAIN, saved)
+        os.write(fd_out, RESTORE_TERMINAL + LEAVE_ALTERNATE_SCREEN)
@@ -0,0 +1,164 @@
+import curses
+from array import array
+from collections.abc import Callable, Iterable
+from typing import Optional, Self, Union
+
+from matrix_screen import BLANK, MatrixScreen
+
+ScriptItem = Union[int, tuple[int, int]]
+"""A key code returned by ``getch`` (``-1`` for no input) or a ``(height, width)`` resize."""
+
+KEY_QUIT: int = ord("q")
+
+
+class HeadlessWindow:
+    """
+    In-memory stand-in for the parts of ``curses.window`` used by ``MatrixScreen``.
+
+    Characters and attributes are kept as code points in two compact ``array`` buffers.
+    Keys are taken from a script; a ``(height, width)`` item resizes the window and
+    is reported as ``curses.KEY_RESIZE`` like a real terminal does.
+    Like the pad of ``MatrixScreen`` the lower right corner can be written.
+    When the script is exhausted ``getch`` returns ``q`` so a run always terminates.
+
+    ``on_refresh`` is called with the window on every ``refresh``, e.g. to compare frames with snapshots.
+    """
+
+    def __init__(
+        self: Self,
+        height: int,
+        width: int,
+        script: Iterable[ScriptItem] = (),
+        on_refresh: Optional[Callable[["HeadlessWindow"], None]] = None,
+    ) -> None:
+        self._script = iter(script)
+        self._on_refresh = on_refresh
+        self._allocate(height, width)
+        self.refresh_count: int = 0
+
+    def _allocate(self: Self, height: int, width: int) -> None:
+        self._height = height
+        self._width = width
+        self._chars = array("I", [ord(BLANK)]) * (height * width)
+        self._attrs = array("I", [0]) * (height * width)
+
+    def resize(self: Self, height: int, width: int) -> None:
+        """Resize buffers keeping the overlapping region, as ``curses.resizeterm`` does."""
+        old_chars, old_attrs, old_width = self._chars, self._attrs, self._width
+        rows: int = min(height, self._height)
+        cols: int = min(width, self._width)
+        self._allocate(height, width)
+        for y in range(rows):
+            new_start, old_start = y * width, y * old_width
+            self._chars[new_start : new_start + cols] = old_chars[
+                old_start : old_start + cols
+            ]
+            self._attrs[new_start : new_start + cols] = old_attrs[
+                old_start : old_start + cols
+            ]
+
+    def getmaxyx(self: Self) -> tuple[int, int]:
+        return self._height, self._width
+
+    def timeout(self: Self, delay: int) -> None:
+        pass
+
+    def getch(self: Self) -> int:
+        item: ScriptItem = next(self._script, KEY_QUIT)
+        if isinstance(item, tuple):
+            self.resize(*item)
+            return curses.KEY_RESIZE
+        return item
+
+    def addstr(self: Self, y: int, x: int, s: str, attr: int = 0) -> None:
+        if not (0 <= y < self._height and 0 <= x < self._width):
+            raise curses.error("addstr() returned ERR")
+        start: int = y * self._width + x
+        end: int = start + len(s)
+        if end > len(self._chars):
+            raise curses.error("addstr() returned ERR")
+        self._chars[start:end] = array("I", map(ord, s))
+        self._attrs[start:end] = array("I", [attr]) * len(s)
+
+    def refresh(self: Self) -> None:
+        self.refresh_count += 1
+        if self._on_refresh is not None:
+            self._on_refresh(self)
+
+    def erase(self: Self) -> None:
+        self._chars[:] = array("I", [ord(BLANK)]) * len(self._chars)
+        self._attrs[:] = array("I", [0]) * len(self._attrs)
+
+    def clear(self: Self) -> None:
+        self.erase()
+
+    def char_at(self: Self, y: int, x: int) -> str:
+        return chr(self._chars[y * self._width + x])
+
+    def attr_at(self: Self, y: int, x: int) -> int:
+        return self._attrs[y * self._width + x]
+
+    @property
+    def buffers(self: Self) -> tuple[array, array]:
+        """The code points and attributes of all cells, line by line."""
+        return self._chars, self._attrs
+
+    def snapshot(self: Self) -> list[str]:
+        """The characters on screen, one string per line."""
+        w: int = self._width
+        return [
+            "".join(map(chr, self._chars[y * w : (y + 1) * w]))
+            for y in range(self._height)
+        ]
+
+
+class HeadlessScreen(MatrixScreen):
+    """
+    A ``MatrixScreen`` without a terminal, writing into a ``HeadlessWindow``.
+
+    Intended for benchmarking and tests.
+
+    >>> mscreen = HeadlessScreen(24, 80, [-1, -1])
+    >>> mscreen.height, mscreen.width
+    (24, 80)
+    """
+
+    def __init__(
+        self: Self,
+        height: int,
+        width: int,
+        script: Iterable[ScriptItem] = (),
+        on_refresh: Optional[Callable[[HeadlessWindow], None]] = None,
+        buffered: bool = False,
+    ):
+        self.window: HeadlessWindow = HeadlessWindow(height, width, script, on_refresh)
+        super().__init__(self.window, buffered)  # type: ignore[arg-type]
+
+    def setup_screen(
+        self: Self,
+        head_color: str,
+        tail_color: str,
+        back_color: str,
+    ) -> None:
+        """No colors to set up; attributes are stored as color pair numbers."""
+        self._screen.timeout(0)
+
+    def color_pair(self: Self, pair_number: int) -> int:
+        return pair_number
+
+    def wait_for_input(self: Self, timeout: float) -> bool:
+        """The script is always ready; no time passes without a terminal."""
+        return False
+
+    def _create_canvas(self: Self) -> HeadlessWindow:  # type: ignore[override]
+        """The window is drawn in directly; it is already off-screen."""
+        return self.window
+
+    def _resize_canvas(self: Self) -> None:
+        """The window is resized with the script."""
+
+    def _publish(self: Self) -> None:
+        self.window.refresh()
+
+    def snapshot(self: Self) -> list[str]:
+        return self.window.snapshot()
@@ -0,0 +1,570 @@
+"""
+Serve the rain to many ``telnet`` or ``nc`` viewers from one process.
+
+Clients of the same terminal size share a ``MatrixChannel``: one simulation whose frames are encoded
+into ANSI escape sequences once, and the same ``bytes`` are written to every client of the channel.
+The size of a ``telnet`` client is negotiated with NAWS (RFC 1073) and follows its window;
+clients that do not negotiate, like ``nc``, get the default size.
+
+Every frame starts with an explicit cursor move and color, so a client can join between any two frames
+after a keyframe with the whole screen.
+A client whose write buffer is above the limit is skipped until it has drained and then resynchronized
+with a keyframe; a client that stays behind for ``STALL_TIMEOUT`` seconds is disconnected.
+
+.. code:: bash
+
+  python3 -m matrix_server --host 0.0.0.0 --port 2323
+  telnet localhost 2323
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+from collections.abc import Callable, Sequence
+from contextlib import suppress
+from typing import Optional, Self
+
+from matrix_load_controller import MatrixLoadController
+from matrix_rain import (
+    add_color_arguments,
+    configure_screen,
+    process_trails,
+    validate_fraction,
+    validate_positive,
+    validate_size,
+)
+from matrix_rain_characters import MatrixRainCharacters
+from matrix_rain_trails import MatrixRainTrails
+from matrix_screen import BLANK, MatrixScreen
+from matrix_screen_ansi import (
+    CSI,
+    DISABLE_AUTOWRAP,
+    ENABLE_AUTOWRAP,
+    ERASE_SCREEN,
+    HIDE_CURSOR,
+    RESET_ATTRIBUTES,
+    SHOW_CURSOR,
+    AnsiScreen,
+    AnsiWindow,
+)
+
+IAC: int = 255
+DONT: int = 254
+DO: int = 253
+WONT: int = 252
+WILL: int = 251
+SB: int = 250
+SE: int = 240
+ECHO: int = 1
+SUPPRESS_GO_AHEAD: int = 3
+NAWS: int = 31
+
+IAC_BYTE: bytes = bytes((IAC,))
+MAX_SUBNEGOTIATION: int = 64
+"""Bytes of a subnegotiation kept; longer ones are dropped as no option used here needs more."""
+
+# States of `TelnetParser`
+_DATA: int = 0
+_COMMAND: int = 1
+_OPTION: int = 2
+_SUBNEGOTIATION: int = 3
+_SUBNEGOTIATION_COMMAND: int = 4
+
+NEGOTIATION: bytes = bytes(
+    (IAC, DO, NAWS, IAC, WILL, ECHO, IAC, WILL, SUPPRESS_GO_AHEAD)
+)
+"""Ask for the window size and put ``telnet`` in character mode without local echo."""
+
+SETUP_TERMINAL: bytes = HIDE_CURSOR + DISABLE_AUTOWRAP
+RESTORE_TERMINAL: bytes = (
+    RESET_ATTRIBUTES + ERASE_SCREEN + CSI + b"H" + ENABLE_AUTOWRAP + SHOW_CURSOR
+)
+QUIT_KEYS: bytes = b"qQ\x03\x04"
+"""``q``, ctrl-C and ctrl-D end a session."""
+
+DEFAULT_PORT: int = 2323
+DEFAULT_SIZE: tuple[int, int] = (80, 24)
+MAX_SIZE: tuple[int, int] = (1000, 300)
+"""Negotiated sizes are clamped to this, as ``(width, height)``, to bound the work of a channel."""
+DEFAULT_MAX_BUFFER: int = 256 * 1024
+"""Bytes a client may have waiting in its write buffer before frames are dropped."""
+NAWS_TIMEOUT: float = 1.0
+"""Seconds to wait for the window size of a new client."""
+STALL_TIMEOUT: float = 10.0
+"""Seconds a client may drop frames before it is disconnected."""
+MIN_AVAILABLE_COLUMNS: int = 1
+
+
+class TelnetParser:
+    """
+    Separates telnet commands from the keys typed, across reads.
+
+    ``feed`` returns the keys and the window sizes reported with NAWS as ``(width, height)``.
+    The parser is a state machine, so every byte is looked at once however the stream is split;
+    subnegotiations longer than ``MAX_SUBNEGOTIATION`` bytes are dropped instead of buffered.
+
+    >>> parser = TelnetParser()
+    >>> parser.feed(bytes((IAC, WILL, NAWS, IAC, SB, NAWS, 0, 80, 0)))
+    (b'', [])
+    >>> parser.feed(bytes((24, IAC, SE)) + b"q")
+    (b'q', [(80, 24)])
+    """
+
+    def __init__(self: Self) -> None:
+        self._state: int = _DATA
+        self._subnegotiation = bytearray()
+        self._overflow: bool = False
+
+    def _append_subnegotiation(self: Self, data: bytes) -> None:
+        if self._overflow:
+            return
+        if len(self._subnegotiation) + len(data) > MAX_SUBNEGOTIATION:
+            self._overflow = True
+            self._subnegotiation.clear()
+            return
+        self._subnegotiation += data
+
+    def _end_subnegotiation(self: Self, sizes: list[tuple[int, int]]) -> None:
+        payload: bytearray = self._subnegotiation
+        if not self._overflow and len(payload) == 5 and payload[0] == NAWS:
+            sizes.append((payload[1] << 8 | payload[2], payload[3] << 8 | payload[4]))
+        self._subnegotiation.clear()
+        self._overflow = False
+
+    def feed(self: Self, data: bytes) -> tuple[bytes, list[tuple[int, int]]]:
+        keys = bytearray()
+        sizes: list[tuple[int, int]] = []
+        i: int = 0
+        while i < len(data):
+            if self._state in (_DATA, _SUBNEGOTIATION):
+                # Copy up to the next IAC in one go
+                end: int = data.find(IAC_BYTE, i)
+                chunk: bytes = data[i:] if end < 0 else data[i:end]
+                if self._state == _DATA:
+                    keys += chunk
+                else:
+                    self._append_subnegotiation(chunk)
+                if end < 0:
+                    break
+                self._state = (
+                    _COMMAND if self._state == _DATA else _SUBNEGOTIATION_COMMAND
+                )
+                i = end + 1
+                continue
+            byte: int = data[i]
+            i += 1
+            if self._state == _OPTION:
+                self._state = _DATA
+            elif self._state == _COMMAND:
+                self._state = _command_state(byte)
+                if byte == IAC:
+                    keys.append(IAC)
+            elif byte == SE:
+                self._end_subnegotiation(sizes)
+                self._state = _DATA
+            else:
+                # An escaped IAC is data; anything else is malformed and skipped
+                if byte == IAC:
+                    self._append_subnegotiation(IAC_BYTE)
+                self._state = _SUBNEGOTIATION
+        return bytes(keys), sizes
+
+
+def _command_state(command: int) -> int:
+    """The parser state after ``IAC`` `command`."""
+    if command in (DO, DONT, WILL, WONT):
+        return _OPTION
+    if command == SB:
+        return _SUBNEGOTIATION
+    return _DATA
+
+
+class StreamWindow(AnsiWindow):
+    """
+    An ``AnsiWindow`` of a fixed size handing each frame to `on_frame` instead of a terminal.
+
+    A copy of the cells on screen is kept for ``keyframe``.
+    The cursor and color are forgotten after every frame, so each frame starts with an explicit cursor move and color
+    and can follow a keyframe.
+    """
+
+    def __init__(
+        self: Self,
+        height: int,
+        width: int,
+        on_frame: Callable[[bytes], None],
+    ) -> None:
+        super().__init__(-1, -1, (height, width))
+        self._on_frame = on_frame
+        self._cells: dict[tuple[int, int], tuple[str, int]] = {}
+
+    def getch(self: Self) -> int:
+        return -1
+
+    def wait_for_input(self: Self, timeout: float) -> bool:
+        return False
+
+    def addstr(self: Self, y: int, x: int, s: str, attr: int = 0) -> None:
+        super().addstr(y, x, s, attr)
+        for i, char in enumerate(s):
+            if char == BLANK:
+                self._cells.pop((y, x + i), None)
+            else:
+                self._cells[y, x + i] = (char, attr)
+
+    def erase(self: Self) -> None:
+        super().erase()
+        self._cells.clear()
+
+    def refresh(self: Self) -> None:
+        frame: bytes = bytes(self._frame)
+        self._frame.clear()
+        self._cursor = None
+        self._attr = None
+        self._on_frame(frame)
+
+    def keyframe(self: Self) -> bytes:
+        """The escape sequences drawing the whole screen as it is after the last frame."""
+        frame = bytearray(self._background + ERASE_SCREEN)
+        attr: Optional[int] = None
+        for (y, x), (char, char_attr) in sorted(self._cells.items()):
+            frame += CSI + b"%d;%dH" % (y + 1, x + 1)
+            if char_attr != attr:
+                frame += self._colors.get(char_attr, RESET_ATTRIBUTES)
+                attr = char_attr
+            frame += char.encode("utf-8")
+        return bytes(frame)
+
+
+class StreamScreen(AnsiScreen):
+    """An ``AnsiScreen`` handing each encoded frame to `on_frame`."""
+
+    def __init__(
+        self: Self,
+        height: int,
+        width: int,
+        on_frame: Callable[[bytes], None],
+        buffered: bool = False,
+    ):
+        super().__init__(
+            buffered=buffered, window=StreamWindow(height, width, on_frame)
+        )
+
+
+class MatrixClient:
+    """
+    A connected viewer with its own write buffer, the transport buffer of `writer`.
+
+    Frames are dropped while more than `max_buffer` bytes are waiting;
+    when the buffer has drained the client is sent a keyframe instead of the next frame.
+    """
+
+    def __init__(
+        self: Self, writer: asyncio.StreamWriter, max_buffer: int = DEFAULT_MAX_BUFFER
+    ) -> None:
+        self.writer = writer
+        self.max_buffer = max_buffer
+        self.channel: Optional["MatrixChannel"] = None
+        self.frames_sent: int = 0
+        self.frames_dropped: int = 0
+        self.keyframes_sent: int = 0
+        # Loop time of the first frame dropped since the client was last in sync; `None` while in sync
+        self.behind_since: Optional[float] = None
+
+    def send_frame(
+        self: Self, frame: bytes, keyframe: Callable[[], bytes], now: float
+    ) -> None:
+        """Write `frame`, or a keyframe if frames were dropped, unless the write buffer is full."""
+        if self.writer.is_closing():
+            return
+        if self.writer.transport.get_write_buffer_size() > self.max_buffer:
+            self.frames_dropped += 1
+            if self.behind_since is None:
+                self.behind_since = now
+            elif now - self.behind_since > STALL_TIMEOUT:
+                self.writer.close()
+            return
+        if self.behind_since is not None:
+            self.behind_since = None
+            self.keyframes_sent += 1
+            frame = keyframe()
+        self.writer.write(frame)
+        self.frames_sent += 1
+
+    def send_keyframe(self: Self, keyframe: bytes) -> None:
+        self.writer.write(keyframe)
+        self.keyframes_sent += 1
+        self.behind_since = None
+
+
+class MatrixChannel:
+    """
+    One rain of `width` x `height` cells shown to all its clients.
+
+    Each frame is encoded once and the same ``bytes`` are sent to every client; the keyframe is encoded at most once per frame.
+    """
+
+    def __init__(
+        self: Self,
+        width: int,
+        height: int,
+        args: argparse.Namespace,
+        frame_time: float,
+    ) -> None:
+        self.width = width
+        self.height = height
+        self.frame_time = frame_time
+        self.clients: set[MatrixClient] = set()
+        self.frames: int = 0
+        self.bytes_encoded: int = 0
+        self.mscreen: MatrixScreen = configure_screen(
+            StreamScreen(height, width, self._broadcast), args
+        )
+        self.window: StreamWindow = self.mscreen.window  # type: ignore[attr-defined]
+        rng = random.Random(args.seed)
+        self._trails = MatrixRainTrails(width, height, rng)
+        self._char_itr = MatrixRainCharacters(rng=rng)
+        self._controller = MatrixLoadController(args.density)
+        self._keyframe: Optional[bytes] = None
+        self._now: float = 0.0
+        self.task: Optional[asyncio.Task] = None
+
+    def keyframe(self: Self) -> bytes:
+        if self._keyframe is None:
+            self._keyframe = self.window.keyframe()
+        return self._keyframe
+
+    def _broadcast(self: Self, frame: bytes) -> None:
+        self._keyframe = None
+        self.bytes_encoded += len(frame)
+        for client in list(self.clients):
+            client.send_frame(frame, self.keyframe, self._now)
+
+    def step(self: Self, now: float = 0.0) -> None:
+        """Run one frame of the rain and send it to the clients."""
+        self._now = now
+        to_activate: int = self._controller.to_activate(
+            len(self._trails), self.width, self.height
+        )
+        self._trails.activate_if_available(to_activate, MIN_AVAILABLE_COLUMNS)
+        process_trails(self.mscreen, self._trails, self._char_itr)
+        self.mscreen.refresh()
+        self.frames += 1
+
+    async def run(self: Self) -> None:
+        """Run frames every `frame_time` seconds on a fixed schedule; late frames restart the schedule."""
+        loop = asyncio.get_running_loop()
+        deadline: float = loop.time()
+        while True:
+            self.step(loop.time())
+            deadline += self.frame_time
+            delay: float = deadline - loop.time()
+            if delay < 0:
+                deadline = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+
+class MatrixServer:
+    """Accepts viewers and runs one ``MatrixChannel`` per terminal size in use."""
+
+    def __init__(
+        self: Self,
+        args: argparse.Namespace,
+        frame_time: float = 0.1,
+        default_size: tuple[int, int] = DEFAULT_SIZE,
+        max_buffer: int = DEFAULT_MAX_BUFFER,
+    ) -> None:
+        self.args = args
+        self.frame_time = frame_time
+        self.default_size = default_size
+        self.max_buffer = max_buffer
+        self.channels: dict[tuple[int, int], MatrixChannel] = {}
+        self.clients: set[MatrixClient] = set()
+        self._handlers: set[asyncio.Task] = set()
+
+    async def start(self: Self, host: str, port: int) -> asyncio.Server:
+        return await asyncio.start_server(self.handle_client, host, port)
+
+    def size(self: Self, width: int, height: int) -> tuple[int, int]:
+        """A negotiated size clamped to what a channel supports; the default size if unknown (zero)."""
+        if not width or not height:
+            return self.default_size
+        return (
+            max(MatrixScreen.MIN_SCREEN_WIDTH, min(width, MAX_SIZE[0])),
+            max(MatrixScreen.MIN_SCREEN_HEIGHT, min(height, MAX_SIZE[1])),
+        )
+
+    def join(self: Self, client: MatrixClient, size: tuple[int, int]) -> None:
+        """Move `client` to the channel of `size`, starting it if needed, and draw the channel's screen."""
+        if (
+            client.channel is not None
+            and (client.channel.width, client.channel.height) == size
+        ):
+            return
+        self.leave(client)
+        channel: Optional[MatrixChannel] = self.channels.get(size)
+        if channel is None:
+            channel = self.channels[size] = MatrixChannel(
+                *size, self.args, self.frame_time
+            )
+            channel.task = asyncio.get_running_loop().create_task(channel.run())
+        channel.clients.add(client)
+        client.channel = channel
+        client.send_keyframe(channel.keyframe())
+
+    def leave(self: Self, client: MatrixClient) -> None:
+        """Remove `client` from its channel and stop the channel if it was the last client."""
+        channel: Optional[MatrixChannel] = client.channel
+        if channel is None:
+            return
+        client.channel = None
+        channel.clients.discard(client)
+        if not channel.clients:
+            del self.channels[channel.width, channel.height]
+            if channel.task is not None:
+                channel.task.cancel()
+
+    async def _negotiate(
+        self: Self, reader: asyncio.StreamReader, parser: TelnetParser
+    ) -> tuple[int, int]:
+        """Wait up to ``NAWS_TIMEOUT`` for the window size of a new client."""
+        loop = asyncio.get_running_loop()
+        deadline: float = loop.time() + NAWS_TIMEOUT
+        while (timeout := deadline - loop.time()) > 0:
+            try:
+                data: bytes = await asyncio.wait_for(reader.read(1024), timeout)
+            except asyncio.TimeoutError:
+                break
+            if not data:
+                break
+            _, sizes = parser.feed(data)
+            if sizes:
+                return self.size(*sizes[-1])
+        return self.default_size
+
+    async def handle_client(
+        self: Self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        client = MatrixClient(writer, self.max_buffer)
+        self.clients.add(client)
+        handler: Optional[asyncio.Task] = asyncio.current_task()
+        if handler is not None:
+            self._handlers.add(handler)
+        parser = TelnetParser()
+        try:
+            writer.write(NEGOTIATION)
+            size: tuple[int, int] = await self._negotiate(reader, parser)
+            writer.write(SETUP_TERMINAL)
+            self.join(client, size)
+            while data := await reader.read(1024):
+                keys, sizes = parser.feed(data)
+                if sizes:
+                    self.join(client, self.size(*sizes[-1]))
+                if any(key in QUIT_KEYS for key in keys):
+                    writer.write(RESTORE_TERMINAL)
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.leave(client)
+            self.clients.discard(client)
+            if handler is not None:
+                self._handlers.discard(handler)
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def close(self: Self) -> None:
+        """Disconnect all clients, stop their channels and wait for their handlers to finish."""
+        for client in list(self.clients):
+            self.leave(client)
+            client.writer.close()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+
+
+def argument_parsing(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Serve the matrix rain to telnet clients."
+    )
+    parser.add_argument(
+        "--host",
+        dest="host",
+        default="127.0.0.1",
+        help="Address to listen on; 0.0.0.0 serves the whole network.  Default is 127.0.0.1",
+    )
+    parser.add_argument(
+        "--port",
+        dest="port",
+        type=int,
+        default=DEFAULT_PORT,
+        help=f"Port to listen on.  Default is {DEFAULT_PORT}",
+    )
+    parser.add_argument(
+        "--size",
+        dest="size",
+        type=validate_size,
+        default=DEFAULT_SIZE,
+        metavar="WIDTHxHEIGHT",
+        help="Screen size of clients that do not report one, e.g. nc.  Default is 80x24",
+    )
+    parser.add_argument(
+        "--fps",
+        dest="fps",
+        type=validate_positive,
+        default=10,
+        help="Frames per second.  Default is 10",
+    )
+    parser.add_argument(
+        "--max-buffer",
+        dest="max_buffer",
+        type=validate_positive,
+        default=DEFAULT_MAX_BUFFER,
+        metavar="BYTES",
+        help=f"Bytes waiting for a client before its frames are dropped.  Default is {DEFAULT_MAX_BUFFER}",
+    )
+    add_color_arguments(parser)
+    parser.add_argument(
+        "--density",
+        dest="density",
+        type=validate_fraction,
+        default=None,
+        metavar="FRACTION",
+        help="Activate trails until this fraction of the columns is active.  Default is 2 new trails per frame",
+    )
+    parser.add_argument(
+        "--seed",
+        dest="seed",
+        type=int,
+        default=None,
+        help="Seed the random generator of each channel to make the rain reproducible",
+    )
+    return parser.parse_args(argv)
+
+
+async def serve(args: argparse.Namespace) -> None:
+    matrix_server = MatrixServer(args, 1 / args.fps, args.size, args.max_buffer)
+    server: asyncio.Server = await matrix_server.start(args.host, args.port)
+    print(
+        f"serving on {', '.join(str(socket.getsockname()) for socket in server.sockets)}",
+        file=sys.stderr,
+    )
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await matrix_server.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args: argparse.Namespace = argument_parsing(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        # Ignore ctrl-C
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,35 @@
+import statistics
 import time
-from typing import Self
+from collections import deque
+from collections.abc import Callable
+from typing import Optional, Self
 
 
 class MatrixSleepTimer:
+    """
+    Paces frames on a fixed timestep of `sleep_sec` seconds.
+
+    Each call to ``sleep`` waits until the next frame deadline,
+    so the time spent on the frame's work is subtracted from the sleep and the frame rate does not drift.
+
+    When a frame overruns its deadline, `catch_up` decides what happens:
+    if `True` the following frames are run without sleeping until the schedule is met again
+    (at most ``MAX_CATCH_UP`` periods); if `False` the missed deadlines are skipped and the schedule restarts from now.
+    """
+
+    MAX_CATCH_UP: int = 5
+    """Periods a catching up schedule may be behind before the missed deadlines are skipped anyway."""
+
+    PERIOD_SAMPLES: int = 120
+    """Number of recent frame periods used for ``frame_time`` and ``jitter``."""
 
     def __init__(
         self: Self,
         sleep_sec: float = 0.1,  # 100 msec
         change_factor: float = 1.6,
+        catch_up: bool = False,
+        clock: Callable[[], float] = time.perf_counter,
+        sleeper: Callable[[float], None] = time.sleep,
     ):
 
         if not sleep_sec or float(sleep_sec) < 0:
@@ -18,18 +40,95 @@ class MatrixSleepTimer:
 
         self.sleep_sec = sleep_sec
         self.change_factor = change_factor
+        self.catch_up = catch_up
+        self.skipped_frames: int = 0
+
+        self._clock = clock
+        self._sleeper = sleeper
+        self._deadline: Optional[float] = None
+        self._last_wake: Optional[float] = None
+        # `True` while a deadline is set but not reached
+        self._waiting: bool = False
+        self._periods: deque[float] = deque(maxlen=MatrixSleepTimer.PERIOD_SAMPLES)
 
     def increment_sleep(
         self: Self,
     ) -> None:
         """Increase sleep time by the factor (multiplication) used when initializing this instance."""
-        self.sleep_sec *= self.change_factor
+        self._change_period(self.sleep_sec * self.change_factor)
 
     def decrement_sleep(
         self: Self,
     ) -> None:
         """Decrease sleep time by the factor (division) used when initializing this instance."""
-        self.sleep_sec /= self.change_factor
+        self._change_period(self.sleep_sec / self.change_factor)
+
+    def _change_period(self: Self, sleep_sec: float) -> None:
+        if self._waiting and self._deadline is not None:
+            # Apply to the deadline being waited for
+            self._deadline += sleep_sec - self.sleep_sec
+        self.sleep_sec = sleep_sec
+
+    def reset(self: Self) -> None:
+        """Start a new schedule from the next call to ``sleep``, e.g. after the display has been frozen."""
+        self._deadline = None
+        self._last_wake = None
+        self._waiting = False
+
+    def _schedule(self: Self, now: float) -> float:
+        """Set and return the deadline of the next frame."""
+        deadline: float = (
+            now if self._deadline is None else self._deadline
+        ) + self.sleep_sec
+
+        delay: float = deadline - now
+        if delay < 0:
+            behind: int = int(-delay // self.sleep_sec) + 1
+            if not self.catch_up or behind > MatrixSleepTimer.MAX_CATCH_UP:
+                # Skip the missed deadlines and restart the schedule
+                self.skipped_frames += behind
+                deadline = now
+        self._deadline = deadline
+        return deadline
+
+    def sleep(self: Self, waiter: Optional[Callable[[float], bool]] = None) -> bool:
+        """
+        Sleep until the next frame deadline.
+
+        If `waiter` is given it is used instead of sleeping; it waits at most the given seconds
+        and returns `True` if woken early, e.g. by a key press.
+        Then ``sleep`` returns `True` and the next call continues waiting for the same deadline;
+        otherwise returns `False`.
+        """
+        deadline: Optional[float] = self._deadline
+        if not self._waiting or deadline is None:
+            deadline = self._schedule(self._clock())
+            self._waiting = True
+
+        delay: float = deadline - self._clock()
+        if delay >= 0:
+            if waiter is None:
+                self._sleeper(delay)
+            elif waiter(delay):
+                return True
+        self._waiting = False
+
+        wake: float = self._clock()
+        if self._last_wake is not None:
+            self._periods.append(wake - self._last_wake)
+        self._last_wake = wake
+        return False
+
+    @property
+    def frame_time(self: Self) -> float:
+        """Mean of the recent measured frame periods in seconds."""
+        if not self._periods:
+            return 0.0
+        return statistics.fmean(self._periods)
 
-    def sleep(self: Self) -> None:
-        time.sleep(self.sleep_sec)
+    @property
+    def jitter(self: Self) -> float:
+        """Standard deviation of the recent measured frame periods in seconds."""
+        if len(self._periods) < 2:
+            return 0.0
+        return statistics.pstdev(self._periods)
@@ -0,0 +1,125 @@
+import json
+import os
+import time
+from array import array
+from collections.abc import Callable
+from enum import IntEnum
+from typing import Self
+
+
+class Phase(IntEnum):
+    """The phases of a frame in ``rain_loop`` in the order they are run."""
+
+    VALIDATE_SCREEN_SIZE = 0
+    ACTIVATE_IF_AVAILABLE = 1
+    PROCESS_TRAILS = 2
+    REFRESH = 3
+    SLEEP = 4
+    HANDLE_KEY_PRESSES = 5
+    EXIT = 6
+
+
+FRAME_PHASE: Phase = Phase.VALIDATE_SCREEN_SIZE
+"""A frame lasts from one mark of this phase to the next."""
+
+
+class MatrixTracer:
+    """
+    Records the start of each phase of a frame with ``perf_counter_ns``.
+
+    Marks are stored in preallocated arrays used as a ring buffer of `capacity` marks,
+    so recording does not allocate and only the most recent marks are kept.
+    A phase lasts until the next mark.
+
+    ``write`` exports the phases and frames in the Chrome trace-event JSON format,
+    which can be opened in Perfetto (https://ui.perfetto.dev) or ``chrome://tracing``.
+    """
+
+    DEFAULT_CAPACITY: int = 1 << 16
+
+    def __init__(
+        self: Self,
+        capacity: int = DEFAULT_CAPACITY,
+        clock: Callable[[], int] = time.perf_counter_ns,
+    ) -> None:
+        if capacity < 2:
+            raise ValueError(f"argument capacity is {capacity}; expected >= 2")
+        self._capacity = capacity
+        self._clock = clock
+        self._times = array("q", [0]) * capacity
+        self._phases = array("B", [0]) * capacity
+        self._count: int = 0
+
+    def __len__(self: Self) -> int:
+        """Return the number of marks kept."""
+        return min(self._count, self._capacity)
+
+    def mark(self: Self, phase: Phase) -> None:
+        """Marks the start of `phase` (and the end of the previous phase)."""
+        index: int = self._count % self._capacity
+        self._times[index] = self._clock()
+        self._phases[index] = phase
+        self._count += 1
+
+    def marks(self: Self) -> list[tuple[Phase, int]]:
+        """The kept marks as ``(phase, nanoseconds)`` from oldest to newest."""
+        start: int = self._count - len(self)
+        return [
+            (Phase(self._phases[i % self._capacity]), self._times[i % self._capacity])
+            for i in range(start, self._count)
+        ]
+
+    def events(self: Self) -> list[dict]:
+        """
+        The phases and frames as Chrome trace complete (``"X"``) events with microsecond times.
+
+        The last frame ends at the final mark unless that mark starts a new frame.
+        """
+        marks: list[tuple[Phase, int]] = self.marks()
+        events: list[dict] = []
+        frame: int = 0
+        frame_start: int = -1
+        for (phase, start), (_, end) in zip(marks, marks[1:]):
+            if phase is FRAME_PHASE:
+                if frame_start >= 0:
+                    events.append(
+                        complete_event("frame", frame_start, start, {"frame": frame})
+                    )
+                    frame += 1
+                frame_start = start
+            events.append(
+                complete_event(phase.name.lower(), start, end, {"frame": frame})
+            )
+        # The final mark, e.g. `Phase.EXIT`, ends the last frame
+        if frame_start >= 0 and marks[-1][0] is not FRAME_PHASE:
+            events.append(
+                complete_event("frame", frame_start, marks[-1][1], {"frame": frame})
+            )
+        return events
+
+    def write(self: Self, path: str) -> None:
+        """Writes the trace as Chrome trace-event JSON."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events(), "displayTimeUnit": "ms"}, f)
+
+
+class NullTracer(MatrixTracer):
+    """A tracer that records nothing; used when tracing is disabled."""
+
+    def __init__(self: Self) -> None:
+        super().__init__(capacity=2)
+
+    def mark(self: Self, phase: Phase) -> None:
+        pass
+
+
+def complete_event(name: str, start_ns: int, end_ns: int, args: dict) -> dict:
+    return {
+        "name": name,
+        "ph": "X",
+        "ts": start_ns / 1000,
+        "dur": (end_ns - start_ns) / 1000,
+        "pid": os.getpid(),
+        "tid": 1,
+        "args": args,
+    }
@@ -1,5 +1,5 @@
 import random
-from typing import Self
+from typing import Optional, Self
 
 
 class RandomList:
@@ -8,29 +8,46 @@ class RandomList:
 
     There is no guarantee, that the order is preserved as numbers can be appendend.
 
+    Popping swaps the chosen item with the last item, and the position of every number is kept,
+    so ``pop_random``, ``append`` and membership are constant time.
+
     >>> from random_list import RandomList
     >>> rl = RandomList(5)
     """
 
-    def __init__(self: Self, size: int) -> None:
+    __ABSENT: int = -1
+
+    def __init__(self: Self, size: int, rng: Optional[random.Random] = None) -> None:
         """
         Creates a list with integers as a range.
 
         e.g. `[0,1,2,3,4]`
+
+        Random choices are made with `rng`; a new ``random.Random`` if `None`.
         """
         if type(size) is not int:
             raise ValueError("argument size is not 'int'")
+        self._rng: random.Random = rng if rng is not None else random.Random()
         self._arg_size = size
         self._list = list(range(size))
+        # Index in `_list` by number; `__ABSENT` if not in list
+        self._positions = list(range(size))
 
     def __len__(self: Self) -> int:
         """Return the number of items in the list."""
         return len(self._list)
 
+    def __contains__(self: Self, number: object) -> bool:
+        if type(number) is not int or number < 0 or number >= self._arg_size:
+            return False
+        return self._positions[number] != RandomList.__ABSENT
+
     def pop_random(self: Self) -> int:
         """
         Chooses a random index, remove item from list and returns chosen value.
 
+        The last item takes the place of the chosen item.
+
         e.g. ``[0,2,4]`` -> ``[0,4]`` and returns ``2``
 
         >>> from random_list import RandomList
@@ -38,17 +55,55 @@ class RandomList:
         >>> print(rl.pop_random())
         3
         """
-        if not self._list or len(self._list) == 0:
+        if not self._list:
             raise ValueError("list has no elements to pop")
 
-        chosen: int = self._list.pop(random.randrange(len(self._list)))
+        return self._remove_at(self._rng.randrange(len(self._list)))
+
+    def _remove_at(self: Self, index: int) -> int:
+        """Remove the item at index by moving the last item in its place."""
+        items: list[int] = self._list
+        chosen: int = items[index]
+        last: int = items.pop()
+        if last != chosen:
+            items[index] = last
+            self._positions[last] = index
+        self._positions[chosen] = RandomList.__ABSENT
         return chosen
 
+    def pop_random_many(self: Self, count: int) -> list[int]:
+        """Pops `count` random items; the same items as `count` calls to ``pop_random``."""
+        if count > len(self._list):
+            raise ValueError(f"list has {len(self._list)} elements; cannot pop {count}")
+        return [self.pop_random() for _ in range(count)]
+
     def append(self: Self, number: int) -> None:
         if type(number) is not int:
             raise ValueError("argument is not 'int'")
         if number < 0 or number >= self._arg_size:
             raise ValueError(f"{number} is outside boundary [0,{self._arg_size}[")
-        if number in self._list:
+        if self._positions[number] != RandomList.__ABSENT:
             raise ValueError(f"{number} is already in list")
-        self._list.append(int(number))
+        self._positions[number] = len(self._list)
+        self._list.append(number)
+
+    def resize(self: Self, size: int) -> None:
+        """
+        Change the boundary to `size`.
+
+        Growing appends the new numbers; shrinking removes the numbers that are now outside the boundary.
+        """
+        if type(size) is not int:
+            raise ValueError("argument size is not 'int'")
+        old_size: int = self._arg_size
+        if size < old_size:
+            for number in range(size, old_size):
+                if self._positions[number] != RandomList.__ABSENT:
+                    self._remove_at(self._positions[number])
+            del self._positions[size:]
+            self._arg_size = size
+            return
+        self._positions.extend([RandomList.__ABSENT] * (size - old_size))
+        self._arg_size = size
+        for number in range(old_size, size):
+            self.append(number)
@@ -0,0 +1,82 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from matrix_asciicast import AsciicastWriter
+from matrix_rain import main, sleep_timer
+from matrix_screen_ansi import (
+    DISABLE_AUTOWRAP,
+    ERASE_SCREEN,
+    HIDE_CURSOR,
+    RESTORE_TERMINAL,
+)
+
+
+def read_cast(path: Path) -> tuple[dict, list[list]]:
+    header, *events = path.read_text(encoding="utf-8").splitlines()
+    return json.loads(header), [json.loads(event) for event in events]
+
+
+def test_writer_stamps_frames_on_the_frame_period() -> None:
+    f = io.StringIO()
+    cast = AsciicastWriter(f, 80, 24, 0.05, timestamp=7)
+    for data in (b"a", b"", b"\xe2\x94\x82", b"b"):
+        cast.write_frame(data)
+    header, *events = (json.loads(line) for line in f.getvalue().splitlines())
+    assert header == {
+        "version": 2,
+        "width": 80,
+        "height": 24,
+        "timestamp": 7,
+        "env": {"TERM": "xterm-256color"},
+    }
+    assert events == [[0.0, "o", "a"], [0.1, "o", "│"], [0.15, "o", "b"]]
+    assert cast.frames == 4 and cast.events == 3
+    assert cast.duration == pytest.approx(0.2)
+
+
+def test_writer_rejects_frame_time() -> None:
+    with pytest.raises(ValueError):
+        AsciicastWriter(io.StringIO(), 80, 24, 0)
+
+
+def test_asciicast_export(tmp_path: Path, capsys) -> None:
+    path = tmp_path / "rain.cast"
+    main(
+        [
+            "--asciicast",
+            str(path),
+            "--headless",
+            "40x24",
+            "--frames",
+            "50",
+            "--seed",
+            "3",
+        ]
+    )
+    assert "50 frames at 40x24" in capsys.readouterr().out
+
+    header, events = read_cast(path)
+    assert (header["version"], header["width"], header["height"]) == (2, 40, 24)
+    # One event per frame, the final erase and the terminal restore
+    assert len(events) == 52
+    assert [event[0] for event in events] == [
+        pytest.approx(n * sleep_timer.sleep_sec) for n in range(52)
+    ]
+    assert all(event[1] == "o" for event in events)
+    assert events[0][2].startswith((HIDE_CURSOR + DISABLE_AUTOWRAP).decode())
+    assert events[-2][2].endswith(ERASE_SCREEN.decode())
+    assert events[-1][2] == RESTORE_TERMINAL.decode()
+
+
+def test_asciicast_export_is_reproducible(tmp_path: Path) -> None:
+    casts = []
+    for name in ("first.cast", "second.cast"):
+        path = tmp_path / name
+        main(["--asciicast", str(path), "--frames", "30", "--seed", "11"])
+        casts.append(read_cast(path))
+    (first_header, first_events), (second_header, second_events) = casts
+    assert (first_header["width"], first_header["height"]) == (80, 24)
+    assert first_events == second_events
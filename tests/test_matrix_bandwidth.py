@@ -0,0 +1,122 @@
+import itertools
+
+import pytest
+
+from matrix_bandwidth import MatrixBandwidthBudget
+import matrix_rain
+from matrix_rain import argument_parsing, configure_screen, rain_loop, sleep_timer
+from matrix_screen import CELL_OVERHEAD_BYTES
+from matrix_screen_headless import HeadlessScreen
+
+SCREEN_COLUMNS: int = 80
+SCREEN_LINES: int = 24
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now: float = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_budget_refills_up_to_burst() -> None:
+    clock = FakeClock()
+    sut = MatrixBandwidthBudget(1000, burst_sec=0.5, clock=clock)
+    clock.now = 10.0
+    # Idle time does not build up more than the burst
+    sut.record(600)
+    assert sut.over_budget
+    assert round(sut.delay(), 3) == 0.1
+    clock.now = 10.2
+    sut.record(0)
+    assert not sut.over_budget
+    assert sut.total_bytes == 600
+    assert round(sut.throughput, 1) == round(600 / 10.2, 1)
+
+
+def test_screen_counts_frame_bytes() -> None:
+    sut = HeadlessScreen(SCREEN_LINES, SCREEN_COLUMNS, [])
+    sut.addstr(0, 0, "ab", 9)
+    sut.addstr(1, 0, "c", 9)
+    sut.refresh()
+    assert sut.last_frame_bytes == 3 + 2 * CELL_OVERHEAD_BYTES
+    sut.refresh()
+    assert sut.last_frame_bytes == 0
+    assert sut.bytes_written == 3 + 2 * CELL_OVERHEAD_BYTES
+
+
+def test_buffered_screen_counts_coalesced_bytes() -> None:
+    sut = HeadlessScreen(SCREEN_LINES, SCREEN_COLUMNS, [], buffered=True)
+    for x in range(4):
+        sut.addstr(0, x, "a", 9)
+    sut.refresh()
+    assert sut.last_frame_bytes == 4 + CELL_OVERHEAD_BYTES
+
+
+@pytest.mark.parametrize("buffered", [False, True])
+def test_screen_counts_utf8_bytes(buffered: bool) -> None:
+    sut = HeadlessScreen(SCREEN_LINES, SCREEN_COLUMNS, [], buffered=buffered)
+    for x, glyph in enumerate("aæ€"):
+        sut.addstr(0, x, glyph, 9)
+    sut.refresh()
+    calls = 1 if buffered else 3
+    assert sut.last_frame_bytes == 1 + 2 + 3 + calls * CELL_OVERHEAD_BYTES
+
+
+def test_over_bandwidth_starts_fewer_trails() -> None:
+
+    def bytes_per_frame(argv: list[str]) -> float:
+        mscreen = HeadlessScreen(SCREEN_LINES, SCREEN_COLUMNS, [-1] * 300)
+        args = argument_parsing(["--seed", "2", "--density", "1"] + argv)
+        configure_screen(mscreen, args)
+        frames = rain_loop(mscreen, args, pace=False)
+        return mscreen.bytes_written / frames
+
+    unlimited = bytes_per_frame([])
+    # Not paced, so frames run far faster than 1 kB/s allows; the controller backs off instead
+    limited = bytes_per_frame(["--max-bandwidth", "1000"])
+    assert limited < unlimited / 2
+
+
+def test_budget_delay_is_bounded_by_debt() -> None:
+    clock = FakeClock()
+    sut = MatrixBandwidthBudget(100, burst_sec=1.0, clock=clock)
+    for now in itertools.islice(itertools.count(0.0, 0.1), 10):
+        clock.now = now
+        sut.record(50)
+    assert round(sut.delay(), 3) == round((10 * 50 - 100 - 0.9 * 100) / 100, 3)
+
+
+class PacedScreen(HeadlessScreen):
+    """A headless screen on which waiting for input lets time pass on `clock`."""
+
+    def __init__(self, script, clock: FakeClock, on_refresh) -> None:
+        super().__init__(SCREEN_LINES, SCREEN_COLUMNS, script, on_refresh)
+        self._clock = clock
+
+    def wait_for_input(self, timeout: float) -> bool:
+        self._clock.now += timeout
+        return False
+
+
+def test_catch_up_does_not_undo_bandwidth_hold(monkeypatch) -> None:
+    clock = FakeClock()
+    monkeypatch.setattr(sleep_timer, "_clock", clock)
+    monkeypatch.setattr(
+        matrix_rain,
+        "MatrixBandwidthBudget",
+        lambda max_bytes_per_sec: MatrixBandwidthBudget(max_bytes_per_sec, clock=clock),
+    )
+    sleep_timer.reset()
+    refreshed: list[float] = []
+    mscreen = PacedScreen([-1] * 100, clock, lambda window: refreshed.append(clock.now))
+    args = argument_parsing(["--seed", "2", "--catch-up", "--max-bandwidth", "5000"])
+    configure_screen(mscreen, args)
+    rain_loop(mscreen, args)
+    sleep_timer.reset()
+
+    intervals = [later - earlier for earlier, later in zip(refreshed, refreshed[1:])]
+    # Frames were held back, and none was sent early to make up for it
+    assert max(intervals) > sleep_timer.sleep_sec * 1.5
+    assert min(intervals) >= sleep_timer.sleep_sec * 0.999
@@ -0,0 +1,132 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from matrix_batch import (
+    KIND_ASCIICAST,
+    KIND_PNG,
+    KIND_RECORD,
+    BatchJob,
+    expand_job,
+    load_manifest,
+    main,
+    run_batch,
+    run_job,
+)
+from matrix_recording import open_replay
+
+
+def test_expand_job_names_variants() -> None:
+    jobs = expand_job(
+        {"name": "rain", "seed": [1, 2], "size": ["80x24", "40x20"], "color": "cyan"}
+    )
+    assert [job.name for job in jobs] == [
+        "rain-80x24-s1",
+        "rain-40x20-s1",
+        "rain-80x24-s2",
+        "rain-40x20-s2",
+    ]
+    assert {(job.seed, job.size, job.color) for job in jobs} == {
+        (seed, size, "cyan") for seed in (1, 2) for size in ((80, 24), (40, 20))
+    }
+
+
+@pytest.mark.parametrize(
+    "entry",
+    [
+        {"seed": 1},
+        {"name": "x", "speed": 2},
+        {"name": "x", "kind": "gif"},
+        {"name": "x", "frames": 0},
+        {"name": "x", "color": ["green", "pink"]},
+        {"name": "x", "size": "4x4"},
+        {"name": "x", "density": 2},
+        {"name": "x", "seed": 1.5},
+        {"name": "x", "seed": [1, True]},
+        {"name": "x", "seed": "1"},
+        {"name": "../x"},
+        {"name": "a/b"},
+        {"name": "a\\b"},
+        {"name": ".."},
+        {"name": ""},
+    ],
+)
+def test_expand_job_rejects_invalid_entries(entry: dict) -> None:
+    with pytest.raises(ValueError):
+        expand_job(entry)
+
+
+def test_load_manifest_rejects_duplicate_names(tmp_path: Path) -> None:
+    path = tmp_path / "manifest.json"
+    path.write_text(
+        json.dumps([{"name": "a"}, {"name": "a", "seed": 2}]), encoding="utf-8"
+    )
+    with pytest.raises(ValueError):
+        load_manifest(str(path))
+
+
+def test_job_output_does_not_depend_on_worker(tmp_path: Path) -> None:
+    jobs = [
+        BatchJob("a", KIND_RECORD, 150, 3, (40, 20)),
+        BatchJob("b", KIND_RECORD, 150, 3, (40, 20), "cyan"),
+    ]
+    results, failed = run_batch(
+        jobs, str(tmp_path / "pool"), workers=2, progress=io.StringIO()
+    )
+    assert not failed
+    assert sorted(result.name for result in results) == ["a", "b"]
+    run_job(jobs[0], str(tmp_path))
+
+    with open_replay(str(tmp_path / "pool" / "a.mdr")) as pooled, open_replay(
+        str(tmp_path / "a.mdr")
+    ) as direct:
+        assert pooled.frame_count == direct.frame_count == 150
+        assert pooled.seek(150).snapshot() == direct.seek(150).snapshot()
+
+
+def test_batch_resumes_and_reports_failures(tmp_path: Path) -> None:
+    jobs = [
+        BatchJob("rain", KIND_RECORD, 600, 1, (40, 20)),
+        BatchJob("cast", KIND_ASCIICAST, 20, 1, (40, 20)),
+        # Too small for a single cell of the glyph atlas
+        BatchJob("broken", KIND_PNG, 20, 1, (10, 10)),
+    ]
+    progress = io.StringIO()
+    results, failed = run_batch(jobs, str(tmp_path), workers=2, progress=progress)
+    assert sorted(result.name for result in results) == ["cast", "rain"]
+    assert failed == ["broken"]
+    assert "rain: 500/600 frames" in progress.getvalue()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["cast.cast", "rain.mdr"]
+
+    progress = io.StringIO()
+    results, failed = run_batch(jobs[:2], str(tmp_path), workers=2, progress=progress)
+    assert results == [] and failed == []
+    assert "skipping 2 of 2 jobs" in progress.getvalue()
+
+
+class FailingProgress:
+    def put(self, report) -> None:
+        raise RuntimeError("interrupted")
+
+
+@pytest.mark.parametrize("kind", [KIND_RECORD, KIND_ASCIICAST, KIND_PNG])
+def test_failed_job_leaves_no_partial_output(tmp_path: Path, kind: str) -> None:
+    size = (240, 240) if kind == KIND_PNG else (40, 20)
+    with pytest.raises(RuntimeError):
+        run_job(BatchJob("rain", kind, 600, 1, size), str(tmp_path), FailingProgress())
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_main_prints_summary(tmp_path: Path, capsys) -> None:
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(
+        json.dumps([{"name": "rain", "frames": 30, "seed": [1, 2]}]), encoding="utf-8"
+    )
+    main([str(manifest), "-o", str(tmp_path / "out"), "--jobs", "2"])
+    assert "2 jobs, 60 frames in" in capsys.readouterr().out
+    assert sorted(path.name for path in (tmp_path / "out").iterdir()) == [
+        "rain-s1.mdr",
+        "rain-s2.mdr",
+    ]
@@ -0,0 +1,33 @@
+import json
+
+import matrix_benchmark
+
+
+def test_benchmark_results_cover_grid(tmp_path) -> None:
+    # GIVEN
+    output = tmp_path / "bench.json"
+    # WHEN
+    matrix_benchmark.main(
+        [
+            "--size",
+            "80x24",
+            "--size",
+            "120x30",
+            "--rate",
+            "2",
+            "--frames",
+            "5",
+            "--operations",
+            "10",
+            "-o",
+            str(output),
+        ]
+    )
+    # THEN
+    results = json.loads(output.read_text(encoding="utf-8"))
+    names = [(r["name"], r["width"], r["height"]) for r in results["results"]]
+    assert ("process_trails", 80, 24) in names
+    assert ("frame", 120, 30) in names
+    assert ("random_list_pop_append", 120, 0) in names
+    assert ("characters_next", 0, 0) in names
+    assert all(r["ns_per_operation"] >= 0 for r in results["results"])
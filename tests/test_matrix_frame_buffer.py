@@ -0,0 +1,60 @@
+from matrix_frame_buffer import FrameStats, MatrixFrameBuffer
+from matrix_rain import argument_parsing, configure_screen, rain_loop
+from matrix_screen_headless import HeadlessScreen
+
+SCREEN_COLUMNS: int = 40
+SCREEN_LINES: int = 24
+SEED: int = 7
+
+
+def record(sut: MatrixFrameBuffer) -> tuple[list, FrameStats]:
+    calls: list = []
+    stats = sut.flush(lambda y, x, s, attr: calls.append((y, x, s, attr)))
+    return calls, stats
+
+
+def test_fb_overwritten_cell_is_written_once() -> None:
+    sut = MatrixFrameBuffer()
+    sut.addstr(3, 5, " ", 9)
+    sut.addstr(3, 5, "X", 10)
+    calls, stats = record(sut)
+    assert calls == [(3, 5, "X", 10)]
+    assert stats == FrameStats(writes=2, cells=1, calls=1)
+
+
+def test_fb_runs_split_on_attribute_gap_and_line() -> None:
+    sut = MatrixFrameBuffer()
+    for x, attr in [(0, 9), (1, 9), (2, 10), (4, 10)]:
+        sut.addstr(0, x, "a", attr)
+    sut.addstr(1, 3, "b", 10)
+    calls, stats = record(sut)
+    assert calls == [(0, 0, "aa", 9), (0, 2, "a", 10), (0, 4, "a", 10), (1, 3, "b", 10)]
+    assert stats == FrameStats(writes=5, cells=5, calls=4)
+    assert len(sut) == 0
+
+
+def test_fb_discard() -> None:
+    sut = MatrixFrameBuffer()
+    sut.addstr(0, 0, "a", 9)
+    sut.discard()
+    calls, _ = record(sut)
+    assert calls == []
+
+
+def test_fb_same_frames_as_unbuffered() -> None:
+
+    def run(buffered: bool) -> list[list[str]]:
+        frames: list[list[str]] = []
+        mscreen = HeadlessScreen(
+            SCREEN_LINES,
+            SCREEN_COLUMNS,
+            [-1] * 100,
+            lambda window: frames.append(window.snapshot()),
+            buffered=buffered,
+        )
+        args = argument_parsing(["--seed", str(SEED)])
+        configure_screen(mscreen, args)
+        rain_loop(mscreen, args, pace=False)
+        return frames
+
+    assert run(True) == run(False)
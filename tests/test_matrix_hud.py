@@ -0,0 +1,96 @@
+import tracemalloc
+
+from matrix_bandwidth import MatrixBandwidthBudget
+from matrix_hud import FrameTimeHistogram, MatrixHud
+from matrix_rain import argument_parsing, configure_screen, rain_loop
+from matrix_screen_headless import HeadlessScreen
+
+SCREEN_COLUMNS: int = 40
+SCREEN_LINES: int = 24
+HUD_KEY: int = ord("h")
+
+
+def run(script) -> list[list[str]]:
+    frames: list[list[str]] = []
+    mscreen = HeadlessScreen(
+        SCREEN_LINES,
+        SCREEN_COLUMNS,
+        script,
+        lambda window: frames.append(window.snapshot()),
+    )
+    args = argument_parsing(["--seed", "3"])
+    configure_screen(mscreen, args)
+    rain_loop(mscreen, args, pace=False)
+    return frames
+
+
+def hud_region(frame: list[str]) -> list[str]:
+    return [
+        line[SCREEN_COLUMNS - MatrixHud.WIDTH :]
+        for line in frame[: len(MatrixHud.LABELS)]
+    ]
+
+
+def test_histogram_percentiles() -> None:
+    sut = FrameTimeHistogram(bin_width=0.001, bins=100)
+    for millis in range(1, 101):
+        sut.record(millis / 1000 - 0.0005)
+    assert len(sut) == 100
+    assert round(sut.percentile(50), 3) == 0.050
+    assert round(sut.percentile(99), 3) == 0.099
+    assert round(sut.fps, 1) == round(
+        100 / sum(m / 1000 - 0.0005 for m in range(1, 101)), 1
+    )
+
+
+def test_histogram_is_rolling_and_clamped() -> None:
+    sut = FrameTimeHistogram(bin_width=0.001, bins=10, window=3)
+    for frame_time in (0.001, 0.001, 0.001, 0.5, 0.5, 0.5):
+        sut.record(frame_time)
+    assert len(sut) == 3
+    # Only the last three frames are counted, all in the last bin
+    assert round(sut.percentile(1), 3) == 0.010
+    assert round(sut.fps, 1) == 2.0
+
+
+def test_histogram_record_does_not_allocate() -> None:
+    sut = FrameTimeHistogram()
+    sut.record(0.01)
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        for i in range(1000):
+            sut.record(i / 10000)
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert after - before < 256
+
+
+def test_hud_toggle_reserves_corner() -> None:
+    frames = run([-1] * 30 + [HUD_KEY] + [-1] * 30 + [HUD_KEY] + [-1] * 5)
+    shown = hud_region(frames[60])
+    assert [line.split()[0] for line in shown] == [
+        "fps",
+        "p50",
+        "p99",
+        "trails",
+        "avail",
+        "cells",
+        "kB/s",
+    ]
+    # Trails do not draw over the HUD; the HUD lines are redrawn unchanged apart from the numbers
+    for frame in frames[31:62]:
+        assert [line[: MatrixHud.LABEL_WIDTH] for line in hud_region(frame)] == [
+            f"{label:<{MatrixHud.LABEL_WIDTH}}" for label in MatrixHud.LABELS
+        ]
+    # Hidden again: the corner is blanked and given back to the trails
+    assert not any("fps" in line or "trails" in line for line in hud_region(frames[62]))
+
+
+def test_hud_shows_measured_throughput() -> None:
+    clock = iter([0.0, 2.0]).__next__
+    bandwidth = MatrixBandwidthBudget(10_000, clock=clock)
+    bandwidth.record(3000)
+    sut = MatrixHud(bandwidth=bandwidth)
+    assert sut.lines(0, 0)[-1].split() == ["kB/s", "1.5"]
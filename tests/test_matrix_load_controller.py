@@ -0,0 +1,113 @@
+import argparse
+
+import pytest
+
+from matrix_load_controller import MatrixLoadController
+from matrix_rain import argument_parsing, configure_screen, rain_loop, validate_fraction
+from matrix_screen_headless import HeadlessScreen
+
+SCREEN_COLUMNS: int = 100
+SCREEN_LINES: int = 20
+
+
+def test_controller_default_is_fixed_rate() -> None:
+    sut = MatrixLoadController()
+    assert (
+        sut.to_activate(active=0, width=SCREEN_COLUMNS, height=SCREEN_LINES)
+        == MatrixLoadController.DEFAULT_TO_ACTIVATE
+    )
+    assert (
+        sut.to_activate(active=99, width=SCREEN_COLUMNS, height=SCREEN_LINES)
+        == MatrixLoadController.DEFAULT_TO_ACTIVATE
+    )
+
+
+def test_controller_fills_to_density_spread_over_frames() -> None:
+    sut = MatrixLoadController(density=0.5)
+    # Target of 50 trails spread over about half the screen height
+    assert sut.to_activate(active=0, width=SCREEN_COLUMNS, height=SCREEN_LINES) == 5
+    assert sut.to_activate(active=48, width=SCREEN_COLUMNS, height=SCREEN_LINES) == 2
+    assert sut.to_activate(active=60, width=SCREEN_COLUMNS, height=SCREEN_LINES) == 0
+
+
+def test_controller_backs_off_over_budget_and_recovers() -> None:
+    sut = MatrixLoadController(density=1.0, budget=0.010)
+    for _ in range(20):
+        sut.record_frame_cost(0.050)
+    assert sut.scale == MatrixLoadController.MIN_SCALE
+    assert sut.to_activate(active=10, width=SCREEN_COLUMNS, height=SCREEN_LINES) == 0
+    for _ in range(100):
+        sut.record_frame_cost(0.001)
+    assert sut.scale == 1.0
+
+
+def test_controller_without_budget_ignores_cost() -> None:
+    sut = MatrixLoadController(density=1.0)
+    sut.record_frame_cost(10.0)
+    assert sut.scale == 1.0
+
+
+@pytest.mark.parametrize("value", ["0", "1.5", "-0.1", "x"])
+def test_validate_fraction_rejects(value: str) -> None:
+    with pytest.raises(argparse.ArgumentTypeError):
+        validate_fraction(value)
+
+
+@pytest.mark.parametrize("density", [0.1, 0.5])
+def test_density_is_kept(density: float) -> None:
+    active: list[int] = []
+
+    def count_active(window) -> None:
+        active.append(
+            sum(1 for column in zip(*window.snapshot()) if "".join(column).strip())
+        )
+
+    mscreen = HeadlessScreen(SCREEN_LINES, SCREEN_COLUMNS, [-1] * 200, count_active)
+    args = argument_parsing(["--seed", "5", "--density", str(density)])
+    configure_screen(mscreen, args)
+    rain_loop(mscreen, args, pace=False)
+    # Columns showing a trail once the screen has filled; a trail can leave a column before its replacement shows
+    steady = active[100:200]
+    assert max(steady) <= density * SCREEN_COLUMNS + 2
+    assert sum(steady) / len(steady) >= density * SCREEN_COLUMNS * 0.6
+
+
+def test_controller_backs_off_on_churn() -> None:
+    sut = MatrixLoadController(density=1.0, max_churn=0.1)
+    for _ in range(20):
+        sut.record_frame_cost(0.001, churn=0.5)
+    assert sut.scale == MatrixLoadController.MIN_SCALE
+    for _ in range(100):
+        sut.record_frame_cost(0.001, churn=0.01)
+    assert sut.scale == 1.0
+
+
+def test_max_churn_limits_cells_changed() -> None:
+    changed: list[int] = []
+    previous: list[str] = []
+
+    def count_changed(window) -> None:
+        nonlocal previous
+        snapshot = window.snapshot()
+        if previous:
+            changed.append(
+                sum(
+                    a != b
+                    for old, new in zip(previous, snapshot)
+                    for a, b in zip(old, new)
+                )
+            )
+        previous = snapshot
+
+    def run(argv: list[str]) -> float:
+        changed.clear()
+        previous.clear()
+        mscreen = HeadlessScreen(
+            SCREEN_LINES, SCREEN_COLUMNS, [-1] * 200, count_changed
+        )
+        args = argument_parsing(["--seed", "5", "--density", "1"] + argv)
+        configure_screen(mscreen, args)
+        rain_loop(mscreen, args, pace=False)
+        return sum(changed[100:]) / len(changed[100:])
+
+    assert run(["--max-churn", "0.05"]) < run([]) / 2
@@ -0,0 +1,32 @@
+import random
+
+import pytest
+
+from matrix_rain_characters import MatrixRainCharacters
+
+SEED: int = 3
+
+
+def test_mrc_block_size_zero_fails() -> None:
+    with pytest.raises(ValueError):
+        MatrixRainCharacters(0)
+
+
+@pytest.mark.parametrize("block_size", [1, 7, MatrixRainCharacters.DEFAULT_BLOCK_SIZE])
+def test_mrc_seeded_output_independent_of_take_or_next(block_size: int) -> None:
+    sut = MatrixRainCharacters(block_size, random.Random(SEED))
+    expected = [next(sut) for _ in range(50)]
+    sut = MatrixRainCharacters(block_size, random.Random(SEED))
+    assert (
+        sut.take(3) + sut.take(0) + sut.take(20) + [next(sut)] + sut.take(26)
+        == expected
+    )
+
+
+def test_mrc_discard_restarts_from_random() -> None:
+    rng = random.Random(SEED)
+    sut = MatrixRainCharacters(16, rng)
+    first = sut.take(5)
+    rng.seed(SEED)
+    sut.discard()
+    assert sut.take(5) == first
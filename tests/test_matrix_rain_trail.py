@@ -166,3 +166,16 @@ def test_mrt_move_tail() -> None:
     assert sut.is_tail_visible() is False
     assert sut.is_visible() is False
     assert sut.is_exhausted() is True
+
+
+def test_mrt_advance_is_move_forward_and_is_exhausted() -> None:
+    sut = MatrixRainTrail(0, SCREEN_COLUMNS, SCREEN_LINES)
+    other = MatrixRainTrail(0, SCREEN_COLUMNS, SCREEN_LINES)
+    other._length = sut._length
+    while True:
+        other.move_forward()
+        exhausted = sut.advance()
+        assert sut.head_start() == other.head_start()
+        assert exhausted is other.is_exhausted()
+        if exhausted:
+            break
@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from matrix_rain import process_trail_arrays, process_trails  # noqa: E402
+from matrix_rain_characters import MatrixRainCharacters  # noqa: E402
+from matrix_rain_trail_arrays import MatrixRainTrailArrays  # noqa: E402
+from matrix_rain_trails import MatrixRainTrails  # noqa: E402
+
+SCREEN_COLUMNS: int = 40
+SCREEN_LINES: int = 24
+FRAMES: int = 200
+SEED: int = 1234
+
+
+class RecordingScreen:
+    """Minimal stand-in for ``MatrixScreen`` recording every ``addstr`` per frame."""
+
+    def __init__(self, width: int, height: int) -> None:
+        self.width = width
+        self.height = height
+        self.cells: dict[tuple[int, int], tuple[str, int]] = {}
+
+    def addstr(self, y: int, x: int, s: str, attr: int) -> None:
+        self.cells[(y, x)] = (s, attr)
+
+    def color_pair(self, pair_number: int) -> int:
+        return pair_number
+
+
+def run(trails, process, rng: random.Random, resize_to=None) -> list:
+    screen = RecordingScreen(trails._width, trails._height)
+    char_itr = MatrixRainCharacters(block_size=64, rng=rng)
+    frames: list = []
+    for frame in range(FRAMES):
+        if resize_to is not None and frame == FRAMES // 2:
+            screen.width, screen.height = resize_to
+            frames.append(trails.resize(*resize_to))
+        trails.activate_if_available(2, 1)
+        process(screen, trails, char_itr)
+        frames.append(dict(screen.cells))
+    return frames
+
+
+def run_objects(width: int, height: int, resize_to=None) -> list:
+    rng = random.Random(SEED)
+    return run(MatrixRainTrails(width, height, rng), process_trails, rng, resize_to)
+
+
+def run_arrays(width: int, height: int, resize_to=None) -> list:
+    rng = random.Random(SEED)
+    return run(
+        MatrixRainTrailArrays(width, height, rng), process_trail_arrays, rng, resize_to
+    )
+
+
+@pytest.mark.parametrize(
+    "width,height",
+    [
+        pytest.param(SCREEN_COLUMNS, SCREEN_LINES),
+        pytest.param(8, 8),  # Lower right corner is written often
+        pytest.param(300, 12),
+    ],
+)
+def test_arrays_same_output_as_objects(width: int, height: int) -> None:
+    assert run_arrays(width, height) == run_objects(width, height)
+
+
+@pytest.mark.parametrize("resize_to", [(30, 12), (60, 40)])
+def test_arrays_same_output_as_objects_after_resize(resize_to: tuple[int, int]) -> None:
+    assert run_arrays(SCREEN_COLUMNS, SCREEN_LINES, resize_to) == run_objects(
+        SCREEN_COLUMNS, SCREEN_LINES, resize_to
+    )
+
+
+def test_arrays_columns_are_unique_and_accounted_for() -> None:
+    sut = MatrixRainTrailArrays(SCREEN_COLUMNS, SCREEN_LINES, random.Random(SEED))
+    for _ in range(FRAMES):
+        sut.activate_if_available(3, 1)
+        sut.step()
+        columns = sut.columns.tolist()
+        assert len(set(columns)) == len(columns)
+        assert len(sut) + len(sut.available_column_numbers) == SCREEN_COLUMNS
+
+
+def test_arrays_instantiate_width_zero_fails() -> None:
+    with pytest.raises(ValueError):
+        MatrixRainTrailArrays(0, SCREEN_LINES)
@@ -0,0 +1,198 @@
+import random
+import tracemalloc
+
+import pytest
+
+from matrix_rain_trails import CellEvent, MatrixRainTrails, TrailEvent
+
+SCREEN_COLUMNS: int = 40
+SCREEN_LINES: int = 24
+
+
+@pytest.mark.parametrize(
+    "width,height", [(0, SCREEN_LINES), (SCREEN_COLUMNS, 0), (1.5, SCREEN_LINES)]
+)
+def test_mrts_instantiate_fails(width, height) -> None:
+    with pytest.raises(ValueError):
+        MatrixRainTrails(width, height)
+
+
+def test_mrts_replenish_keeps_order_of_remaining() -> None:
+    # GIVEN
+    sut = MatrixRainTrails(SCREEN_COLUMNS, SCREEN_LINES)
+    sut.activate_if_available(10, 1)
+    trails = list(sut.active_trails)
+    # WHEN
+    for trail in reversed(trails[::3]):
+        sut.exhaust(trail)
+    sut.replenish_exhausted()
+    # THEN
+    assert sut.active_trails == [trail for i, trail in enumerate(trails) if i % 3]
+    assert len(sut.active_trails) + len(sut.available_column_numbers) == SCREEN_COLUMNS
+
+
+def test_mrts_replenish_all() -> None:
+    sut = MatrixRainTrails(SCREEN_COLUMNS, SCREEN_LINES)
+    sut.activate_if_available(SCREEN_COLUMNS, 1)
+    assert len(sut.available_column_numbers) == 0
+    for trail in sut.active_trails:
+        sut.exhaust(trail)
+    sut.replenish_exhausted()
+    assert sut.active_trails == []
+    assert len(sut.available_column_numbers) == SCREEN_COLUMNS
+
+
+def run_frames(sut: MatrixRainTrails, frames: int) -> None:
+    for _ in range(frames):
+        sut.activate_if_available(2, 1)
+        for trail in sut.active_trails:
+            trail.move_forward()
+            if trail.is_exhausted():
+                sut.exhaust(trail)
+        sut.replenish_exhausted()
+
+
+def test_mrts_retired_trails_are_reused() -> None:
+    sut = MatrixRainTrails(SCREEN_COLUMNS, SCREEN_LINES)
+    run_frames(sut, 100)
+    created = {id(trail) for trail in sut.active_trails} | {
+        id(trail) for trail in sut._pool
+    }
+    run_frames(sut, 500)
+    assert {id(trail) for trail in sut.active_trails} <= created
+
+
+def test_mrts_no_steady_state_allocation() -> None:
+    # GIVEN a warmed up pool
+    sut = MatrixRainTrails(SCREEN_COLUMNS, SCREEN_LINES)
+    run_frames(sut, 200)
+    # WHEN
+    tracemalloc.start()
+    try:
+        run_frames(sut, 500)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    # THEN the active trails were allocated before tracing started;
+    # only the lists holding them may have been resized
+    trail_modules = [tracemalloc.Filter(True, "*matrix_rain_trail*.py")]
+    blocks = sum(
+        stat.count for stat in after.filter_traces(trail_modules).statistics("lineno")
+    )
+    assert len(sut.active_trails) > 10
+    assert blocks <= 3
+
+
+def test_mrts_resize_keeps_fitting_trails() -> None:
+    # GIVEN
+    sut = MatrixRainTrails(SCREEN_COLUMNS, SCREEN_LINES)
+    run_frames(sut, 30)
+    before = {
+        trail.column_number: (trail.head_start(), trail.tail_start())
+        for trail in sut.active_trails
+    }
+    # WHEN
+    blanks = sut.resize(20, 10)
+    # THEN
+    after = {trail.column_number: trail for trail in sut.active_trails}
+    assert set(after) == {column for column in before if column < 20}
+    assert len(sut.active_trails) + len(sut.available_column_numbers) == 20
+    for column, trail in after.items():
+        assert trail.length() <= 10 - 3
+        assert trail.head_start() == before[column][0]
+        old_tail = before[column][1]
+        expected = {
+            (line, column)
+            for line in range(max(old_tail, 0), min(trail.tail_start(), 10))
+        }
+        assert {cell for cell in blanks if cell[1] == column} == expected
+    run_frames(sut, 100)
+    assert all(
+        trail.column_number < 20 and trail.MAX_LENGTH == 7
+        for trail in sut.active_trails
+    )
+
+
+def test_mrts_uses_injected_rng() -> None:
+
+    class CountingRandom(random.Random):
+        calls: int = 0
+
+        def random(self) -> float:
+            self.calls += 1
+            return super().random()
+
+        def getrandbits(self, k: int) -> int:
+            self.calls += 1
+            return super().getrandbits(k)
+
+    rng = CountingRandom(5)
+    sut = MatrixRainTrails(SCREEN_COLUMNS, SCREEN_LINES, rng)
+    run_frames(sut, 50)
+    assert rng.calls > 0
+
+    # Same seed, same trails
+    first = MatrixRainTrails(SCREEN_COLUMNS, SCREEN_LINES, random.Random(5))
+    second = MatrixRainTrails(SCREEN_COLUMNS, SCREEN_LINES, random.Random(5))
+    run_frames(first, 50)
+    run_frames(second, 50)
+    assert [(t.column_number, len(t)) for t in first.active_trails] == [
+        (t.column_number, len(t)) for t in second.active_trails
+    ]
+
+
+def assert_invariants(sut: MatrixRainTrails, width: int) -> None:
+    columns = [trail.column_number for trail in sut.active_trails]
+    assert len(columns) == len(set(columns))
+    assert not set(columns) & set(sut.available_column_numbers._list)
+    assert len(sut.active_trails) + len(sut.available_column_numbers) == width
+
+
+@pytest.mark.parametrize(
+    "width,height,rate", [(SCREEN_COLUMNS, SCREEN_LINES, 2), (8, 8, 5), (200, 10, 1)]
+)
+def test_mrts_step_soak_keeps_invariants(width: int, height: int, rate: int) -> None:
+    sut = MatrixRainTrails(width, height, random.Random(11))
+    for _ in range(200):
+        sut.step(50, rate)
+        assert_invariants(sut, width)
+        assert all(
+            trail.head_start() >= -1 and trail.tail_start() < height
+            for trail in sut.active_trails
+        )
+
+
+def test_mrts_step_is_run_frames() -> None:
+    stepped = MatrixRainTrails(SCREEN_COLUMNS, SCREEN_LINES, random.Random(3))
+    framed = MatrixRainTrails(SCREEN_COLUMNS, SCREEN_LINES, random.Random(3))
+    stepped.step(300)
+    run_frames(framed, 300)
+    assert [
+        (t.column_number, len(t), t.head_start()) for t in stepped.active_trails
+    ] == [(t.column_number, len(t), t.head_start()) for t in framed.active_trails]
+
+
+def test_mrts_step_events_match_drawing() -> None:
+    from matrix_rain import process_trails
+    from matrix_rain_characters import MatrixRainCharacters
+    from matrix_screen import COLOR_PAIR_HEAD, COLOR_PAIR_TAIL
+    from matrix_screen_headless import HeadlessScreen
+
+    kinds = {COLOR_PAIR_HEAD: CellEvent.HEAD, COLOR_PAIR_TAIL: CellEvent.BODY}
+    drawn: list[TrailEvent] = []
+
+    class RecordingScreen(HeadlessScreen):
+        def addstr(self, y_coord: int, x_coord: int, s: str, attr: int) -> None:
+            kind = CellEvent.BLANK if s == " " else kinds[attr]
+            drawn.append(TrailEvent(kind, y_coord, x_coord))
+
+    mscreen = RecordingScreen(SCREEN_LINES, SCREEN_COLUMNS)
+    framed = MatrixRainTrails(SCREEN_COLUMNS, SCREEN_LINES, random.Random(9))
+    char_itr = MatrixRainCharacters(rng=random.Random(0))
+    stepped = MatrixRainTrails(SCREEN_COLUMNS, SCREEN_LINES, random.Random(9))
+    for events in stepped.step_events(200):
+        drawn.clear()
+        framed.activate_if_available(2, 1)
+        process_trails(mscreen, framed, char_itr)
+        assert events == drawn
+    assert any(event.kind is CellEvent.HEAD for event in events)
@@ -0,0 +1,151 @@
+import curses
+from pathlib import Path
+
+import pytest
+
+from matrix_rain import argument_parsing, configure_screen, main, run_loop, sleep_timer
+from matrix_recording import (
+    DEFAULT_KEYFRAME_INTERVAL,
+    RecordingError,
+    open_replay,
+    read_varint,
+    unzigzag,
+    write_varint,
+    zigzag,
+)
+from matrix_screen_headless import HeadlessScreen
+
+SCREEN_COLUMNS: int = 40
+SCREEN_LINES: int = 24
+FRAMES: int = 2 * DEFAULT_KEYFRAME_INTERVAL + 20
+
+
+def run(argv: list[str], script) -> list[list[str]]:
+    frames: list[list[str]] = []
+    mscreen = HeadlessScreen(
+        SCREEN_LINES,
+        SCREEN_COLUMNS,
+        script,
+        lambda window: frames.append(window.snapshot()),
+    )
+    args = argument_parsing(argv)
+    configure_screen(mscreen, args)
+    run_loop(mscreen, args, pace=False)
+    return frames
+
+
+@pytest.fixture
+def recording(tmp_path: Path) -> tuple[Path, list[list[str]]]:
+    path = tmp_path / "rain.mdr"
+    frames = run(["--seed", "8", "--record", str(path)], [-1] * (FRAMES - 1))
+    return path, frames
+
+
+def test_varint_round_trip() -> None:
+    out = bytearray()
+    values = [0, 1, 127, 128, 300, 2**40]
+    for value in values:
+        write_varint(out, value)
+    pos = 0
+    for value in values:
+        decoded, pos = read_varint(out, pos)
+        assert decoded == value
+    assert pos == len(out)
+    assert [unzigzag(zigzag(value)) for value in range(-5, 6)] == list(range(-5, 6))
+
+
+def test_replay_shows_recorded_frames(recording) -> None:
+    path, recorded = recording
+    replayed = run(["--replay", str(path), "--replay-speed", "0"], [-1] * (2 * FRAMES))
+    assert replayed == recorded
+
+
+@pytest.mark.parametrize(
+    "frame",
+    [
+        0,
+        1,
+        DEFAULT_KEYFRAME_INTERVAL - 1,
+        DEFAULT_KEYFRAME_INTERVAL,
+        FRAMES - 1,
+        FRAMES,
+    ],
+)
+def test_seek_gives_screen_before_frame(recording, frame: int) -> None:
+    path, recorded = recording
+    with open_replay(str(path)) as replay:
+        assert replay.frame_count == FRAMES
+        state = replay.seek(frame)
+    expected = recorded[frame - 1] if frame else [" " * SCREEN_COLUMNS] * SCREEN_LINES
+    assert state.snapshot() == expected
+
+
+def test_replay_from_seek(recording) -> None:
+    path, recorded = recording
+    start = DEFAULT_KEYFRAME_INTERVAL + 7
+    replayed = run(
+        ["--replay", str(path), "--replay-speed", "0", "--seek", str(start)],
+        [-1] * FRAMES,
+    )
+    assert replayed[:-1] == recorded[start:-1]
+
+
+def test_seek_across_resize(tmp_path: Path) -> None:
+    path = tmp_path / "resized.mdr"
+    script = [-1] * 150 + [(12, 30)] + [-1] * 20
+    recorded = run(["--seed", "4", "--record", str(path)], script)
+    with open_replay(str(path)) as replay:
+        for frame in (150, 151, 160, replay.frame_count):
+            assert replay.seek(frame).snapshot() == recorded[frame - 1]
+
+
+@pytest.mark.parametrize("content", [b"", b"x" * 100])
+def test_replay_rejects_other_files(tmp_path: Path, content: bytes) -> None:
+    path = tmp_path / "not_a_recording"
+    path.write_bytes(content)
+    with pytest.raises(RecordingError):
+        open_replay(str(path))
+
+
+def test_headless_replay_from_the_end(recording, capsys) -> None:
+    path, _ = recording
+    main(
+        [
+            "--headless",
+            "40x24",
+            "--replay",
+            str(path),
+            "--replay-speed",
+            "0",
+            "--seek",
+            str(FRAMES),
+        ]
+    )
+    assert capsys.readouterr().out == "0 frames at 40x24\n"
+
+
+def test_replay_of_empty_file_is_reported(tmp_path: Path, capsys) -> None:
+    path = tmp_path / "empty.mdr"
+    path.write_bytes(b"")
+    main(["--headless", "40x24", "--replay", str(path)])
+    assert "cannot replay" in capsys.readouterr().out
+
+
+def test_replay_keeps_speed_changes(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(sleep_timer, "sleep_sec", 0.1)
+    path = tmp_path / "faster.mdr"
+    script = [-1] * 10 + [curses.KEY_UP] + [-1] * (2 * DEFAULT_KEYFRAME_INTERVAL)
+    run(["--seed", "6", "--record", str(path)], script)
+    faster = 0.1 / sleep_timer.change_factor
+    with open_replay(str(path)) as replay:
+        assert replay.frame_time == 0.1
+        assert replay.frame_time_at(10) == 0.1
+        # The frame after the key press is the first faster one, also seen when seeking past a keyframe
+        for frame in (11, DEFAULT_KEYFRAME_INTERVAL, DEFAULT_KEYFRAME_INTERVAL + 5):
+            assert replay.frame_time_at(frame) == pytest.approx(faster)
+
+
+def test_replay_cannot_be_recorded(tmp_path: Path, capsys) -> None:
+    with pytest.raises(SystemExit):
+        argument_parsing(["--replay", "a.mdr", "--record", str(tmp_path / "b.mdr")])
+    assert "not allowed with argument --replay" in capsys.readouterr().err
@@ -0,0 +1,195 @@
+import random
+import struct
+import zlib
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from matrix_rain import process_trails  # noqa: E402
+from matrix_rain_characters import MatrixRainCharacters  # noqa: E402
+from matrix_rain_trails import MatrixRainTrails  # noqa: E402
+from matrix_render import (  # noqa: E402
+    PSF1_MAGIC,
+    PSF2_MAGIC,
+    GlyphAtlas,
+    MatrixRenderer,
+    block_glyph,
+    load_psf,
+    main,
+    png_bytes,
+)
+from matrix_screen import BLANK, COLOR_PAIR_HEAD  # noqa: E402
+from matrix_screen_headless import HeadlessScreen  # noqa: E402
+
+CHARS: str = MatrixRainCharacters.characters()
+
+
+def expected_frame(
+    atlas: GlyphAtlas, renderer: MatrixRenderer, mscreen: HeadlessScreen
+) -> np.ndarray:
+    """Render every cell of the headless screen from scratch."""
+    frame = np.empty_like(renderer.frame)
+    frame[:] = atlas.tiles[0, 0, 0]
+    for y in range(mscreen.height):
+        for x in range(mscreen.width):
+            char: str = mscreen.window.char_at(y, x)
+            if char == BLANK:
+                continue
+            tile: int = (
+                atlas.head(char)
+                if mscreen.window.attr_at(y, x) == COLOR_PAIR_HEAD
+                else atlas.tail(char)
+            )
+            frame[
+                y * atlas.height : (y + 1) * atlas.height,
+                x * atlas.width : (x + 1) * atlas.width,
+            ] = atlas.tiles[tile]
+    return frame
+
+
+def test_renderer_matches_terminal_drawing() -> None:
+    atlas = GlyphAtlas(None, CHARS)
+    # Frame sizes that are not whole cells leave a background border
+    renderer = MatrixRenderer(atlas, 30 * atlas.width + 5, 20 * atlas.height + 7)
+    mscreen = HeadlessScreen(renderer.lines, renderer.columns)
+
+    drawn_rng, rendered_rng = random.Random(5), random.Random(5)
+    drawn = MatrixRainTrails(mscreen.width, mscreen.height, drawn_rng)
+    drawn_chars = MatrixRainCharacters(rng=drawn_rng)
+    rendered = MatrixRainTrails(renderer.columns, renderer.lines, rendered_rng)
+    rendered_chars = MatrixRainCharacters(rng=rendered_rng)
+
+    for tick in range(60):
+        drawn.activate_if_available(3, 1)
+        process_trails(mscreen, drawn, drawn_chars)
+        for events in rendered.step_events(1, 3, 1):
+            renderer.apply(events, rendered_chars)
+        if tick % 10 == 9:
+            assert np.array_equal(
+                renderer.frame, expected_frame(atlas, renderer, mscreen)
+            )
+    assert renderer.cells_blitted > 0
+
+
+def test_atlas_colors() -> None:
+    atlas = GlyphAtlas(
+        None, "ab", head_color="red", tail_color="blue", back_color="white"
+    )
+    assert atlas.tiles.shape == (5, 24, 12, 3)
+    assert {tuple(pixel) for pixel in atlas.tiles[0].reshape(-1, 3)} == {
+        (229, 229, 229)
+    }
+    assert {tuple(pixel) for pixel in atlas.tiles[atlas.head("a")].reshape(-1, 3)} == {
+        (229, 229, 229),
+        (205, 0, 0),
+    }
+    assert {tuple(pixel) for pixel in atlas.tiles[atlas.tail("b")].reshape(-1, 3)} == {
+        (229, 229, 229),
+        (0, 0, 238),
+    }
+
+
+def test_block_glyph_is_symmetric_and_fits() -> None:
+    glyph = block_glyph("x", 12, 24)
+    assert glyph.shape == (24, 12)
+    assert glyph.any()
+    assert not glyph[0].any() and not glyph[:, 0].any()
+    assert np.array_equal(block_glyph("x", 12, 24), glyph)
+
+
+def test_png_bytes() -> None:
+    frame = np.arange(4 * 3 * 3, dtype=np.uint8).reshape(4, 3, 3)
+    data = png_bytes(frame)
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    assert struct.unpack(">II", data[16:24]) == (3, 4)
+    idat_length = struct.unpack(">I", data[33:37])[0]
+    assert data[37:41] == b"IDAT"
+    scanlines = np.frombuffer(
+        zlib.decompress(data[41 : 41 + idat_length]), np.uint8
+    ).reshape(4, 10)
+    assert not scanlines[:, 0].any()
+    assert np.array_equal(scanlines[:, 1:].reshape(4, 3, 3), frame)
+
+
+def glyph_rows(char: str, height: int) -> list[int]:
+    return [(ord(char) + row) & 0xFF for row in range(height)]
+
+
+def test_load_psf2(tmp_path: Path) -> None:
+    chars = ["a", "æ"]
+    header = PSF2_MAGIC + struct.pack("<7I", 0, 32, 1, len(chars), 16, 16, 7)
+    bitmaps = b"".join(bytes(glyph_rows(char, 16)) for char in chars)
+    table = "a".encode() + b"\xff" + "æÆ".encode() + b"\xfe" + "ae".encode() + b"\xff"
+    path = tmp_path / "font.psf"
+    path.write_bytes(header + bitmaps + table)
+
+    font = load_psf(str(path))
+    assert (font.width, font.height) == (7, 16)
+    assert set(font.glyphs) == {"a", "æ", "Æ"}
+    expected = np.unpackbits(np.array(glyph_rows("æ", 16), np.uint8)[:, None], axis=1)[
+        :, :7
+    ].astype(bool)
+    assert np.array_equal(font.glyphs["æ"], expected)
+    assert np.array_equal(font.glyphs["Æ"], font.glyphs["æ"])
+
+
+def test_load_psf1(tmp_path: Path) -> None:
+    bitmaps = b"".join(bytes(glyph_rows(chr(i), 8)) for i in range(256))
+    table = b"".join(struct.pack("<HH", 0x100 + i, 0xFFFF) for i in range(256))
+    path = tmp_path / "font.psf"
+    path.write_bytes(PSF1_MAGIC + bytes([0x02, 8]) + bitmaps + table)
+
+    font = load_psf(str(path))
+    assert (font.width, font.height) == (8, 8)
+    assert len(font.glyphs) == 256
+    expected = np.unpackbits(
+        np.array(glyph_rows(chr(65), 8), np.uint8)[:, None], axis=1
+    ).astype(bool)
+    assert np.array_equal(font.glyphs[chr(0x100 + 65)], expected)
+
+
+def test_load_psf_rejects_other_files(tmp_path: Path) -> None:
+    path = tmp_path / "font.psf"
+    path.write_bytes(b"not a font")
+    with pytest.raises(ValueError):
+        load_psf(str(path))
+
+
+def test_main_writes_raw_frames(tmp_path: Path, capsys) -> None:
+    path = tmp_path / "rain.rgb"
+    main(["-o", str(path), "--size", "120x200", "--frames", "5"])
+    assert path.stat().st_size == 5 * 120 * 200 * 3
+    assert "5 frames of 120x200 (10x8 cells)" in capsys.readouterr().err
+
+
+def test_renderer_rejects_small_frames() -> None:
+    with pytest.raises(ValueError):
+        MatrixRenderer(GlyphAtlas(None, CHARS), 120, 96)
+
+
+def test_main_writes_png_sequence(tmp_path: Path) -> None:
+    main(
+        [
+            "-o",
+            str(tmp_path / "frames"),
+            "--format",
+            "png",
+            "--size",
+            "120x200",
+            "--frames",
+            "3",
+        ]
+    )
+    assert sorted(path.name for path in (tmp_path / "frames").iterdir()) == [
+        f"frame_00000{i}.png" for i in range(3)
+    ]
+
+
+def test_main_rejects_other_fonts(tmp_path: Path, capsys) -> None:
+    path = tmp_path / "font.psf"
+    path.write_bytes(b"not a font")
+    with pytest.raises(SystemExit):
+        main(["-o", str(tmp_path / "rain.rgb"), "--font", str(path)])
+    assert "is not a PSF font" in capsys.readouterr().err
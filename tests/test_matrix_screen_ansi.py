@@ -0,0 +1,140 @@
+import curses
+import fcntl
+import os
+import pty
+import signal
+import struct
+import termios
+
+import pytest
+
+from matrix_rain import argument_parsing, configure_screen, rain_loop
+from matrix_screen import COLOR_PAIR_HEAD, COLOR_PAIR_TAIL, Action
+from matrix_screen_ansi import CSI, AnsiScreen, AnsiWindow, ansi_terminal
+
+SCREEN_COLUMNS: int = 40
+SCREEN_LINES: int = 24
+
+
+@pytest.fixture
+def pipes():
+    out_r, out_w = os.pipe()
+    in_r, in_w = os.pipe()
+    yield out_r, out_w, in_r, in_w
+    for fd in (out_r, out_w, in_r, in_w):
+        os.close(fd)
+
+
+def read_all(fd: int) -> bytes:
+    os.set_blocking(fd, False)
+    chunks = []
+    try:
+        while chunk := os.read(fd, 65536):
+            chunks.append(chunk)
+    except BlockingIOError:
+        pass
+    return b"".join(chunks)
+
+
+def test_ansi_window_writes_one_frame(pipes) -> None:
+    out_r, out_w, in_r, _ = pipes
+    sut = AnsiWindow(out_w, in_r, (SCREEN_LINES, SCREEN_COLUMNS))
+    sut.init_pair(COLOR_PAIR_TAIL, curses.COLOR_GREEN, curses.COLOR_BLACK)
+    sut.init_pair(COLOR_PAIR_HEAD, curses.COLOR_WHITE, curses.COLOR_BLACK)
+    sut.addstr(0, 0, "a", COLOR_PAIR_TAIL)
+    sut.addstr(0, 1, "æ", COLOR_PAIR_TAIL)  # cursor is already there, same color
+    sut.addstr(5, 3, "b", COLOR_PAIR_HEAD)
+    assert read_all(out_r) == b""
+    sut.refresh()
+    assert read_all(out_r) == (
+        CSI
+        + b"1;1H"
+        + CSI
+        + b"32;40m"
+        + b"a"
+        + "æ".encode()
+        + CSI
+        + b"6;4H"
+        + CSI
+        + b"37;40m"
+        + b"b"
+    )
+    assert sut.bytes_pending == 0
+
+
+def test_ansi_window_keys(pipes) -> None:
+    _, out_w, in_r, in_w = pipes
+    sut = AnsiWindow(out_w, in_r, (SCREEN_LINES, SCREEN_COLUMNS))
+    sut.timeout(0)
+    assert sut.getch() == -1
+    os.write(in_w, CSI + b"A" + CSI + b"B" + b"q")
+    assert [sut.getch() for _ in range(4)] == [
+        curses.KEY_UP,
+        curses.KEY_DOWN,
+        ord("q"),
+        -1,
+    ]
+
+
+def test_ansi_screen_rain_loop(pipes) -> None:
+    out_r, out_w, in_r, in_w = pipes
+    mscreen = AnsiScreen(out_w, in_r, (SCREEN_LINES, SCREEN_COLUMNS))
+    configure_screen(mscreen, argument_parsing(["-c", "blue", "-H", "red"]))
+    os.write(in_w, CSI + b"A" + b"q")
+    frames = rain_loop(mscreen, argument_parsing([]), pace=False)
+    output = read_all(out_r)
+    assert frames == 2
+    assert CSI + b"34;40m" in output
+    assert CSI + b"31;40m" in output
+    assert output.endswith(CSI + b"0;40m" + CSI + b"2J")
+
+
+def test_ansi_terminal_restores_settings() -> None:
+    controller, terminal = pty.openpty()
+    try:
+        fcntl.ioctl(
+            terminal,
+            termios.TIOCSWINSZ,
+            struct.pack("HHHH", SCREEN_LINES, SCREEN_COLUMNS, 0, 0),
+        )
+        saved = termios.tcgetattr(terminal)
+        with ansi_terminal(terminal, terminal) as mscreen:
+            assert termios.tcgetattr(terminal)[3] & termios.ICANON == 0
+            assert (mscreen.height, mscreen.width) == (SCREEN_LINES, SCREEN_COLUMNS)
+        assert termios.tcgetattr(terminal) == saved
+    finally:
+        os.close(controller)
+        os.close(terminal)
+
+
+def test_ansi_freeze_blocks_until_unfrozen(pipes) -> None:
+    _, out_w, in_r, in_w = pipes
+    sut = AnsiScreen(out_w, in_r, (SCREEN_LINES, SCREEN_COLUMNS))
+    sut.setup_screen("white", "green", "black")
+    os.write(in_w, b"fxF")
+    assert sut.handle_key_presses() is Action.RESUME
+    # Not blocking after unfreeze
+    assert sut.window.getch() == -1
+    assert sut.wait_for_input(0) is False
+    os.write(in_w, b"q")
+    assert sut.wait_for_input(0) is True
+    assert sut.handle_key_presses() is Action.BREAK
+
+
+def test_ansi_terminal_resize_on_sigwinch() -> None:
+    controller, terminal = pty.openpty()
+    try:
+        fcntl.ioctl(
+            terminal,
+            termios.TIOCSWINSZ,
+            struct.pack("HHHH", SCREEN_LINES, SCREEN_COLUMNS, 0, 0),
+        )
+        with ansi_terminal(terminal, terminal) as mscreen:
+            assert mscreen.validate_screen_size() is False
+            fcntl.ioctl(terminal, termios.TIOCSWINSZ, struct.pack("HHHH", 12, 20, 0, 0))
+            os.kill(os.getpid(), signal.SIGWINCH)
+            assert mscreen.validate_screen_size() is True
+            assert (mscreen.height, mscreen.width) == (12, 20)
+    finally:
+        os.close(controller)
+        os.close(terminal)
@@ -0,0 +1,114 @@
+import curses
+
+import pytest
+
+import matrix_rain
+from matrix_rain import argument_parsing, configure_screen, rain_loop
+from matrix_screen import Action, MatrixScreen
+from matrix_screen_headless import HeadlessScreen, HeadlessWindow
+
+SCREEN_COLUMNS: int = 40
+SCREEN_LINES: int = 24
+SEED: int = 42
+
+
+def run(
+    script,
+    width: int = SCREEN_COLUMNS,
+    height: int = SCREEN_LINES,
+    argv: tuple[str, ...] = (),
+) -> tuple[MatrixScreen, list[list[str]]]:
+    frames: list[list[str]] = []
+    mscreen = HeadlessScreen(
+        height, width, script, lambda window: frames.append(window.snapshot())
+    )
+    configure_screen(mscreen, argument_parsing(argv))
+    rain_loop(mscreen, argument_parsing(argv), pace=False)
+    return mscreen, frames
+
+
+def test_headless_same_seed_same_frames() -> None:
+    _, first = run([-1] * 100, argv=("--seed", str(SEED)))
+    _, second = run([-1] * 100, argv=("--seed", str(SEED)))
+    _, other = run([-1] * 100, argv=("--seed", str(SEED + 1)))
+    assert first == second
+    assert first != other
+    assert any(line.strip() for line in first[50])
+
+
+def test_headless_quits_when_script_is_exhausted() -> None:
+    mscreen, frames = run([-1] * 9)
+    # 10 frames plus the cleared screen on exit
+    assert len(frames) == 11
+    assert all(not line.strip() for line in frames[-1])
+
+
+def test_headless_resize() -> None:
+    mscreen, frames = run([-1] * 30 + [(20, 30), -1])
+    assert (mscreen.height, mscreen.width) == (20, 30)
+    # Trails in flight are kept instead of clearing the screen; only cells of shortened trails are blanked
+    resized, before = frames[31], [line[:30] for line in frames[30][:20]]
+    assert any(line.strip() for line in resized)
+    for line, line_before in zip(resized, before):
+        assert all(
+            char in (char_before, " ") for char, char_before in zip(line, line_before)
+        )
+
+
+def test_headless_freeze_and_quit() -> None:
+    sut = HeadlessScreen(SCREEN_LINES, SCREEN_COLUMNS, [ord("f"), -1, -1, ord("q")])
+    assert sut.handle_key_presses() is Action.BREAK
+
+
+def test_headless_keys() -> None:
+    sut = HeadlessScreen(
+        SCREEN_LINES, SCREEN_COLUMNS, [curses.KEY_UP, curses.KEY_DOWN, -1]
+    )
+    assert sut.handle_key_presses() is Action.KEY_UP
+    assert sut.handle_key_presses() is Action.KEY_DOWN
+    assert sut.handle_key_presses() is Action.CONTINUE
+    assert sut.handle_key_presses() is Action.BREAK
+
+
+def test_headless_window_lower_right_corner_is_written() -> None:
+    sut = HeadlessWindow(SCREEN_LINES, SCREEN_COLUMNS)
+    sut.addstr(SCREEN_LINES - 1, SCREEN_COLUMNS - 1, "X", 9)
+    assert sut.char_at(SCREEN_LINES - 1, SCREEN_COLUMNS - 1) == "X"
+    assert sut.attr_at(SCREEN_LINES - 1, SCREEN_COLUMNS - 1) == 9
+    with pytest.raises(curses.error):
+        sut.addstr(SCREEN_LINES - 1, SCREEN_COLUMNS - 1, "XY", 9)
+
+
+def test_headless_size_is_only_read_after_resize(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    sut = HeadlessScreen(SCREEN_LINES, SCREEN_COLUMNS, [-1, (20, 30)])
+    monkeypatch.setattr(
+        sut.window, "getmaxyx", lambda: pytest.fail("size read without resize")
+    )
+    assert sut.validate_screen_size() is False
+    sut.handle_key_presses()
+    assert sut.validate_screen_size() is False
+    sut.handle_key_presses()  # KEY_RESIZE
+    monkeypatch.undo()
+    assert sut.validate_screen_size() is True
+    assert (sut.height, sut.width) == (20, 30)
+    assert sut.validate_screen_size() is False
+
+
+def test_headless_resize_updates_trails(monkeypatch: pytest.MonkeyPatch) -> None:
+    created = []
+
+    def create_and_keep(engine: str, width: int, height: int, rng):
+        created.append(matrix_rain.MatrixRainTrails(width, height, rng))
+        return created[-1]
+
+    monkeypatch.setattr(matrix_rain, "create_trails", create_and_keep)
+    run([-1] * 40 + [(12, 20)] + [-1] * 5)
+    (trails,) = created
+    assert len(trails.active_trails) > 0
+    assert all(
+        trail.column_number < 20 and len(trail) <= 12 - 3
+        for trail in trails.active_trails
+    )
+    assert len(trails.active_trails) + len(trails.available_column_numbers) == 20
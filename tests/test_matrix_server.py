@@ -0,0 +1,263 @@
+import asyncio
+import re
+import socket
+import time
+from typing import Optional
+
+import pytest
+
+import matrix_server as matrix_server_module
+from matrix_screen import BLANK
+from matrix_server import (
+    IAC,
+    NAWS,
+    NEGOTIATION,
+    SB,
+    SE,
+    SETUP_TERMINAL,
+    MatrixChannel,
+    MatrixClient,
+    MatrixServer,
+    TelnetParser,
+    argument_parsing,
+)
+
+ESCAPE = re.compile(r"\x1b\[([0-9;?]*)([A-Za-z])")
+
+
+def naws(width: int, height: int) -> bytes:
+    """A window size report; a 255 in the size is doubled like any IAC in a subnegotiation."""
+    size = bytes((width >> 8, width & 0xFF, height >> 8, height & 0xFF)).replace(
+        b"\xff", b"\xff\xff"
+    )
+    return bytes((IAC, SB, NAWS)) + size + bytes((IAC, SE))
+
+
+def terminal_screen(stream: bytes) -> dict[tuple[int, int], tuple[str, str]]:
+    """The characters and colors on a terminal after `stream`; a minimal interpreter of what the server sends."""
+    assert stream.startswith(NEGOTIATION + SETUP_TERMINAL)
+    text: str = stream[len(NEGOTIATION + SETUP_TERMINAL) :].decode("utf-8")
+    cells: dict[tuple[int, int], tuple[str, str]] = {}
+    y, x, color = 0, 0, ""
+    pos = 0
+    while pos < len(text):
+        match: Optional[re.Match] = ESCAPE.match(text, pos)
+        if match is None:
+            if text[pos] == BLANK:
+                cells.pop((y, x), None)
+            else:
+                cells[y, x] = (text[pos], color)
+            x += 1
+            pos += 1
+            continue
+        parameters, command = match.groups()
+        if command == "H":
+            y, x = (
+                (int(value) - 1 for value in parameters.split(";"))
+                if parameters
+                else (0, 0)
+            )
+        elif command == "J":
+            cells.clear()
+        elif command == "m":
+            color = match.group(0)
+        pos = match.end()
+    return cells
+
+
+def channel_screen(channel: MatrixChannel) -> dict[tuple[int, int], tuple[str, str]]:
+    window = channel.window
+    return {
+        position: (char, window._colors[attr].decode())
+        for position, (char, attr) in window._cells.items()
+    }
+
+
+async def read_available(reader: asyncio.StreamReader, timeout: float = 0.2) -> bytes:
+    data = bytearray()
+    while True:
+        try:
+            chunk = await asyncio.wait_for(reader.read(1 << 16), timeout)
+        except asyncio.TimeoutError:
+            return bytes(data)
+        if not chunk:
+            return bytes(data)
+        data += chunk
+
+
+def test_telnet_parser() -> None:
+    parser = TelnetParser()
+    assert parser.feed(b"a" + bytes((IAC, IAC)) + bytes((IAC,))) == (b"a\xff", [])
+    assert parser.feed(bytes((253, NAWS)) + naws(300, 255)) == (b"", [(300, 255)])
+    assert parser.feed(naws(80, 24)[:3]) == (b"", [])
+    assert parser.feed(naws(80, 24)[3:] + b"q") == (b"q", [(80, 24)])
+
+
+def test_telnet_parser_byte_by_byte() -> None:
+    parser = TelnetParser()
+    stream = b"a" + bytes((IAC, 251, NAWS)) + naws(255, 40) + bytes((IAC, IAC)) + b"q"
+    results = [parser.feed(bytes((byte,))) for byte in stream]
+    assert b"".join(keys for keys, _ in results) == b"a\xffq"
+    assert [size for _, sizes in results for size in sizes] == [(255, 40)]
+
+
+def test_telnet_parser_drops_long_subnegotiations() -> None:
+    parser = TelnetParser()
+    start = time.perf_counter()
+    parser.feed(bytes((IAC, SB, NAWS)))
+    for _ in range(4096):
+        parser.feed(b"x" * 1024)
+    assert time.perf_counter() - start < 1
+    assert len(parser._subnegotiation) == 0
+    assert parser.feed(bytes((IAC, SE)) + b"k" + naws(80, 24)) == (b"k", [(80, 24)])
+
+
+class FakeTransport:
+    def __init__(self) -> None:
+        self.buffered = 0
+
+    def get_write_buffer_size(self) -> int:
+        return self.buffered
+
+
+class FakeWriter:
+    def __init__(self) -> None:
+        self.transport = FakeTransport()
+        self.written: list[bytes] = []
+        self.closed = False
+
+    def is_closing(self) -> bool:
+        return self.closed
+
+    def write(self, data: bytes) -> None:
+        self.written.append(data)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_channel_sends_the_same_bytes_to_all_clients() -> None:
+    channel = MatrixChannel(40, 20, argument_parsing(["--seed", "2"]), 0.1)
+    clients = [MatrixClient(FakeWriter()) for _ in range(3)]  # type: ignore[arg-type]
+    channel.clients.update(clients)
+    for _ in range(5):
+        channel.step()
+    for frame in range(5):
+        assert (
+            clients[0].writer.written[frame]
+            is clients[1].writer.written[frame]
+            is clients[2].writer.written[frame]
+        )
+    assert channel.bytes_encoded == sum(
+        len(frame) for frame in clients[0].writer.written
+    )
+
+
+def test_slow_client_drops_frames_and_resyncs_with_a_keyframe() -> None:
+    channel = MatrixChannel(40, 20, argument_parsing(["--seed", "2"]), 0.1)
+    client = MatrixClient(FakeWriter(), max_buffer=100)  # type: ignore[arg-type]
+    channel.clients.add(client)
+    channel.step(now=0.0)
+    client.writer.transport.buffered = 101
+    channel.step(now=1.0)
+    channel.step(now=2.0)
+    assert (client.frames_sent, client.frames_dropped) == (1, 2)
+    client.writer.transport.buffered = 0
+    channel.step(now=3.0)
+    assert client.keyframes_sent == 1
+    assert client.writer.written[-1] == channel.window.keyframe()
+    client.writer.transport.buffered = 101
+    channel.step(now=4.0)
+    channel.step(now=100.0)
+    assert client.writer.closed
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """A server whose channels run their first frame only; the tests step them."""
+    monkeypatch.setattr(matrix_server_module, "NAWS_TIMEOUT", 0.05)
+    loop = asyncio.new_event_loop()
+    matrix_server = MatrixServer(
+        argument_parsing(["--seed", "3"]),
+        frame_time=3600,
+        default_size=(30, 12),
+        max_buffer=4096,
+    )
+    server = loop.run_until_complete(matrix_server.start("127.0.0.1", 0))
+    yield loop, matrix_server, server.sockets[0].getsockname()[1]
+    loop.run_until_complete(matrix_server.close())
+    server.close()
+    loop.run_until_complete(server.wait_closed())
+    loop.close()
+
+
+def test_clients_share_channels_by_size(server) -> None:
+    loop, matrix_server, port = server
+
+    async def session() -> None:
+        telnets = [await asyncio.open_connection("127.0.0.1", port) for _ in range(2)]
+        for _, writer in telnets:
+            writer.write(naws(40, 20))
+        # A client without NAWS gets the default size
+        netcat_reader, netcat_writer = await asyncio.open_connection("127.0.0.1", port)
+        await asyncio.sleep(0.1)
+        channel = matrix_server.channels[40, 20]
+        for _ in range(20):
+            channel.step()
+        # A late joiner gets a keyframe
+        late_reader, late_writer = await asyncio.open_connection("127.0.0.1", port)
+        late_writer.write(naws(40, 20))
+        await asyncio.sleep(0.1)
+        for _ in range(20):
+            channel.step()
+
+        assert sorted(matrix_server.channels) == [(30, 12), (40, 20)]
+        assert len(channel.clients) == 3
+        streams = [await read_available(reader) for reader, _ in telnets] + [
+            await read_available(late_reader)
+        ]
+        for stream in streams:
+            assert terminal_screen(stream) == channel_screen(channel)
+        assert terminal_screen(await read_available(netcat_reader)) == channel_screen(
+            matrix_server.channels[30, 12]
+        )
+
+        # A new size moves the client to another channel
+        late_writer.write(naws(50, 10))
+        await asyncio.sleep(0.1)
+        assert len(channel.clients) == 2 and (50, 10) in matrix_server.channels
+        # Quit restores the terminal and closes; the channel of the last client stops
+        late_writer.write(b"q")
+        assert (await read_available(late_reader)).endswith(b"\x1b[?25h")
+        await asyncio.sleep(0.1)
+        assert (50, 10) not in matrix_server.channels
+
+    loop.run_until_complete(session())
+
+
+def test_slow_client_on_loopback(server) -> None:
+    loop, matrix_server, port = server
+
+    async def session() -> None:
+        sock = socket.socket()
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        sock.connect(("127.0.0.1", port))
+        reader, writer = await asyncio.open_connection(sock=sock)
+        writer.write(naws(300, 100))
+        await asyncio.sleep(0.1)
+        channel = matrix_server.channels[300, 100]
+        (client,) = channel.clients
+        for _ in range(500):
+            channel.step(loop.time())
+            await asyncio.sleep(0)
+            if client.frames_dropped:
+                break
+        assert client.frames_dropped
+        stream = await read_available(reader)
+        channel.step(loop.time())
+        stream += await read_available(reader)
+        assert client.keyframes_sent == 2
+        assert terminal_screen(stream) == channel_screen(channel)
+        writer.close()
+
+    loop.run_until_complete(session())
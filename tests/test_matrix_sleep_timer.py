@@ -0,0 +1,127 @@
+import pytest
+
+from matrix_rain import wait_for_next_frame
+from matrix_screen_headless import HeadlessScreen
+from matrix_sleep_timer import MatrixSleepTimer
+
+PERIOD: float = 0.1
+
+
+class FakeClock:
+    """A clock that only advances when slept on or when work is simulated."""
+
+    def __init__(self) -> None:
+        self.now: float = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def create(catch_up: bool = False) -> tuple[MatrixSleepTimer, FakeClock]:
+    clock = FakeClock()
+    return MatrixSleepTimer(PERIOD, 2.0, catch_up, clock, clock.sleep), clock
+
+
+def test_mst_zero_sleep_fails() -> None:
+    with pytest.raises(ValueError):
+        MatrixSleepTimer(0)
+
+
+def test_mst_work_time_is_subtracted() -> None:
+    sut, clock = create()
+    for _ in range(10):
+        clock.now += 0.03  # work
+        sut.sleep()
+    assert clock.now == pytest.approx(10 * PERIOD + 0.03)
+    assert clock.sleeps[1:] == pytest.approx([PERIOD - 0.03] * 9)
+    assert sut.frame_time == pytest.approx(PERIOD)
+    assert sut.jitter == pytest.approx(0.0, abs=1e-9)
+
+
+def test_mst_speed_keys_change_period() -> None:
+    sut, clock = create()
+    sut.sleep()
+    sut.increment_sleep()
+    sut.sleep()
+    assert clock.sleeps[-1] == pytest.approx(2 * PERIOD)
+    sut.decrement_sleep()
+    sut.decrement_sleep()
+    sut.sleep()
+    assert clock.sleeps[-1] == pytest.approx(PERIOD / 2)
+
+
+def test_mst_skips_when_behind() -> None:
+    sut, clock = create(catch_up=False)
+    sut.sleep()
+    clock.now += 2.5 * PERIOD  # overrun
+    sut.sleep()
+    assert sut.skipped_frames == 2
+    sut.sleep()
+    # Schedule restarted from the late frame
+    assert clock.sleeps[-1] == pytest.approx(PERIOD)
+
+
+def test_mst_catches_up_when_behind() -> None:
+    sut, clock = create(catch_up=True)
+    sut.sleep()
+    clock.now += 2.5 * PERIOD  # overrun
+    sleeps: int = len(clock.sleeps)
+    sut.sleep()
+    sut.sleep()
+    # Both frames run without sleeping
+    assert len(clock.sleeps) == sleeps
+    sut.sleep()
+    assert clock.sleeps[-1] == pytest.approx(0.5 * PERIOD)
+    assert sut.skipped_frames == 0
+
+
+def test_mst_catch_up_is_bounded() -> None:
+    sut, clock = create(catch_up=True)
+    sut.sleep()
+    clock.now += (MatrixSleepTimer.MAX_CATCH_UP + 2) * PERIOD
+    sut.sleep()
+    assert sut.skipped_frames > MatrixSleepTimer.MAX_CATCH_UP
+    sut.sleep()
+    assert clock.sleeps[-1] == pytest.approx(PERIOD)
+
+
+def test_mst_woken_early_keeps_deadline() -> None:
+    sut, clock = create()
+    sut.sleep()
+
+    def woken_after(seconds: float):
+        def waiter(timeout: float) -> bool:
+            clock.now += min(seconds, timeout)
+            return seconds < timeout
+
+        return waiter
+
+    assert sut.sleep(woken_after(0.04)) is True
+    # Slower speed applies to the deadline being waited for
+    sut.increment_sleep()
+    assert sut.sleep(woken_after(1.0)) is False
+    assert clock.now == pytest.approx(PERIOD + 2 * PERIOD)
+
+
+def test_mst_reset_does_not_catch_up() -> None:
+    sut, clock = create(catch_up=True)
+    sut.sleep()
+    # Frozen for a few periods
+    clock.now += 3 * PERIOD
+    sut.reset()
+    sut.sleep()
+    assert clock.sleeps[-1] == pytest.approx(PERIOD)
+    assert sut.skipped_frames == 0
+
+
+def test_resume_after_freeze_resets_schedule(monkeypatch) -> None:
+    resets: list[bool] = []
+    monkeypatch.setattr(MatrixSleepTimer, "reset", lambda self: resets.append(True))
+    mscreen = HeadlessScreen(24, 40, [ord("f"), -1, ord("f")])
+    wait_for_next_frame(mscreen, pace=False)
+    assert resets == [True]
@@ -0,0 +1,67 @@
+import itertools
+import json
+from pathlib import Path
+
+from matrix_rain import argument_parsing, configure_screen, rain_loop
+from matrix_screen_headless import HeadlessScreen
+from matrix_trace import MatrixTracer, NullTracer, Phase
+
+SCREEN_COLUMNS: int = 40
+SCREEN_LINES: int = 24
+
+
+def test_trace_ring_buffer_keeps_latest_marks() -> None:
+    sut = MatrixTracer(capacity=4, clock=itertools.count(100).__next__)
+    for phase in [Phase.SLEEP, Phase.REFRESH] * 3:
+        sut.mark(phase)
+    assert len(sut) == 4
+    assert sut.marks() == [
+        (Phase.SLEEP, 102),
+        (Phase.REFRESH, 103),
+        (Phase.SLEEP, 104),
+        (Phase.REFRESH, 105),
+    ]
+
+
+def test_trace_events_nest_phases_in_frames() -> None:
+    sut = MatrixTracer(clock=itertools.count(0, 1000).__next__)
+    for phase in [
+        Phase.VALIDATE_SCREEN_SIZE,
+        Phase.REFRESH,
+        Phase.VALIDATE_SCREEN_SIZE,
+        Phase.EXIT,
+    ]:
+        sut.mark(phase)
+    events = [
+        (event["name"], event["ts"], event["dur"], event["args"]["frame"])
+        for event in sut.events()
+    ]
+    assert events == [
+        ("validate_screen_size", 0, 1, 0),
+        ("refresh", 1, 1, 0),
+        ("frame", 0, 2, 0),
+        ("validate_screen_size", 2, 1, 1),
+        ("frame", 2, 1, 1),
+    ]
+
+
+def test_trace_null_tracer_records_nothing() -> None:
+    sut = NullTracer()
+    sut.mark(Phase.SLEEP)
+    assert len(sut) == 0
+
+
+def test_trace_rain_loop_writes_chrome_trace(tmp_path: Path) -> None:
+    path = tmp_path / "trace.json"
+    args = argument_parsing(["--seed", "1", "--trace", str(path)])
+    mscreen = HeadlessScreen(SCREEN_LINES, SCREEN_COLUMNS, [-1] * 9)
+    configure_screen(mscreen, args)
+    rain_loop(mscreen, args, pace=False)
+
+    events = json.loads(path.read_text())["traceEvents"]
+    assert {event["ph"] for event in events} == {"X"}
+    assert {event["name"] for event in events} == {"frame"} | {
+        phase.name.lower() for phase in Phase if phase is not Phase.EXIT
+    }
+    assert sum(event["name"] == "frame" for event in events) == 10
+    assert all(event["dur"] >= 0 for event in events)
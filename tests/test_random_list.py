@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from random_list import RandomList
+
+SIZE: int = 10
+
+
+def test_rl_instantiate_not_int_fails() -> None:
+    with pytest.raises(ValueError):
+        RandomList("10")
+
+
+def test_rl_pop_empty_fails() -> None:
+    sut = RandomList(0)
+    with pytest.raises(ValueError):
+        sut.pop_random()
+
+
+@pytest.mark.parametrize("number", [-1, SIZE, "1"])
+def test_rl_append_invalid_fails(number) -> None:
+    sut = RandomList(SIZE)
+    sut.pop_random()
+    with pytest.raises(ValueError):
+        sut.append(number)
+
+
+def test_rl_append_duplicate_fails() -> None:
+    sut = RandomList(SIZE)
+    with pytest.raises(ValueError):
+        sut.append(3)
+
+
+def test_rl_pop_all_and_append() -> None:
+    # GIVEN
+    sut = RandomList(SIZE)
+    # WHEN
+    popped = [sut.pop_random() for _ in range(SIZE)]
+    # THEN
+    assert sorted(popped) == list(range(SIZE))
+    assert len(sut) == 0
+    assert 3 not in sut
+    sut.append(3)
+    assert 3 in sut
+    assert sut.pop_random() == 3
+
+
+def test_rl_membership_consistent_under_churn() -> None:
+    random.seed(11)
+    sut = RandomList(SIZE)
+    outside: set[int] = set()
+    for _ in range(1000):
+        if outside and random.random() < 0.5:
+            number = outside.pop()
+            sut.append(number)
+        elif len(sut):
+            outside.add(sut.pop_random())
+        assert {n for n in range(SIZE) if n in sut} == set(range(SIZE)) - outside
+        assert len(sut) == SIZE - len(outside)
+
+
+def test_rl_pop_random_many() -> None:
+    sut = RandomList(SIZE)
+    popped = sut.pop_random_many(4)
+    assert len(set(popped)) == 4
+    assert len(sut) == SIZE - 4
+    with pytest.raises(ValueError):
+        sut.pop_random_many(SIZE)
+
+
+def test_rl_resize() -> None:
+    # GIVEN 3, 7 and 8 popped
+    sut = RandomList(SIZE)
+    outside = set()
+    while not {3, 7, 8} <= outside:
+        outside.add(sut.pop_random())
+    for number in outside - {3, 7, 8}:
+        sut.append(number)
+    # WHEN
+    sut.resize(5)
+    # THEN
+    assert {n for n in range(SIZE) if n in sut} == {0, 1, 2, 4}
+    with pytest.raises(ValueError):
+        sut.append(7)
+    sut.resize(12)
+    assert {n for n in range(12) if n in sut} == {0, 1, 2, 4, 5, 6, 7, 8, 9, 10, 11}
+    sut.append(3)
+    assert sorted(sut.pop_random_many(len(sut))) == list(range(12))